@@ -0,0 +1,97 @@
+"""Process-wide feature cache keyed by (content hash, pipeline version).
+
+Every stage of a feature pipeline (preprocessor, extractor, decorators) may declare a
+`cache_version` string; `pipeline_version` joins them. Pipelines with an undeclared stage
+get no version and are never cached, since nothing says their output is a pure function
+of the code.
+
+The cache serves the API facades (repeat uploads of the same snippet); training reads
+whole matrices from the on-disk feature store instead.
+"""
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+import hashlib
+import threading
+
+
+def content_hash(code: str) -> bytes:
+    return hashlib.blake2b(code.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+def pipeline_version(*stages) -> str | None:
+    """Cache version of a preprocessor/extractor chain, None if any stage is undeclared."""
+    parts = []
+    for stage in stages:
+        while stage is not None:
+            version = getattr(stage, "cache_version", None)
+            if version is None:
+                return None
+            parts.append(version)
+            stage = getattr(stage, "_extractor", None)  # FeatureDecorator chains
+    return "+".join(parts) or None
+
+
+class LRUCache:
+    """Bounded, thread-safe LRU mapping with hit/miss counters."""
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._items: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: Hashable, default=None):
+        with self._lock:
+            if key in self._items:
+                self.hits += 1
+                self._items.move_to_end(key)
+                return self._items[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value) -> None:
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]):
+        # computed outside the lock: two threads may both compute a fresh key, never block
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._items), "maxsize": self.maxsize,
+                    "hits": self.hits, "misses": self.misses}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.hits = self.misses = 0
+
+
+_MISSING = object()
+
+
+class FeatureCache(LRUCache):
+    """Feature dicts keyed by (content hash, pipeline version, lang). Cached dicts are shared: read only."""
+
+    def features(self, code: str, version: str | None, compute: Callable[[], Dict[str, Any]],
+                 lang: str | None = None) -> Dict[str, Any]:
+        if version is None:
+            return compute()
+        return self.get_or_compute((content_hash(code), version, lang), compute)
+
+
+FEATURE_CACHE = FeatureCache()
+
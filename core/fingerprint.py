@@ -0,0 +1,20 @@
+"""Fingerprints of model artifacts on disk, for keying caches derived from a model."""
+from __future__ import annotations
+from pathlib import Path
+import hashlib
+import os
+
+
+def artifact_fingerprint(path: str | os.PathLike) -> str:
+    """Digest of a model file or directory (relative names, sizes, mtimes), cheap to recompute.
+
+    Retraining or re-exporting the artifact in place changes it, so caches keyed on it
+    (teacher labels, stored embeddings) are rebuilt instead of silently reused.
+    """
+    h = hashlib.blake2b(digest_size=8)
+    root = Path(path)
+    files = sorted(p for p in root.rglob("*") if p.is_file()) if root.is_dir() else [root]
+    for p in files:
+        st = p.stat()
+        h.update(f"{p.relative_to(root) if root.is_dir() else p.name}:{st.st_size}:{st.st_mtime_ns}".encode())
+    return h.hexdigest()
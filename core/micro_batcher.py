@@ -0,0 +1,123 @@
+"""Dynamic micro-batching for model inference behind concurrent request handlers.
+
+Each handler thread calls `batcher(item)` and blocks; a single worker thread collects
+the items that arrive within `max_wait_ms` of the first one (at most `max_batch`), runs
+one `predict_batch(items)` call and hands every caller its own result. Under load the
+model sees full batches; a lone request waits at most `max_wait_ms` extra.
+"""
+from __future__ import annotations
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+import os
+import queue
+import threading
+import time
+
+_STOP = object()
+
+
+class MicroBatcher:
+    def __init__(self, predict_batch: Callable[[List[Any]], Sequence[Any]], max_batch: int = 16,
+                 max_wait_ms: float = 5.0, name: str = "model") -> None:
+        if max_batch < 1:
+            raise ValueError(f"max_batch must be >= 1, got {max_batch}")
+        self.predict_batch = predict_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+        self._queue: "queue.Queue[Tuple[Any, Future] | object]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._batches = self._items = self._largest = 0
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name=f"micro-batcher-{name}", daemon=True)
+        self._worker.start()
+
+    @classmethod
+    def from_env(cls, name: str, predict_batch, max_batch: int = 16, max_wait_ms: float = 5.0) -> "MicroBatcher":
+        """Per-model settings from `<NAME>_BATCH_SIZE` / `<NAME>_BATCH_WAIT_MS`, else the defaults."""
+        prefix = name.upper()
+        return cls(
+            predict_batch,
+            max_batch=int(os.getenv(f"{prefix}_BATCH_SIZE", max_batch)),
+            max_wait_ms=float(os.getenv(f"{prefix}_BATCH_WAIT_MS", max_wait_ms)),
+            name=name,
+        )
+
+    def submit(self, item) -> Future:
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"micro-batcher {self.name} is closed")
+            self._queue.put((item, future))
+        return future
+
+    def __call__(self, item, timeout: float | None = None):
+        return self.submit(item).result(timeout)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._worker.join()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_batch": self.max_batch,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "batches": self._batches,
+                "items": self._items,
+                "largest_batch": self._largest,
+                "avg_batch": self._items / self._batches if self._batches else 0.0,
+            }
+
+    def _collect(self, first) -> Tuple[List[Tuple[Any, Future]], bool]:
+        batch, stop = [first], False
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is _STOP:
+                stop = True
+                break
+            batch.append(entry)
+        return batch, stop
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            batch, stop = self._collect(first)
+            # requests whose caller gave up (cancelled) are dropped before the forward pass
+            batch = [(item, f) for item, f in batch if f.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                results = self.predict_batch([item for item, _ in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(f"{self.name}: predict_batch returned {len(results)} results for {len(batch)} items")
+            except Exception as e:  # every waiting caller sees the failure
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+            with self._lock:
+                self._batches += 1
+                self._items += len(batch)
+                self._largest = max(self._largest, len(batch))
+        # fail whatever is still queued instead of leaving callers blocked
+        while True:
+            try:
+                entry = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is not _STOP and entry[1].set_running_or_notify_cancel():
+                entry[1].set_exception(RuntimeError(f"micro-batcher {self.name} is closed"))
@@ -1,21 +1,32 @@
+from core.feature_cache import FEATURE_CACHE, pipeline_version
+from features.extractors.basic import BasicFeatureExtractor
+
+# P(machine) above which an answer is labelled "machine"
+LABEL_THRESHOLD = 0.7
+
+
 class PredictionFacade:
-    def __init__(self, model, preprocessor, feature_extractor):
+    def __init__(self, model, preprocessor, feature_extractor, cache=FEATURE_CACHE, threshold=LABEL_THRESHOLD):
         self.model = model
         self.preprocessor = preprocessor
         self.feature_extractor = feature_extractor
+        self.threshold = threshold
+
+        self.feature_order = list(BasicFeatureExtractor.FEATURE_ORDER)
+        # facades with the same pipeline share entries (None: no cache / unversioned pipeline)
+        self.cache = cache
+        self.cache_version = pipeline_version(preprocessor, feature_extractor) if cache is not None else None
 
-        self.feature_order = [
-            "n_lines",
-            "avg_line_len",
-            "n_chars",
-            "n_tabs",
-            "n_spaces",
-            "n_keywords"
-        ]
+    def _features(self, code: str):
+        # preprocessor=None: the extractor cleans on the fly (FusedBasicExtractor)
+        processed = self.preprocessor.clean(code) if self.preprocessor is not None else code
+        return self.feature_extractor.extract_features(processed)
 
     def analyze(self, code: str):
-        processed = self.preprocessor.clean(code)
-        features = self.feature_extractor.extract_features(processed)
+        if self.cache_version is None:
+            features = self._features(code)
+        else:
+            features = self.cache.features(code, self.cache_version, lambda: self._features(code))
 
         row = [float(features.get(f, 0)) for f in self.feature_order]
         X = [row]
@@ -24,5 +35,5 @@ class PredictionFacade:
 
         return {
             "probability_machine": float(proba[0]),
-            "label": "machine" if proba[0] > 0.7 else "human"
-        }
\ No newline at end of file
+            "label": "machine" if proba[0] > self.threshold else "human"
+        }
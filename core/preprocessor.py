@@ -1,6 +1,33 @@
 import re
 
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Whitespace that str.rstrip() can still meet once control chars and "\r" are gone.
+_TRAILING_WS = "(?m)[\t \x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000]+$"
+
+
+def to_string_array(codes):
+    """Normalize a list / pandas Series / pyarrow array of codes to an arrow string column.
+
+    Missing or non-string values become "" (the same thing `Preprocessor.clean` returns).
+    """
+    if isinstance(codes, pa.ChunkedArray):
+        codes = codes.combine_chunks()
+    if isinstance(codes, pa.Array):
+        if pa.types.is_string(codes.type) or pa.types.is_large_string(codes.type):
+            return codes.cast(pa.large_string()).fill_null("")
+        codes = codes.to_pylist()
+    try:
+        arr = pa.array(codes, type=pa.large_string(), from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        arr = pa.array([c if isinstance(c, str) else "" for c in codes], type=pa.large_string())
+    return arr.fill_null("")
+
+
 class Preprocessor:
+    cache_version = "clean/1"  # bump whenever clean() changes its output
+
     def __init__(self):
         pass
 
@@ -19,3 +46,22 @@ class Preprocessor:
 
         #return None. -pt testare monitor
         return code
+
+    def clean_batch(self, codes) -> pa.Array:
+        """Columnar `clean`: same steps, run as arrow string kernels over the whole column.
+
+        Returns a pyarrow large_string array aligned with `codes`.
+        """
+        arr = to_string_array(codes)
+
+        arr = pc.replace_substring_regex(arr, r'[\x00-\x08\x0B-\x0C\x0E-\x1F]', '')
+
+        arr = pc.replace_substring(arr, "\r\n", "\n")
+        arr = pc.replace_substring(arr, "\r", "\n")
+
+        arr = pc.replace_substring_regex(arr, _TRAILING_WS, '')
+
+        arr = pc.replace_substring_regex(arr, r'\t+', '\t')
+        arr = pc.replace_substring_regex(arr, r' {2,}', ' ')
+
+        return arr
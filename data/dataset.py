@@ -1,5 +1,38 @@
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
+from typing import Iterator, List, Tuple
+
+import numpy as np
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+
+BATCH_ROWS = 8192
+HASH_FEATURES = 1 << 10
+
+
+def hashing_vectorizer(n_features: int = HASH_FEATURES) -> HashingVectorizer:
+    """Stateless text vectorizer: no fit pass, chunks can be transformed independently."""
+    return HashingVectorizer(n_features=n_features, alternate_sign=False, norm="l2", dtype=np.float32)
+
+
+def iter_parquet(path: str, batch_rows: int = BATCH_ROWS, code_col: str = "code",
+                 label_col: str = "label", dropna: bool = True) -> Iterator[Tuple[List[str], np.ndarray]]:
+    """(codes, labels) chunks of at most `batch_rows` rows.
+
+    Only the two projected columns are read, one record batch at a time, so memory stays
+    bounded by the batch size rather than by the file. `dropna` drops rows missing code or
+    label, like `df.dropna(subset=[code_col, label_col])`.
+    """
+    pf = pq.ParquetFile(path)
+    for batch in pf.iter_batches(batch_size=batch_rows, columns=[code_col, label_col]):
+        codes, labels = batch.column(code_col), batch.column(label_col)
+        if dropna and (codes.null_count or labels.null_count):
+            keep = pc.and_(codes.is_valid(), labels.is_valid())
+            codes, labels = codes.filter(keep), labels.filter(keep)
+        if len(codes) == 0:
+            continue
+        yield codes.to_pylist(), labels.to_numpy(zero_copy_only=False).astype(int)
+
 
 class Dataset:
     def __init__(self, X, y, vectorizer=None):
@@ -8,14 +41,34 @@ class Dataset:
         self.vectorizer = vectorizer
 
     @classmethod
-    def from_parquet(cls, path: str):
-        df = pd.read_parquet(path)
-        df = df.dropna(subset=["code", "label"])
+    def stream(cls, path: str, vectorizer=None, batch_rows: int = BATCH_ROWS) -> Iterator["Dataset"]:
+        """Vectorized chunks of `path`, for incremental training (vectorizer must be stateless)."""
+        vectorizer = vectorizer or hashing_vectorizer()
+        for codes, y in iter_parquet(path, batch_rows):
+            yield cls(vectorizer.transform(codes), y, vectorizer)
 
-        texts = df["code"].astype(str).tolist()
-        y = df["label"].astype(int).values
+    @classmethod
+    def stream_features(cls, path: str, preprocessor, extractor, batch_rows: int = BATCH_ROWS) -> Iterator["Dataset"]:
+        """Chunks of model features (`clean_batch` + `extract_batch`), e.g. for `train_incremental`."""
+        for codes, y in iter_parquet(path, batch_rows):
+            yield cls(extractor.extract_batch(preprocessor.clean_batch(codes)), y)
 
-        vectorizer = TfidfVectorizer(max_features=6)
-        X = vectorizer.fit_transform(texts)
+    @classmethod
+    def from_parquet(cls, path: str, vectorizer=None, batch_rows: int = BATCH_ROWS):
+        """Whole file as one sparse dataset, built chunk by chunk (the strings of one chunk at a time).
 
-        return cls(X, y, vectorizer)
+        The default vectorizer is still `TfidfVectorizer(max_features=6)`, fitted in a first
+        streamed pass over the codes. Pass a stateless one (e.g. `hashing_vectorizer()`) to
+        skip that pass.
+        """
+        if vectorizer is None:
+            vectorizer = TfidfVectorizer(max_features=6, dtype=np.float32)
+            vectorizer.fit(code for codes, _ in iter_parquet(path, batch_rows) for code in codes)
+        Xs, ys = [], []
+        for chunk in cls.stream(path, vectorizer, batch_rows):
+            Xs.append(chunk.X)
+            ys.append(chunk.y)
+        if not Xs:
+            width = getattr(vectorizer, "n_features", None) or len(vectorizer.vocabulary_)
+            return cls(sp.csr_matrix((0, width), dtype=np.float32), np.zeros(0, dtype=int), vectorizer)
+        return cls(sp.vstack(Xs, format="csr"), np.concatenate(ys), vectorizer)
@@ -0,0 +1,150 @@
+"""On-disk transformer embeddings of a corpus, keyed by content hash.
+
+Each entry holds `E.f16` (one float16 row per distinct code, raw, memory-mapped),
+`keys.npy` (the content hash of each of those rows), `rows.npy` (parquet row -> matrix
+row, -1 where the code is missing), `labels.npy`, `valid.npy` and `meta.json`. Duplicate
+codes are embedded once. Heads are trained on `labelled()` in seconds, without another
+transformer pass over the dataset.
+
+The entry name hashes the parquet fingerprint and the encoder's `embedding_version`.
+"""
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pyarrow.parquet as pq
+
+from core.feature_cache import content_hash
+from data.feature_store import dataset_fingerprint
+from events.observer import ProgressObserver
+
+DEFAULT_ROOT = "data/embeddings"
+CHUNK_ROWS = 1024
+
+
+class StoredEmbeddings:
+    def __init__(self, E: np.ndarray, keys: np.ndarray, rows: np.ndarray, labels: np.ndarray,
+                 valid: np.ndarray, meta: Dict[str, Any]) -> None:
+        self.E = E              # (n_distinct, dim) float16, memory-mapped
+        self.keys = keys        # (n_distinct, 16) uint8 content hashes
+        self.rows = rows        # (n_rows,) index into E, -1 where the code is missing
+        self.labels = labels    # (n_rows,) int32, -1 where missing
+        self.valid = valid      # (n_rows,) rows with code and label
+        self.meta = meta
+        self._index: Dict[bytes, int] | None = None
+
+    def labelled(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(X float32, y) of the rows with code and label, in parquet order."""
+        keep = np.flatnonzero(self.valid)
+        return np.asarray(self.E[self.rows[keep]], dtype=np.float32), np.asarray(self.labels[keep])
+
+    def lookup(self, key: bytes) -> np.ndarray | None:
+        """float16 embedding of a content hash, if the corpus has it."""
+        if self._index is None:
+            self._index = {k.tobytes(): i for i, k in enumerate(self.keys)}
+        i = self._index.get(key)
+        return None if i is None else self.E[i]
+
+
+class EmbeddingStore:
+    """Embedding matrices under `root`, computed with `encoder.embed` (e.g. `CodeBERTStrategy`)."""
+
+    def __init__(self, root: str | os.PathLike = DEFAULT_ROOT, chunk_rows: int = CHUNK_ROWS,
+                 observers: Sequence[ProgressObserver] = ()) -> None:
+        self.root = Path(root)
+        self.chunk_rows = chunk_rows
+        self.observers = list(observers)
+
+    def entry(self, path, encoder, code_col: str = "code") -> Path:
+        key = hashlib.blake2b(json.dumps(dataset_fingerprint(path), sort_keys=True).encode(), digest_size=8)
+        key.update(f"{encoder.embedding_version}:{code_col}".encode())
+        return self.root / f"{Path(path).stem}-{key.hexdigest()}"
+
+    def load(self, path, encoder, code_col: str = "code", label_col: str = "label") -> StoredEmbeddings:
+        entry = self.entry(path, encoder, code_col)
+        if not (entry / "meta.json").exists():
+            self._build(entry, path, encoder, code_col, label_col)
+        meta = json.loads((entry / "meta.json").read_text())
+        shape = (meta["distinct"], meta["dim"])
+        E = (np.memmap(entry / "E.f16", dtype=np.float16, mode="r", shape=shape)
+             if meta["distinct"] else np.zeros(shape, dtype=np.float16))
+        return StoredEmbeddings(
+            E=E,
+            keys=np.load(entry / "keys.npy"),
+            rows=np.load(entry / "rows.npy", mmap_mode="r"),
+            labels=np.load(entry / "labels.npy", mmap_mode="r"),
+            valid=np.load(entry / "valid.npy", mmap_mode="r"),
+            meta=meta,
+        )
+
+    def _notify(self, payload: Dict[str, Any]) -> None:
+        for observer in self.observers:
+            observer.update(self, payload)
+
+    def _build(self, entry: Path, path, encoder, code_col: str, label_col: str) -> None:
+        pf = pq.ParquetFile(path)
+        n = pf.metadata.num_rows
+        has_labels = label_col in pf.schema_arrow.names
+        index: Dict[bytes, int] = {}
+        keys: List[bytes] = []
+        rows = np.full(n, -1, dtype=np.int64)
+        dim, done = 0, 0
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(dir=self.root, prefix=".tmp-"))
+        try:
+            with open(tmp / "E.f16", "wb") as out:
+                for batch in pf.iter_batches(batch_size=self.chunk_rows, columns=[code_col]):
+                    codes = batch.column(0).to_pylist()
+                    fresh: List[str] = []
+                    for offset, code in enumerate(codes):
+                        if code is None:
+                            continue
+                        key = content_hash(code)
+                        if key not in index:
+                            index[key] = len(keys)
+                            keys.append(key)
+                            fresh.append(code)
+                        rows[done + offset] = index[key]
+                    if fresh:
+                        E = np.asarray(encoder.embed(fresh), dtype=np.float16)
+                        dim = E.shape[1]
+                        out.write(np.ascontiguousarray(E).tobytes())
+                    done += len(codes)
+                    self._notify({"step": "embed", "rows": done, "distinct": len(keys),
+                                  "progress": round(100 * done / n) if n else 100})
+
+            valid = rows >= 0
+            labels = np.full(n, -1, dtype=np.int32)
+            if has_labels:
+                column = pq.read_table(path, columns=[label_col]).column(0)
+                valid &= column.is_valid().to_numpy(zero_copy_only=False)
+                labels = column.fill_null(-1).to_numpy().astype(np.int32)
+            np.save(tmp / "keys.npy", np.frombuffer(b"".join(keys), dtype=np.uint8).reshape(-1, 16))
+            np.save(tmp / "rows.npy", rows)
+            np.save(tmp / "labels.npy", labels)
+            np.save(tmp / "valid.npy", valid)
+            meta = {
+                "dataset": dataset_fingerprint(path),
+                "embedding_version": encoder.embedding_version,
+                "rows": n,
+                "distinct": len(keys),
+                "dim": dim,
+                "dtype": "float16",
+                "has_labels": has_labels,
+            }
+            (tmp / "meta.json").write_text(json.dumps(meta, indent=2))
+            try:
+                os.replace(tmp, entry)
+            except OSError:
+                # another process built the same entry first; keep theirs
+                if not (entry / "meta.json").exists():
+                    raise
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
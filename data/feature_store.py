@@ -0,0 +1,155 @@
+"""On-disk feature matrices, materialized once per (dataset file, extractor version).
+
+Each entry is a directory with `X.npy` (float32 features), `y.npy` (int32 labels, -1 where
+missing), `valid.npy` (rows with code and label whose extraction did not fail) and
+`meta.json`. Arrays are loaded with `mmap_mode="r"`, so scripts share the page cache
+instead of re-extracting.
+
+The entry name hashes the parquet fingerprint (path, size, mtime) and the extractor
+fingerprint (cache versions plus the source of every pipeline module), so editing the
+data or the feature code invalidates it automatically.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pyarrow.parquet as pq
+
+from core.feature_cache import pipeline_version
+from events.observer import ProgressObserver
+from features.parallel import ParallelExtractor
+
+DEFAULT_ROOT = "data/features"
+
+
+def dataset_fingerprint(path: str | os.PathLike) -> Dict[str, Any]:
+    st = os.stat(path)
+    return {"path": str(Path(path).resolve()), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def extractor_fingerprint(*stages) -> str:
+    """Digest of the pipeline: cache versions, class names and the source of their modules."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update((pipeline_version(*stages) or "").encode())
+    for stage in stages:
+        while stage is not None:
+            cls = type(stage)
+            h.update(f"{cls.__module__}.{cls.__qualname__}".encode())
+            source = getattr(sys.modules.get(cls.__module__), "__file__", None)
+            if source and os.path.exists(source):
+                h.update(Path(source).read_bytes())
+            stage = getattr(stage, "_extractor", None)
+    return h.hexdigest()
+
+
+@dataclass
+class StoredFeatures:
+    X: np.ndarray           # (n_rows, n_features) float32, memory-mapped
+    y: np.ndarray           # (n_rows,) int32, -1 where the label is missing
+    valid: np.ndarray       # rows with code and label, extracted without failure
+    meta: Dict[str, Any]
+
+    def labelled(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(X, y) of the rows with code and label, like `df.dropna(subset=["code", "label"])`.
+
+        Zero-copy when every row is labelled.
+        """
+        if self.valid.all():
+            return self.X, self.y
+        return self.X[self.valid], self.y[self.valid]
+
+
+class FeatureStore:
+    """Materialized feature matrices under `root`; extraction runs on `workers` processes."""
+
+    def __init__(self, root: str | os.PathLike = DEFAULT_ROOT, workers: int | None = None,
+                 observers: Sequence[ProgressObserver] = ()) -> None:
+        self.root = Path(root)
+        self.workers = workers
+        self.observers = list(observers)
+
+    def entry(self, path, preprocessor, extractor) -> Path:
+        dataset = dataset_fingerprint(path)
+        key = hashlib.blake2b(json.dumps(dataset, sort_keys=True).encode(), digest_size=8)
+        key.update(extractor_fingerprint(preprocessor, extractor).encode())
+        return self.root / f"{Path(path).stem}-{key.hexdigest()}"
+
+    def load(self, path, preprocessor, extractor, code_col: str = "code", label_col: str = "label") -> StoredFeatures:
+        """Features of `path`, materialized on first use."""
+        entry = self.entry(path, preprocessor, extractor)
+        if not (entry / "meta.json").exists():
+            self._materialize(entry, path, preprocessor, extractor, code_col, label_col)
+        return StoredFeatures(
+            X=np.load(entry / "X.npy", mmap_mode="r"),
+            y=np.load(entry / "y.npy", mmap_mode="r"),
+            valid=np.load(entry / "valid.npy", mmap_mode="r"),
+            meta=json.loads((entry / "meta.json").read_text()),
+        )
+
+    def _materialize(self, entry: Path, path, preprocessor, extractor, code_col: str, label_col: str) -> None:
+        pf = pq.ParquetFile(path)
+        n = pf.metadata.num_rows
+        has_labels = label_col in pf.schema_arrow.names
+        order = list(extractor.FEATURE_ORDER)
+
+        stage = ParallelExtractor(preprocessor, extractor, workers=self.workers)
+        for observer in self.observers:
+            stage.attach(observer)
+        code_ok: List[np.ndarray] = []
+
+        def chunks():
+            # one work unit per record batch: only the code column of chunk_rows rows is read
+            for batch in pf.iter_batches(batch_size=stage.chunk_rows, columns=[code_col]):
+                codes = batch.column(0)
+                code_ok.append(codes.is_valid().to_numpy(zero_copy_only=False))
+                yield codes.to_pylist()
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(dir=self.root, prefix=".tmp-"))
+        try:
+            X = np.lib.format.open_memmap(tmp / "X.npy", mode="w+", dtype=np.float32, shape=(n, len(order)))
+            failed = np.zeros(n, dtype=bool)
+            start = 0
+            for X_chunk, failed_chunk in stage.iter_extract(chunks(), total=n):
+                stop = start + len(failed_chunk)
+                X[start:stop] = X_chunk
+                failed[start:stop] = failed_chunk
+                start = stop
+            X.flush()
+            del X
+
+            valid = (np.concatenate(code_ok) if code_ok else np.zeros(0, dtype=bool)) & ~failed
+            y = np.full(n, -1, dtype=np.int32)
+            if has_labels:
+                labels = pq.read_table(path, columns=[label_col]).column(0)
+                valid &= labels.is_valid().to_numpy(zero_copy_only=False)
+                y = labels.fill_null(-1).to_numpy().astype(np.int32)
+            np.save(tmp / "y.npy", y)
+            np.save(tmp / "valid.npy", valid)
+            meta = {
+                "dataset": dataset_fingerprint(path),
+                "extractor": extractor_fingerprint(preprocessor, extractor),
+                "pipeline_version": pipeline_version(preprocessor, extractor),
+                "feature_order": order,
+                "rows": n,
+                "failed_rows": int(failed.sum()),
+                "has_labels": has_labels,
+            }
+            (tmp / "meta.json").write_text(json.dumps(meta, indent=2))
+            try:
+                os.replace(tmp, entry)
+            except OSError:
+                # another process materialized the same entry first; keep theirs
+                if not (entry / "meta.json").exists():
+                    raise
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
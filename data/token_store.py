@@ -0,0 +1,190 @@
+"""On-disk tokenized corpora, built once per (dataset file, tokenizer, max_length).
+
+Each entry is a directory with `ids.int32` (every row's token ids back to back, raw
+int32, memory-mapped), `offsets.npy` (int64, row i is `ids[offsets[i]:offsets[i + 1]]`),
+`labels.npy` (int32, -1 where missing), `valid.npy` (rows with code) and `meta.json`.
+Rows are read as zero-copy slices of the mapping, so training epochs, evaluation runs
+and calibration sweeps share one tokenization pass and the page cache.
+
+Entries are keyed like the feature store: the parquet fingerprint plus the tokenizer's
+content, `max_length` and the cleaning pipeline, so a new vocabulary or preprocessor
+invalidates them automatically.
+"""
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pyarrow.parquet as pq
+
+from core.feature_cache import pipeline_version
+from data.feature_store import dataset_fingerprint
+
+DEFAULT_ROOT = "data/tokens"
+CHUNK_ROWS = 2048
+
+
+def tokenizer_fingerprint(tokenizer) -> str:
+    """Digest of the tokenizer: class, name, size and (fast tokenizers) its full serialized state."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{type(tokenizer).__qualname__}:{tokenizer.name_or_path}:{len(tokenizer)}".encode())
+    backend = getattr(tokenizer, "backend_tokenizer", None)
+    if backend is not None:
+        h.update(backend.to_str().encode())
+    return h.hexdigest()
+
+
+class TokenizedCorpus:
+    """Token ids of a parquet file; `corpus[i]` is a read-only int32 view into the mapping."""
+
+    def __init__(self, ids: np.ndarray, offsets: np.ndarray, labels: np.ndarray, valid: np.ndarray,
+                 meta: Dict[str, Any]) -> None:
+        self.ids = ids
+        self.offsets = offsets
+        self.labels = labels
+        self.valid = valid
+        self.meta = meta
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i) -> np.ndarray:
+        return self.ids[self.offsets[i]:self.offsets[i + 1]]
+
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def subset(self, rows) -> "CorpusView":
+        return CorpusView(self, np.asarray(rows))
+
+
+class CorpusView:
+    """Rows `rows` of a corpus (e.g. a train/test split) without copying any token."""
+
+    def __init__(self, corpus: TokenizedCorpus, rows: np.ndarray) -> None:
+        self.corpus = corpus
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, i) -> np.ndarray:
+        return self.corpus[self.rows[i]]
+
+    def lengths(self) -> np.ndarray:
+        return self.corpus.lengths()[self.rows]
+
+    @property
+    def labels(self) -> np.ndarray:
+        return self.corpus.labels[self.rows]
+
+
+class TokenStore:
+    """Tokenized corpora under `root`; building tokenizes chunks on `workers` threads.
+
+    The batched fast tokenizers run in Rust without the GIL, so threads scale without
+    pickling the tokenizer into worker processes.
+    """
+
+    def __init__(self, root: str | os.PathLike = DEFAULT_ROOT, workers: int | None = None,
+                 chunk_rows: int = CHUNK_ROWS) -> None:
+        self.root = Path(root)
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_rows = chunk_rows
+
+    def entry(self, path, tokenizer, max_length: int, preprocessor=None, code_col: str = "code") -> Path:
+        key = hashlib.blake2b(json.dumps(dataset_fingerprint(path), sort_keys=True).encode(), digest_size=8)
+        key.update(tokenizer_fingerprint(tokenizer).encode())
+        key.update(f"{max_length}:{code_col}:{pipeline_version(preprocessor) if preprocessor else 'raw'}".encode())
+        return self.root / f"{Path(path).stem}-{key.hexdigest()}"
+
+    def load(self, path, tokenizer, max_length: int, preprocessor=None, code_col: str = "code",
+             label_col: str = "label") -> TokenizedCorpus:
+        """Tokens of `path` (cleaned with `preprocessor` if given), built on first use."""
+        entry = self.entry(path, tokenizer, max_length, preprocessor, code_col)
+        if not (entry / "meta.json").exists():
+            self._build(entry, path, tokenizer, max_length, preprocessor, code_col, label_col)
+        return TokenizedCorpus(
+            ids=np.memmap(entry / "ids.int32", dtype=np.int32, mode="r")
+            if (entry / "ids.int32").stat().st_size else np.zeros(0, dtype=np.int32),
+            offsets=np.load(entry / "offsets.npy"),
+            labels=np.load(entry / "labels.npy", mmap_mode="r"),
+            valid=np.load(entry / "valid.npy", mmap_mode="r"),
+            meta=json.loads((entry / "meta.json").read_text()),
+        )
+
+    def _chunks(self, pf, code_col: str, valid: List[np.ndarray], preprocessor) -> Iterator[List[str]]:
+        for batch in pf.iter_batches(batch_size=self.chunk_rows, columns=[code_col]):
+            codes = batch.column(0)
+            valid.append(codes.is_valid().to_numpy(zero_copy_only=False))
+            if preprocessor is not None:
+                codes = preprocessor.clean_batch(codes)
+            yield ["" if c is None else c for c in codes.to_pylist()]
+
+    def _build(self, entry: Path, path, tokenizer, max_length: int, preprocessor, code_col: str,
+               label_col: str) -> None:
+        pf = pq.ParquetFile(path)
+        has_labels = label_col in pf.schema_arrow.names
+        valid: List[np.ndarray] = []
+
+        def tokenize(texts: List[str]):
+            return tokenizer(texts, truncation=True, max_length=max_length)["input_ids"]
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(dir=self.root, prefix=".tmp-"))
+        try:
+            lengths: List[int] = []
+            with open(tmp / "ids.int32", "wb") as out, ThreadPoolExecutor(self.workers) as pool:
+                pending = []
+                chunks = self._chunks(pf, code_col, valid, preprocessor)
+                for texts in chunks:
+                    pending.append(pool.submit(tokenize, texts))
+                    # bounded look-ahead; results are written in row order
+                    while len(pending) > 2 * self.workers:
+                        self._write(pending.pop(0).result(), out, lengths)
+                for future in pending:
+                    self._write(future.result(), out, lengths)
+
+            offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+            np.cumsum(lengths, out=offsets[1:])
+            np.save(tmp / "offsets.npy", offsets)
+            valid_rows = np.concatenate(valid) if valid else np.zeros(0, dtype=bool)
+            labels = np.full(len(lengths), -1, dtype=np.int32)
+            if has_labels:
+                column = pq.read_table(path, columns=[label_col]).column(0)
+                valid_rows &= column.is_valid().to_numpy(zero_copy_only=False)
+                labels = column.fill_null(-1).to_numpy().astype(np.int32)
+            np.save(tmp / "labels.npy", labels)
+            np.save(tmp / "valid.npy", valid_rows)
+            meta = {
+                "dataset": dataset_fingerprint(path),
+                "tokenizer": tokenizer.name_or_path,
+                "tokenizer_fingerprint": tokenizer_fingerprint(tokenizer),
+                "max_length": max_length,
+                "preprocessor": pipeline_version(preprocessor) if preprocessor else None,
+                "rows": len(lengths),
+                "tokens": int(offsets[-1]),
+                "has_labels": has_labels,
+            }
+            (tmp / "meta.json").write_text(json.dumps(meta, indent=2))
+            try:
+                os.replace(tmp, entry)
+            except OSError:
+                # another process built the same entry first; keep theirs
+                if not (entry / "meta.json").exists():
+                    raise
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    @staticmethod
+    def _write(rows, out, lengths: List[int]) -> None:
+        sizes = [len(ids) for ids in rows]
+        out.write(np.fromiter(chain.from_iterable(rows), dtype=np.int32, count=sum(sizes)).tobytes())
+        lengths.extend(sizes)
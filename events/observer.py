@@ -44,7 +44,10 @@ class ConsoleProgressObserver(ProgressObserver):
     def update(self, subject: "ProgressSubject", payload: Dict[str, Any]) -> None:
         step = payload.get("step")
         prog = payload.get("progress")
-        print(f"[OBS-CONSOLE] {step} -> {prog}%")
+        line = f"[OBS-CONSOLE] {step} -> {prog}%"
+        if "samples_per_s" in payload:
+            line += f" | loss={payload.get('loss', float('nan')):.4f} | {payload['samples_per_s']:.1f} samples/s"
+        print(line)
 
 
 class LogProgressObserver(ProgressObserver):
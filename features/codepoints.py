@@ -0,0 +1,78 @@
+"""Numpy views of text as code points, shared by the vectorized extractors."""
+from __future__ import annotations
+
+import numpy as np
+
+_ASCII_SPACE = np.array([chr(i).isspace() for i in range(128)])
+_ASCII_WORD = np.array([chr(i).isalnum() or chr(i) == "_" for i in range(128)])
+# characters Preprocessor.clean deletes outright
+ASCII_CTRL = np.array([i < 32 and chr(i) not in "\t\n\r" for i in range(128)])
+_LOW_BYTES = np.array([(1 << (8 * k)) - 1 for k in range(9)], dtype=np.uint64)
+
+
+def codepoints(code: str) -> np.ndarray:
+    """Code points of `code` as a read-only numpy view (uint8 for ASCII, else uint32)."""
+    if code.isascii():
+        return np.frombuffer(code.encode("ascii"), dtype=np.uint8)
+    return np.frombuffer(code.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+
+
+def classify(cp: np.ndarray, ascii_table: np.ndarray, predicate) -> np.ndarray:
+    """Boolean mask of `predicate(chr(c))`; non-ASCII code points are resolved once per distinct value."""
+    if cp.dtype == np.uint8:
+        return ascii_table[cp]
+    out = np.zeros(len(cp), dtype=bool)
+    small = cp < 128
+    out[small] = ascii_table[cp[small]]
+    big = cp[~small]
+    if len(big):
+        uniq, inv = np.unique(big, return_inverse=True)
+        out[~small] = np.array([predicate(chr(c)) for c in uniq.tolist()])[inv]
+    return out
+
+
+def is_space(cp: np.ndarray) -> np.ndarray:
+    return classify(cp, _ASCII_SPACE, str.isspace)
+
+
+def is_word(cp: np.ndarray) -> np.ndarray:
+    """Same notion of a word character as the `\\w` / `\\b` of a str regex."""
+    return classify(cp, _ASCII_WORD, lambda ch: ch.isalnum() or ch == "_")
+
+
+def runs(mask: np.ndarray):
+    """(starts, lengths) of the maximal True runs in `mask`."""
+    first = mask.copy()
+    first[1:] &= ~mask[:-1]
+    last = mask.copy()
+    last[:-1] &= ~mask[1:]
+    starts = np.flatnonzero(first)
+    return starts, np.flatnonzero(last) + 1 - starts
+
+
+def pack_words(cp: np.ndarray, starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Pack words of at most 8 chars into one little-endian uint64 key each (0 = too long).
+
+    Non-ASCII chars are packed as 0x80, so such words never collide with an ASCII word's key.
+    """
+    n = len(cp)
+    # unaligned 8-byte window at every offset of the zero-padded text
+    buf = np.zeros(n + 8, dtype=np.uint8)
+    buf[:n] = cp if cp.dtype == np.uint8 else np.minimum(cp, 0x80)
+    windows = np.ndarray(shape=(n,), dtype="<u8", buffer=buf, strides=(1,))
+    key = windows[starts] & _LOW_BYTES[np.minimum(lengths, 8)]
+    key[lengths > 8] = 0
+    return key
+
+
+def ranges(starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Concatenation of arange(s, s + l) for every (s, l)."""
+    total = int(lengths.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.intp)
+    offsets = np.cumsum(lengths) - lengths
+    return np.repeat(starts - offsets, lengths) + np.arange(total)
+
+
+def word_key(word: str) -> int:
+    return int.from_bytes(word.encode("ascii"), "little")
@@ -1,93 +1,187 @@
 from __future__ import annotations
-from typing import Dict, Any
+from typing import Dict, Any, List
+from collections import Counter
+from functools import cached_property
+import math
+import re
 from .base import FeatureExtractor
+from .lexicons import LINE_COMMENTS, normalize_language
 from aop.aspects import log_call, timeit, debug
 
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+
+class CodeView:
+    """Lazily computed views of one code string, shared by every POST stage that sees it."""
+
+    def __init__(self, code: str) -> None:
+        self.code = code
+
+    @cached_property
+    def lines(self) -> List[str]:
+        return self.code.splitlines()
+
+    @cached_property
+    def line_stats(self) -> Dict[str, int]:
+        """Every per-line statistic, gathered in a single iteration over the lines."""
+        non_blank = tabs = spaces = four = two = 0
+        for ln in self.lines:
+            if not ln.strip():
+                continue
+            non_blank += 1
+            if ln.startswith("\t"):
+                tabs += 1
+            elif ln.startswith(" "):
+                spaces += 1
+                if ln.startswith("  "):
+                    two += 1
+                    if ln.startswith("    "):
+                        four += 1
+        return {"non_blank": non_blank, "tabs": tabs, "spaces": spaces, "four": four, "two": two}
+
+    @cached_property
+    def identifiers(self) -> List[str]:
+        return _IDENTIFIER.findall(self.code)
+
+
 class FeatureDecorator(FeatureExtractor):
-    """Base: wraps an extractor and adds PRE/POST processing."""
-    
-    def __init__(self, extractor: FeatureExtractor) -> None:
+    """Base: wraps an extractor and adds PRE/POST processing.
+
+    Subclasses write their POST features into the shared frame in `_post_into`. Calling
+    `extract_features` on the outermost decorator runs the whole chain as one compiled
+    `FeaturePlan`; `instrument=True` turns the [LOG]/[TIME]/[DEBUG] aspects back on.
+    """
+
+    def __init__(self, extractor: FeatureExtractor, instrument: bool = False) -> None:
         self._extractor = extractor
+        self.instrument = instrument
+        self._plan: FeaturePlan | None = None
 
     def _pre(self, code: str, lang: str | None) -> str:
         return code
 
+    def _post_into(self, frame: Dict[str, Any], view: CodeView, lang: str | None) -> None:
+        pass
+
     def _post(self, feats: Dict[str, Any], code: str, lang: str | None) -> Dict[str, Any]:
-        return feats
+        d = dict(feats)
+        self._post_into(d, CodeView(code), lang)
+        return d
+
+    def extract_features(self, code: str, lang: str | None = None) -> Dict[str, Any]:
+        if self._plan is None:
+            self._plan = compile_pipeline(self, instrument=self.instrument)
+        return self._plan.extract_features(code, lang)
+
+
+class FeaturePlan(FeatureExtractor):
+    """A decorator chain flattened into PRE stages, the base extractor and POST stages.
+
+    PRE stages run outermost first; POST stages run innermost first, each on the code its
+    decorator received, exactly like the nested calls. The base features are copied once
+    into a frame that every POST stage updates in place, and stages that see the same code
+    share one `CodeView`.
+    """
+
+    def __init__(self, stages: List[FeatureDecorator], base: FeatureExtractor, instrument: bool = False) -> None:
+        self.stages = stages
+        self.base = base
+        self.instrument = instrument
+        self._pres = [self._pre_of(s) for s in stages]
+        self._posts = [self._post_of(s) for s in stages]
+        if instrument:
+            self.extract_features = log_call(timeit(self.extract_features))
+
+    def _pre_of(self, stage: FeatureDecorator):
+        if type(stage)._pre is FeatureDecorator._pre:
+            return None
+        return debug(stage._pre) if self.instrument else stage._pre
 
+    @staticmethod
+    def _post_of(stage: FeatureDecorator):
+        cls = type(stage)
+        if cls._post is not FeatureDecorator._post:
+            # a stage that still overrides `_post` returns a new dict; adopt it as the frame
+            def legacy(frame, view, lang):
+                out = stage._post(frame, view.code, lang)
+                if out is not frame:
+                    frame.clear()
+                    frame.update(out)
+            return legacy
+        if cls._post_into is FeatureDecorator._post_into:
+            return None
+        return stage._post_into
 
-    @log_call   
-    @timeit
     def extract_features(self, code: str, lang: str | None = None) -> Dict[str, Any]:
-        # print("\n[DEBUG DECORATOR] ORIGINAL CODE:")
-        # print(repr(code))
-        code2 = self._pre(code, lang)
-        # print("[DEBUG DECORATOR] AFTER _pre:")
-        # print(repr(code2))
-        base_feats = self._extractor.extract_features(code2, lang)
-        # print("[DEBUG DECORATOR] BASE FEATS ON CLEANED CODE:")
-        # print(base_feats)
-        final = self._post(base_feats, code, lang)
-        # print("[DEBUG DECORATOR] FINAL FEATS AFTER _post:")
-        # print(final)
-        return final
+        codes = []
+        for pre in self._pres:
+            codes.append(code)
+            if pre is not None:
+                code = pre(code, lang)
+        frame = dict(self.base.extract_features(code, lang))
+
+        views: Dict[int, CodeView] = {}
+        for post, seen in zip(reversed(self._posts), reversed(codes)):
+            if post is None:
+                continue
+            view = views.get(id(seen))
+            if view is None:
+                view = views[id(seen)] = CodeView(seen)
+            post(frame, view, lang)
+        return frame
+
+
+def compile_pipeline(extractor: FeatureExtractor, instrument: bool = False) -> FeaturePlan:
+    """Flatten a stack of FeatureDecorators into one FeaturePlan."""
+    stages = []
+    while isinstance(extractor, FeatureDecorator):
+        stages.append(extractor)
+        extractor = extractor._extractor
+    return FeaturePlan(stages, extractor, instrument=instrument)
+
 
 class CommentRemovalDecorator(FeatureDecorator):
     """PRE: removes single-line comments (# //) in common languages."""
-    @debug
+    cache_version = "comments/1"
+
     def _pre(self, code: str, lang: str | None) -> str:
-        out = []
-        for ln in code.splitlines():
-            if lang and lang.lower() in ("python","py"):
-                out.append(ln.split("#", 1)[0])
-            else:
-                cut = ln.split("//", 1)[0]
-                out.append(cut)
-        return "\n".join(out)
+        marker = LINE_COMMENTS.get(normalize_language(lang), "//")
+        return "\n".join(ln.split(marker, 1)[0] for ln in code.splitlines())
 
-    def _post(self, feats: Dict[str, Any], code: str, lang: str | None) -> Dict[str, Any]:
-        d = dict(feats)
-        d["comments_removed"] = True
-        return d
+    def _post_into(self, frame: Dict[str, Any], view: CodeView, lang: str | None) -> None:
+        frame["comments_removed"] = True
 
 class IndentationStyleDecorator(FeatureDecorator):
     """POST: analyzes indentation style in the code."""
-    def _post(self, feats: Dict[str, Any], code: str, lang: str | None) -> Dict[str, Any]:
-        d = dict(feats)
-        lines = [l for l in code.splitlines() if l.strip()]
-        tabs = sum(1 for l in lines if l.startswith("\t"))
-        spaces = sum(1 for l in lines if l.startswith(" "))
-        four = sum(1 for l in lines if l.startswith("    "))
-        two = sum(1 for l in lines if l.startswith("  "))
-        d.update({
-            "indent_tabs": tabs,
-            "indent_spaces": spaces,
-            "indent_4": four,
-            "indent_2": two,
+    cache_version = "indent/1"
+
+    def _post_into(self, frame: Dict[str, Any], view: CodeView, lang: str | None) -> None:
+        stats = view.line_stats
+        frame.update({
+            "indent_tabs": stats["tabs"],
+            "indent_spaces": stats["spaces"],
+            "indent_4": stats["four"],
+            "indent_2": stats["two"],
         })
-        return d
 
 class IdentifierEntropyDecorator(FeatureDecorator):
     """POST: calculates entropy of identifiers in the code."""
-    def _post(self, feats: Dict[str, Any], code: str, lang: str | None) -> Dict[str, Any]:
-        import re, math
-        from collections import Counter
-        d = dict(feats)
-        ids = re.findall(r"[A-Za-z_][A-Za-z0-9_]*", code)
+    cache_version = "id_entropy/1"
+
+    def _post_into(self, frame: Dict[str, Any], view: CodeView, lang: str | None) -> None:
+        ids = view.identifiers
         if not ids:
-            d["id_entropy"] = 0.0
-            return d
-        joined = "".join(ids)
-        cnt = Counter(joined)
+            frame["id_entropy"] = 0.0
+            return
+        cnt = Counter("".join(ids))
         total = sum(cnt.values())
         H = -sum((c/total) * math.log2(c/total) for c in cnt.values())
-        d["id_entropy"] = round(H, 4)
-        return d
+        frame["id_entropy"] = round(H, 4)
 
 class PerplexityLikeDecorator(FeatureDecorator):
     """POST: adds a perplexity-like feature based on code length."""
-    def _post(self, feats: Dict[str, Any], code: str, lang: str | None) -> Dict[str, Any]:
-        d = dict(feats)
-        L = max(1, len(code))
-        d["ppl_like"] = round(1.0 + 100.0 / L, 4)
-        return d
+    cache_version = "ppl_like/1"
+
+    def _post_into(self, frame: Dict[str, Any], view: CodeView, lang: str | None) -> None:
+        L = max(1, len(view.code))
+        frame["ppl_like"] = round(1.0 + 100.0 / L, 4)
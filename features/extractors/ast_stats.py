@@ -1,18 +1,143 @@
 from __future__ import annotations
 from typing import Dict, Any
+import ast
+
 from ..base import FeatureExtractor
+from ..parse_cache import parse_code
+
+# Python node type -> counter; every other node still counts towards ast_nodes
+_NODE_KINDS = {
+    ast.FunctionDef: "ast_funcs",
+    ast.ClassDef: "ast_classes",
+    ast.If: "ast_ifs",
+    ast.For: "ast_loops", ast.AsyncFor: "ast_loops", ast.While: "ast_loops",
+    ast.Call: "ast_calls",
+    ast.Return: "ast_returns",
+    ast.Try: "ast_trys",
+}
+if hasattr(ast, "TryStar"):
+    _NODE_KINDS[ast.TryStar] = "ast_trys"
+
+COUNTERS = ("ast_funcs", "ast_classes", "ast_ifs", "ast_loops", "ast_calls", "ast_returns", "ast_trys")
+
+# the same counters for the token tree of other languages
+_DEF_KEYWORDS = {"def", "func", "function", "fn"}
+_CLASS_KEYWORDS = {"class", "struct", "interface", "enum", "trait", "record"}
+_CONTROL = {"if", "for", "foreach", "while", "switch", "catch", "return", "sizeof", "elif",
+            "typeof", "with", "using", "lock", "fixed", "synchronized", "do", "else"}
+_KEYWORD_KINDS = {"if": "ast_ifs", "elif": "ast_ifs", "elseif": "ast_ifs",
+                  "for": "ast_loops", "foreach": "ast_loops", "while": "ast_loops",
+                  "return": "ast_returns", "try": "ast_trys"}
+
+
+def _stats(nodes: int, depth_sum: int, max_depth: int, children: list) -> Dict[str, Any]:
+    branching = [c for c in children if c]
+    return {
+        "ast_nodes": nodes,
+        "ast_max_depth": max_depth,
+        "ast_avg_depth": depth_sum / nodes if nodes else 0.0,
+        "ast_avg_branching": sum(branching) / len(branching) if branching else 0.0,
+        "ast_max_branching": max(branching, default=0),
+    }
+
+
+def python_stats(tree: ast.AST) -> Dict[str, Any]:
+    """Counters, depth and branching of a Python AST in one iterative pass."""
+    counts = dict.fromkeys(COUNTERS, 0)
+    children = []
+    nodes = depth_sum = max_depth = 0
+    stack = [(tree, 0)]
+    while stack:
+        node, depth = stack.pop()
+        nodes += 1
+        depth_sum += depth
+        max_depth = max(max_depth, depth)
+        kind = _NODE_KINDS.get(type(node))
+        if kind:
+            counts[kind] += 1
+        kids = list(ast.iter_child_nodes(node))
+        children.append(len(kids))
+        stack.extend((kid, depth + 1) for kid in kids)
+    return {**_stats(nodes, depth_sum, max_depth, children), **counts}
+
+
+def token_stats(tokens) -> Dict[str, Any]:
+    """The same statistics over the bracket tree of a token stream.
+
+    The root holds the top-level tokens, every ()/[]/{} pair is an inner node and tokens
+    are leaves. `name(...)` is a call unless a `{` block follows it (modifiers such as
+    `const` or `throws E` may sit in between), in which case it is a definition; so is
+    every definition keyword (def/func/function/fn).
+    """
+    counts = dict.fromkeys(COUNTERS, 0)
+    children = []
+    stack = [0]         # child counts of the open groups, root first
+    opener = [False]    # whether each open group is the `(` of `name(`
+    depth_sum = max_depth = leaves = 0
+    prev = None         # previous token, when it was a name
+    in_header = False   # between a definition keyword and its body
+    pending = False     # a `name(...)` just closed: call or definition?
+
+    for kind, text in tokens:
+        if pending and not (kind == "name" and text not in _CONTROL):
+            pending = False
+            counts["ast_funcs" if text == "{" else "ast_calls"] += 1
+
+        stack[-1] += 1
+        depth = len(stack)
+        if kind == "close":
+            stack[-1] -= 1
+            if len(stack) > 1:
+                children.append(stack.pop())
+                pending = opener.pop() and text == ")"
+            prev = None
+            continue
+
+        depth_sum += depth
+        max_depth = max(max_depth, depth)
+        if kind == "open":
+            opener.append(text == "(" and prev is not None and prev not in _CONTROL and not in_header)
+            stack.append(0)
+            if text == "{":
+                in_header = False
+        else:
+            leaves += 1
+            if kind == "name":
+                if text in _DEF_KEYWORDS:
+                    counts["ast_funcs"] += 1
+                    in_header = True
+                elif prev in _CLASS_KEYWORDS:
+                    counts["ast_classes"] += 1
+                elif text in _KEYWORD_KINDS:
+                    counts[_KEYWORD_KINDS[text]] += 1
+            elif text in (";", ":"):
+                in_header = False
+        prev = text if kind == "name" else None
+
+    if pending:
+        counts["ast_calls"] += 1
+    while len(stack) > 1:  # unbalanced input: close what is still open
+        children.append(stack.pop())
+    children.append(stack[0])
+    groups = len(children) - 1
+    return {**_stats(1 + groups + leaves, depth_sum, max_depth, children), **counts}
+
 
 class ASTStatsExtractor(FeatureExtractor):
-    """Ex: nr. noduri/funcții/clase din AST-ul Python (fallback dacă nu e python)."""
+    """Structural stats: node counts, depth and branching of the parsed code.
+
+    Python goes through its real AST; other languages (and Python that does not parse)
+    through the bracket tree of `features.parse_cache.tokenize`. Parses come from the shared
+    `parse_code` cache, so a chain of extractors parses each snippet once.
+    """
+    cache_version = "ast/1"
+
     def extract_features(self, code: str, lang: str | None = None) -> Dict[str, Any]:
-        if (lang or "").lower() != "python":
-            return {"ast_nodes": 0, "ast_funcs": 0, "ast_classes": 0}
-        import ast
-        try:
-            tree = ast.parse(code)
-        except Exception:
-            return {"ast_nodes": 0, "ast_funcs": 0, "ast_classes": 0}
-        nodes = list(ast.walk(tree))
-        funcs = sum(1 for n in nodes if isinstance(n, ast.FunctionDef))
-        classes = sum(1 for n in nodes if isinstance(n, ast.ClassDef))
-        return {"ast_nodes": len(nodes), "ast_funcs": funcs, "ast_classes": classes}
+        parsed = parse_code(code, lang)
+        if parsed.tree is not None:
+            feats = python_stats(parsed.tree)
+            feats["ast_parser"] = "python"
+        else:
+            feats = token_stats(parsed.tokens)
+            feats["ast_parser"] = "tokens"
+        return feats
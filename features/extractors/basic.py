@@ -1,10 +1,28 @@
 from ..base import FeatureExtractor
+from core.preprocessor import to_string_array
 
 import re
 import numpy as np
+import pyarrow.compute as pc
+
+KEYWORDS = ("for", "while", "if", "class", "def", "return", "function", "var", "let", "const")
+_KEYWORDS = r"\b(" + "|".join(KEYWORDS) + r")\b"
+# str.strip() whitespace restricted to ASCII (lines are already split on "\n")
+_NON_BLANK = r"[^\t\x0B\x0C\r \x1C-\x1F]"
+
 
 class BasicFeatureExtractor(FeatureExtractor):
-    def extract_features(self, code: str):
+    cache_version = "basic/1"
+    FEATURE_ORDER = (
+        "n_lines",
+        "avg_line_len",
+        "n_chars",
+        "n_tabs",
+        "n_spaces",
+        "n_keywords",
+    )
+
+    def extract_features(self, code: str, lang: str | None = None):
         lines = code.split("\n")
         line_lengths = [len(l) for l in lines if l.strip()]
 
@@ -14,9 +32,43 @@ class BasicFeatureExtractor(FeatureExtractor):
             "n_chars": len(code),
             "n_tabs": code.count("\t"),
             "n_spaces": code.count(" "),
-            "n_keywords": len(re.findall(r"\b(for|while|if|class|def|return|function|var|let|const)\b", code)),
+            "n_keywords": len(re.findall(_KEYWORDS, code)),
         }
 
         return features
 
+    def extract_batch(self, codes) -> np.ndarray:
+        """Columnar `extract_features` over a list / pandas Series / pyarrow string column.
+
+        Returns a float32 matrix of shape (n, 6) with columns in FEATURE_ORDER.
+        Rows containing non-ASCII text go through `extract_features`, since the arrow
+        regex engine only knows ASCII word boundaries and whitespace.
+        """
+        arr = to_string_array(codes)
+        n = len(arr)
+        X = np.zeros((n, len(self.FEATURE_ORDER)), dtype=np.float32)
+        if n == 0:
+            return X
+
+        lines = pc.split_pattern(arr, "\n")
+        flat = pc.list_flatten(lines)
+        parent = pc.list_parent_indices(lines).to_numpy()
+        non_blank = pc.match_substring_regex(flat, _NON_BLANK).to_numpy(zero_copy_only=False)
+        line_len = pc.utf8_length(flat).to_numpy()
+
+        len_sum = np.bincount(parent, weights=line_len * non_blank, minlength=n)
+        len_cnt = np.bincount(parent, weights=non_blank, minlength=n)
+
+        X[:, 0] = pc.list_value_length(lines).to_numpy()
+        X[:, 1] = np.divide(len_sum, len_cnt, out=np.zeros(n), where=len_cnt > 0)
+        X[:, 2] = pc.utf8_length(arr).to_numpy()
+        X[:, 3] = pc.count_substring(arr, "\t").to_numpy()
+        X[:, 4] = pc.count_substring(arr, " ").to_numpy()
+        X[:, 5] = pc.count_substring_regex(arr, _KEYWORDS).to_numpy()
+
+        ascii_mask = pc.string_is_ascii(arr).to_numpy(zero_copy_only=False)
+        for i in np.flatnonzero(~ascii_mask):
+            feats = self.extract_features(arr[i].as_py())
+            X[i] = [float(feats[f]) for f in self.FEATURE_ORDER]
 
+        return X
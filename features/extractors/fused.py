@@ -0,0 +1,91 @@
+from __future__ import annotations
+from typing import Dict, Any
+
+import numpy as np
+
+from ..base import FeatureExtractor
+from ..codepoints import codepoints, classify, is_space, is_word, runs, pack_words, word_key, ranges, ASCII_CTRL
+from .basic import BasicFeatureExtractor, KEYWORDS
+from core.preprocessor import Preprocessor
+
+class FusedBasicExtractor(FeatureExtractor):
+    """`BasicFeatureExtractor` features of `Preprocessor().clean(code)`, computed on the raw code.
+
+    The cleaning steps are folded into boolean masks over the code points, so there is no
+    intermediate cleaned string and no per-line Python work. Takes RAW code: use it with
+    `PredictionFacade(model, None, FusedBasicExtractor())`.
+
+    Below `min_vectorized` chars the fixed numpy overhead outweighs the scan, so short
+    snippets go through the regular clean + extract path.
+    """
+    # same features as Preprocessor + BasicFeatureExtractor, so both share cache entries
+    cache_version = f"{Preprocessor.cache_version}+{BasicFeatureExtractor.cache_version}"
+    _KEYWORD_KEYS = np.array([word_key(k) for k in KEYWORDS], dtype=np.uint64)
+
+    def __init__(self, min_vectorized: int = 1024) -> None:
+        self.min_vectorized = min_vectorized
+        self._preprocessor = Preprocessor()
+        self._basic = BasicFeatureExtractor()
+
+    def extract_features(self, code: str, lang: str | None = None) -> Dict[str, Any]:
+        if not isinstance(code, str):
+            code = ""
+        if len(code) < self.min_vectorized:
+            return self._basic.extract_features(self._preprocessor.clean(code))
+        cp = codepoints(code)
+
+        # clean: drop control chars, fold "\r\n" and lone "\r" into "\n"
+        ctrl = classify(cp, ASCII_CTRL, lambda ch: False)
+        if ctrl.any():
+            cp = cp[~ctrl]
+        cr = cp == 13
+        if cr.any():
+            crlf = np.append(cr[:-1] & (cp[1:] == 10), False)
+            cp = cp[~crlf]
+            cp = np.where(cp == 13, 10, cp).astype(cp.dtype)
+
+        n = len(cp)
+        nl = cp == 10
+        n_lines = int(np.count_nonzero(nl)) + 1
+        if n == 0:
+            return {"n_lines": 1, "avg_line_len": 0.0, "n_chars": 0,
+                    "n_tabs": 0, "n_spaces": 0, "n_keywords": 0}
+
+        # rstrip: whitespace after the last solid char of each line is dropped
+        ws = is_space(cp)
+        solid = np.flatnonzero(~ws)
+        stops = np.append(np.flatnonzero(nl), n)
+        line_starts = np.append(0, stops[:-1] + 1)
+        k = np.searchsorted(solid, stops) - 1
+        last_solid = solid[np.maximum(k, 0)] if len(solid) else np.zeros_like(k)
+        has_solid = (k >= 0) & (last_solid >= line_starts)
+        trail_from = np.where(has_solid, last_solid + 1, line_starts)
+        kept = np.ones(n, dtype=bool)
+        kept[ranges(trail_from, stops - trail_from)] = False
+
+        # tab / space runs collapse to a single char
+        tab = (cp == 9) & kept
+        space = (cp == 32) & kept
+        tab_runs = int(tab[0]) + int(np.count_nonzero(tab[1:] & ~tab[:-1]))
+        space_runs = int(space[0]) + int(np.count_nonzero(space[1:] & ~space[:-1]))
+        n_chars = (int(np.count_nonzero(kept))
+                   - (int(np.count_nonzero(tab)) - tab_runs)
+                   - (int(np.count_nonzero(space)) - space_runs))
+
+        # blank lines are empty once cleaned, so non-blank lines hold every non-newline char
+        n_solid_lines = int(np.count_nonzero(has_solid))
+        avg_line_len = (n_chars - (n_lines - 1)) / n_solid_lines if n_solid_lines else 0.0
+
+        # whitespace edits never move a word boundary, so keywords are counted on the folded text
+        starts, lengths = runs(is_word(cp))
+        keys = pack_words(cp, starts, lengths)
+        n_keywords = int(np.count_nonzero(np.isin(keys, self._KEYWORD_KEYS)))
+
+        return {
+            "n_lines": n_lines,
+            "avg_line_len": avg_line_len,
+            "n_chars": n_chars,
+            "n_tabs": tab_runs,
+            "n_spaces": space_runs,
+            "n_keywords": n_keywords,
+        }
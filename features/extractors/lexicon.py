@@ -0,0 +1,130 @@
+from __future__ import annotations
+from typing import Dict, Any
+from collections import Counter
+from functools import lru_cache
+import re
+
+import numpy as np
+
+from ..base import FeatureExtractor
+from ..lexicons import LEXICONS, normalize_language
+
+# identifiers, optionally qualified: a.b, a::b, a->b
+_TOKEN = re.compile(r"\w+(?:(?:\.|::|->)\w+)*")
+_SEP = re.compile(r"\.|::|->")
+_END = None  # trie key holding the term ids that end at a node
+
+
+class Lexicon:
+    """Token-level trie over every (language, category, term) of a lexicon table.
+
+    `count` tokenizes the code once and walks the trie once per *distinct* token, so the
+    cost does not grow with the number of terms. Qualified names match component by
+    component, e.g. "System.out.println(x)" hits the Java builtin "System" and the API
+    name "System.out.println".
+    """
+
+    def __init__(self, lexicons: Dict[str, Dict[str, tuple]] = LEXICONS, cache_size: int = 1 << 16) -> None:
+        self.languages = tuple(lexicons)
+        self.categories = tuple(sorted({c for cats in lexicons.values() for c in cats}))
+        self.terms: list[tuple[str, str, str]] = []
+        self._root: dict = {}
+        for lang, cats in lexicons.items():
+            for cat, terms in cats.items():
+                for term in terms:
+                    node = self._root
+                    for part in _SEP.split(term):
+                        node = node.setdefault(part, {})
+                    node.setdefault(_END, []).append(len(self.terms))
+                    self.terms.append((lang, cat, term))
+
+        self._lang_of = np.array([self.languages.index(t[0]) for t in self.terms], dtype=np.intp)
+        self._cat_of = np.array([self.categories.index(t[1]) for t in self.terms], dtype=np.intp)
+        # a term shared by k languages is 1/k evidence for each of them
+        owners = Counter(term for _, _, term in set(self.terms))
+        self._weight = np.array([1.0 / owners[t[2]] for t in self.terms])
+        self._lookup = lru_cache(maxsize=cache_size)(self._walk)
+
+    def _walk(self, token: str) -> tuple:
+        parts = _SEP.split(token)
+        hits = []
+        for i in range(len(parts)):
+            node = self._root
+            for part in parts[i:]:
+                node = node.get(part)
+                if node is None:
+                    break
+                hits.extend(node.get(_END, ()))
+        return tuple(hits)
+
+    def count(self, code: str) -> np.ndarray:
+        """Occurrences of every term (indexed like `self.terms`) in a single pass over `code`."""
+        counts = np.zeros(len(self.terms))
+        if not code:
+            return counts
+        ids, weights = [], []
+        for token, n in Counter(_TOKEN.findall(code)).items():
+            hits = self._lookup(token)
+            ids.extend(hits)
+            weights.extend([n] * len(hits))
+        if ids:
+            np.add.at(counts, np.asarray(ids, dtype=np.intp), weights)
+        return counts
+
+    def table(self, counts: np.ndarray) -> np.ndarray:
+        """(languages x categories) totals of `counts`."""
+        out = np.zeros((len(self.languages), len(self.categories)))
+        np.add.at(out, (self._lang_of, self._cat_of), counts)
+        return out
+
+    def detect(self, counts: np.ndarray) -> str | None:
+        """Language whose lexicon best explains `counts` (None if nothing matched)."""
+        scores = np.bincount(self._lang_of, weights=counts * self._weight, minlength=len(self.languages))
+        if not scores.any():
+            return None
+        return self.languages[int(np.argmax(scores))]
+
+
+@lru_cache(maxsize=None)
+def default_lexicon() -> Lexicon:
+    return Lexicon()
+
+
+def detect_language(code: str) -> str | None:
+    """Best-effort language guess from the default lexicon."""
+    lex = default_lexicon()
+    return lex.detect(lex.count(code))
+
+
+class LexiconExtractor(FeatureExtractor):
+    """Per-language lexicon counts: `lex_<category>` for keywords, builtins and API names.
+
+    `lang` picks the lexicon; when it is missing or unknown the language is detected from
+    the same counts. `per_term=True` also emits `lex_<category>__<term>` for every hit.
+    """
+    def __init__(self, lexicon: Lexicon | None = None, per_term: bool = False) -> None:
+        self.lexicon = lexicon or default_lexicon()
+        self.per_term = per_term
+        # custom lexicons are not versioned, so only the default one is cacheable
+        if lexicon is None:
+            self.cache_version = "lexicon/1" + ("+terms" if per_term else "")
+
+    def extract_features(self, code: str, lang: str | None = None) -> Dict[str, Any]:
+        lex = self.lexicon
+        counts = lex.count(code)
+        language = normalize_language(lang)
+        if language not in lex.languages:
+            language = lex.detect(counts)
+
+        feats: Dict[str, Any] = {"lex_lang": language or "unknown"}
+        row = lex.table(counts)[lex.languages.index(language)] if language else np.zeros(len(lex.categories))
+        for cat, value in zip(lex.categories, row):
+            feats[f"lex_{cat}"] = int(value)
+        feats["lex_total"] = int(row.sum())
+
+        if self.per_term and language:
+            for i in np.flatnonzero(counts):
+                term_lang, cat, term = lex.terms[i]
+                if term_lang == language:
+                    feats[f"lex_{cat}__{term}"] = int(counts[i])
+        return feats
@@ -1,20 +1,115 @@
 from __future__ import annotations
-from typing import Dict, Any
-from collections import Counter
+from typing import Dict, Any, List, Iterable
+
+import numpy as np
+
 from ..base import FeatureExtractor
+from ..codepoints import codepoints
+
+
+_TABLE_LIMIT = 1 << 22
+
+
+def _dense(keys: np.ndarray, bound: int | None = None):
+    """(distinct keys, index of each key among them), i.e. np.unique(return_inverse).
+
+    Keys known to be < `bound` (a small bound) go through a lookup table instead of a sort.
+    """
+    if bound is not None and bound <= _TABLE_LIMIT:
+        present = np.zeros(bound, dtype=bool)
+        present[keys] = True
+        return np.flatnonzero(present), (np.cumsum(present) - 1)[keys]
+    uniq = np.unique(keys)
+    return uniq, np.searchsorted(uniq, keys)
+
+
+def _gram_ids(cp: np.ndarray, k: int):
+    """(ids, bound): one integer id < bound per k-char window of `cp`; equal ids <=> equal grams."""
+    n = len(cp)
+    bits = 8 if cp.dtype == np.uint8 else 21
+    packed = 64 // bits
+    ids_of = {}
+
+    def ids(length: int) -> np.ndarray:
+        if length not in ids_of:
+            m = n - length + 1
+            if length <= packed:
+                # exact packing: char j of the window lands in bits [j*bits, (j+1)*bits)
+                out = np.zeros(m, dtype=np.uint64)
+                for j in range(length):
+                    out |= cp[j:j + m].astype(np.uint64) << np.uint64(j * bits)
+            else:
+                # longer grams: pair up the dense ids of the two halves
+                half = length // 2
+                left = _dense(ids(half))[1][:m].astype(np.uint64)
+                right = _dense(ids(length - half))[1][half:half + m].astype(np.uint64)
+                out = left * np.uint64(n) + right
+            ids_of[length] = out
+        return ids_of[length]
+
+    bound = 1 << (bits * k) if k <= packed else None
+    return ids(k), bound
+
 
 class NgramStatsExtractor(FeatureExtractor):
     """Distribuții simple de caractere / bigrame (limbă-agnostic)."""
     def __init__(self, k: int = 2, top: int = 10) -> None:
         self.k = k; self.top = top
+        self.cache_version = f"ngram{k}x{top}/1"
 
     def extract_features(self, code: str, lang: str | None = None) -> Dict[str, Any]:
-        s = code.replace("\n"," ")
-        grams = [s[i:i+self.k] for i in range(len(s)-self.k+1)]
-        freq = Counter(grams).most_common(self.top)
-        # aplatizăm ca f1_gram=cnt
-        out = {}
-        for i,(g,c) in enumerate(freq, start=1):
-            out[f"ngram_{self.k}_{i}__{g}"] = c
-        out[f"ngram_{self.k}_uniq"] = len(set(grams))
+        return self.extract_batch([code])[0]
+
+    def extract_batch(self, codes: Iterable[str]) -> List[Dict[str, Any]]:
+        """Top-k gram counts for many documents in one vectorized pass.
+
+        Grams are packed into integer codes and counted with unique / bincount. They never
+        span two documents, and ties keep `Counter.most_common` order (first occurrence).
+        """
+        codes = [c if isinstance(c, str) else "" for c in codes]
+        k = self.k
+        text = "".join(codes).replace("\n", " ")
+        lengths = np.array([len(c) for c in codes], dtype=np.int64)
+        ends = np.cumsum(lengths)
+        out: List[Dict[str, Any]] = [{f"ngram_{k}_uniq": 0} for _ in codes]
+        if len(text) < k:
+            return out
+
+        # a window starting at i is valid if it ends inside the same document
+        doc = np.repeat(np.arange(len(codes)), lengths)
+        starts = np.arange(len(text) - k + 1)
+        valid = starts + k <= ends[doc[starts]]
+        if not valid.any():
+            return out
+        ids, bound = _gram_ids(codepoints(text), k)
+        ids = ids[valid]
+        doc, starts = doc[:len(starts)][valid], starts[valid]
+
+        # group equal (doc, gram) pairs
+        grams, gram_idx = _dense(ids, bound)
+        if len(codes) > 1:
+            groups, group_idx = _dense(doc * len(grams) + gram_idx, len(codes) * len(grams))
+        else:
+            groups, group_idx = np.arange(len(grams)), gram_idx
+        group_doc = groups // len(grams)
+        group_count = np.bincount(group_idx, minlength=len(groups))
+        group_first = np.full(len(groups), len(text))
+        np.minimum.at(group_first, group_idx, starts)
+
+        # per document: count desc, then first occurrence
+        rank_order = np.lexsort((group_first, -group_count, group_doc))
+        ranked_doc = group_doc[rank_order]
+        doc_begin = np.searchsorted(ranked_doc, np.arange(len(codes)))
+        rank = np.arange(len(rank_order)) - doc_begin[ranked_doc]
+        uniq = np.bincount(group_doc, minlength=len(codes))
+
+        out = [{} for _ in codes]
+        for j in np.flatnonzero(rank < self.top).tolist():
+            grp = rank_order[j]
+            pos = int(group_first[grp])
+            i = int(group_doc[grp])
+            # aplatizăm ca f1_gram=cnt
+            out[i][f"ngram_{k}_{int(rank[j]) + 1}__{text[pos:pos + k]}"] = int(group_count[grp])
+        for o, c in zip(out, uniq.tolist()):
+            o[f"ngram_{k}_uniq"] = c
         return out
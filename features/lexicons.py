@@ -0,0 +1,233 @@
+"""Per-language lexicons: keywords, builtins and common API names.
+
+Qualified API names use the language's own separator ("." / "::" / "->"); the lexicon
+engine in `features.extractors.lexicon` matches them component by component.
+"""
+from __future__ import annotations
+
+
+def _words(text: str) -> tuple:
+    return tuple(text.split())
+
+
+LEXICONS = {
+    "python": {
+        "keyword": _words("""
+            False None True and as assert async await break class continue def del elif
+            else except finally for from global if import in is lambda nonlocal not or
+            pass raise return try while with yield match case
+        """),
+        "builtin": _words("""
+            abs all any ascii bin bool breakpoint bytearray bytes callable chr classmethod
+            compile complex delattr dict dir divmod enumerate eval exec filter float format
+            frozenset getattr globals hasattr hash help hex id input int isinstance
+            issubclass iter len list locals map max memoryview min next object oct open ord
+            pow print property range repr reversed round set setattr slice sorted
+            staticmethod str sum super tuple type vars zip self cls __init__ __name__
+            __main__ __repr__ __str__ __len__ __eq__ Exception ValueError TypeError KeyError
+            IndexError RuntimeError AttributeError NotImplementedError StopIteration
+        """),
+        "api": _words("""
+            os.path.join os.path.exists os.listdir os.makedirs os.environ os.getenv
+            sys.argv sys.exit sys.stdin sys.stdout sys.stdin.readline sys.setrecursionlimit
+            json.load json.loads json.dump json.dumps re.compile re.match re.search
+            re.findall re.sub math.sqrt math.floor math.ceil math.inf math.gcd
+            collections.Counter collections.defaultdict collections.deque itertools.chain
+            itertools.product itertools.combinations itertools.permutations
+            functools.lru_cache functools.reduce functools.partial functools.wraps
+            np.array np.zeros np.ones np.arange np.mean np.sum np.where pd.DataFrame
+            pd.read_csv logging.getLogger typing.List typing.Dict typing.Optional
+            dataclasses.dataclass time.time random.randint random.choice random.shuffle
+            heapq.heappush heapq.heappop bisect.bisect_left bisect.bisect_right
+            append extend insert pop remove split strip join items keys values get
+            startswith endswith replace readline readlines lower upper setdefault
+        """),
+    },
+    "cpp": {
+        "keyword": _words("""
+            alignas alignof and asm auto bool break case catch char char16_t char32_t class
+            const constexpr const_cast continue decltype default delete do double
+            dynamic_cast else enum explicit export extern false final float for friend goto
+            if inline int long mutable namespace new noexcept not nullptr operator or
+            override private protected public register reinterpret_cast return short signed
+            sizeof static static_assert static_cast struct switch template this
+            thread_local throw true try typedef typeid typename union unsigned using virtual
+            void volatile wchar_t while
+        """),
+        "builtin": _words("""
+            std cout cin cerr endl string vector map set multiset unordered_map
+            unordered_set pair tuple queue stack deque priority_queue array list bitset
+            size_t int64_t uint64_t int32_t printf scanf malloc free memset memcpy strlen
+            main NULL include define ifdef ifndef endif pragma iostream bits stdc
+        """),
+        "api": _words("""
+            std::cout std::cin std::cerr std::endl std::vector std::string std::map
+            std::set std::pair std::sort std::max std::min std::swap std::move
+            std::make_pair std::unique_ptr std::shared_ptr std::make_unique
+            std::make_shared std::accumulate std::lower_bound std::upper_bound
+            std::reverse std::find std::to_string std::getline std::abs
+            std::ios::sync_with_stdio ios_base::sync_with_stdio ios::sync_with_stdio
+            cin.tie push_back emplace_back pop_back begin end size empty insert erase find
+            count front back clear resize reserve substr c_str first second
+        """),
+    },
+    "c": {
+        "keyword": _words("""
+            auto break case char const continue default do double else enum extern float
+            for goto if inline int long register restrict return short signed sizeof
+            static struct switch typedef union unsigned void volatile while _Bool _Complex
+            _Static_assert
+        """),
+        "builtin": _words("""
+            printf scanf sprintf sscanf fprintf fscanf malloc calloc realloc free memset
+            memcpy memmove strlen strcpy strncpy strcmp strncmp strcat strchr strstr fopen
+            fclose fgets fputs puts getchar putchar exit abs qsort atoi NULL EOF size_t
+            main include define stdio stdlib stdbool FILE
+        """),
+        "api": _words("""
+            stdin stdout stderr INT_MAX INT_MIN LLONG_MAX RAND_MAX EXIT_SUCCESS EXIT_FAILURE
+        """),
+    },
+    "java": {
+        "keyword": _words("""
+            abstract assert boolean break byte case catch char class const continue default
+            do double else enum extends final finally float for goto if implements import
+            instanceof int interface long native new package private protected public
+            return short static strictfp super switch synchronized this throw throws
+            transient try void volatile while var record yield sealed permits true false
+            null
+        """),
+        "builtin": _words("""
+            String Integer Long Double Boolean Character Object Math System List ArrayList
+            LinkedList Map HashMap TreeMap Set HashSet TreeSet Arrays Collections Scanner
+            StringBuilder Exception RuntimeException IOException IllegalArgumentException
+            Override Thread Runnable Iterator Optional Stream Objects BufferedReader
+            InputStreamReader main args
+        """),
+        "api": _words("""
+            System.out.println System.out.print System.out.printf System.in System.exit
+            System.currentTimeMillis Math.max Math.min Math.abs Math.sqrt Math.pow
+            Integer.parseInt Integer.MAX_VALUE Integer.MIN_VALUE Integer.valueOf
+            String.valueOf String.format Arrays.sort Arrays.asList Arrays.fill
+            Arrays.stream Collections.sort Collections.reverse List.of Map.of
+            Objects.equals Objects.hash Optional.of Optional.empty Thread.sleep
+            Collectors.toList add get put size isEmpty contains containsKey equals hashCode
+            toString charAt substring length nextInt nextLine append stream collect
+            forEach getOrDefault
+        """),
+    },
+    "javascript": {
+        "keyword": _words("""
+            await break case catch class const continue debugger default delete do else
+            export extends false finally for function if import in instanceof let new null
+            return super switch this throw true try typeof var void while with yield async
+            of static undefined
+        """),
+        "builtin": _words("""
+            console Math JSON Object Array String Number Boolean Promise Map Set WeakMap
+            Symbol Date RegExp Error TypeError parseInt parseFloat isNaN setTimeout
+            setInterval clearTimeout require module exports window document process Buffer
+            fetch
+        """),
+        "api": _words("""
+            console.log console.error console.warn JSON.stringify JSON.parse Object.keys
+            Object.values Object.entries Object.assign Object.freeze Array.isArray
+            Array.from Promise.all Promise.resolve Promise.reject Math.floor Math.ceil
+            Math.max Math.min Math.random Math.round Math.abs module.exports
+            document.getElementById document.querySelector window.addEventListener
+            process.env process.argv process.stdin process.stdout.write map filter reduce
+            forEach push pop shift slice splice join split includes indexOf then
+            addEventListener toFixed trim length
+        """),
+    },
+    "csharp": {
+        "keyword": _words("""
+            abstract as base bool break byte case catch char checked class const continue
+            decimal default delegate do double else enum event explicit extern false
+            finally fixed float for foreach goto if implicit in int interface internal is
+            lock long namespace new null object operator out override params private
+            protected public readonly ref return sbyte sealed short sizeof stackalloc
+            static string struct switch this throw true try typeof uint ulong unchecked
+            unsafe ushort using virtual void volatile while async await var get set value
+            yield
+        """),
+        "builtin": _words("""
+            Console String Int32 Int64 List Dictionary HashSet Math Convert Exception Task
+            IEnumerable IList StringBuilder DateTime Guid Main args
+        """),
+        "api": _words("""
+            Console.WriteLine Console.ReadLine Console.Write Convert.ToInt32 int.Parse
+            long.Parse string.Join string.IsNullOrEmpty Math.Max Math.Min Math.Abs
+            Enumerable.Range Task.Run Add Count Length ToList ToArray Select Where OrderBy
+            FirstOrDefault Any ToString Split Trim Contains ContainsKey TryGetValue
+        """),
+    },
+    "go": {
+        "keyword": _words("""
+            break case chan const continue default defer else fallthrough for func go goto
+            if import interface map package range return select struct switch type var
+            true false nil iota
+        """),
+        "builtin": _words("""
+            append cap close complex copy delete imag len make new panic print println real
+            recover bool byte error float32 float64 int int32 int64 rune string uint uint64
+            fmt os strings strconv sort bufio main
+        """),
+        "api": _words("""
+            fmt.Println fmt.Printf fmt.Sprintf fmt.Sprint fmt.Scan fmt.Scanf fmt.Errorf
+            fmt.Fprintln errors.New strings.Split strings.Join strings.Contains
+            strings.TrimSpace strings.Fields strconv.Itoa strconv.Atoi sort.Ints sort.Slice
+            os.Exit os.Args os.Stdin os.Stdout bufio.NewReader bufio.NewScanner
+            bufio.NewWriter time.Now sync.WaitGroup sync.Mutex http.HandleFunc
+        """),
+    },
+    "php": {
+        "keyword": _words("""
+            abstract and array as break callable case catch class clone const continue
+            declare default do echo else elseif empty enddeclare endfor endforeach endif
+            endswitch endwhile extends final finally fn for foreach function global goto if
+            implements include include_once instanceof insteadof interface isset list match
+            namespace new or print private protected public readonly require require_once
+            return static switch throw trait try unset use var while xor yield null true
+            false
+        """),
+        "builtin": _words("""
+            strlen count array_push array_pop array_map array_filter array_keys
+            array_values array_merge in_array explode implode str_replace substr strpos
+            sprintf printf json_encode json_decode var_dump print_r intval floatval trim
+            file_get_contents preg_match preg_replace this self parent php
+        """),
+        "api": _words("""
+            PDO::FETCH_ASSOC PHP_EOL PHP_INT_MAX self::class static::class parent::__construct
+            __construct __destruct __get __set
+        """),
+    },
+}
+
+LANGUAGE_ALIASES = {
+    "py": "python", "python3": "python",
+    "c++": "cpp", "cc": "cpp", "cxx": "cpp",
+    "js": "javascript", "node": "javascript", "typescript": "javascript", "ts": "javascript",
+    "c#": "csharp", "cs": "csharp",
+    "golang": "go",
+}
+
+LINE_COMMENTS = {
+    "python": "#",
+    "cpp": "//",
+    "c": "//",
+    "java": "//",
+    "javascript": "//",
+    "csharp": "//",
+    "go": "//",
+    "php": "//",
+}
+
+
+def normalize_language(lang: str | None) -> str | None:
+    """Canonical lexicon key for `lang` ("py" -> "python", "C++" -> "cpp"), None if unknown."""
+    if not lang:
+        return None
+    key = lang.strip().lower()
+    key = LANGUAGE_ALIASES.get(key, key)
+    return key if key in LEXICONS else None
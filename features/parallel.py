@@ -0,0 +1,199 @@
+"""Process-pool feature extraction for the training and evaluation scripts.
+
+Rows are cut into chunks (work units) that workers run through the columnar
+`clean_batch` + `extract_batch` path. A chunk gets `row_timeout` plus a small per-row
+budget; if it fails or overruns, the worker retries it row by row, each row with its own
+`row_timeout`, so a single bad or pathological input only loses its own row, which is
+flagged in the `failed` mask and left as zeros. A worker that hangs (e.g. inside a C regex
+kernel, where the alarm cannot interrupt it) or dies (e.g. OOM-killed) takes down the
+pool: the pool is rebuilt and the chunk re-run alone, split in halves until the culprit
+row is found. Results are yielded in input order, and progress goes to the attached
+`events.observer` observers.
+"""
+from __future__ import annotations
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Sequence, Tuple
+import os
+import signal
+import threading
+
+import numpy as np
+
+from events.observer import ProgressSubject
+
+CHUNK_ROWS = 1024
+ROW_TIMEOUT = 5.0       # seconds per row before it counts as pathological
+BATCH_ROW_BUDGET = 0.02  # extra seconds per row the columnar pass of a chunk may take
+
+
+def chunk_deadline(rows: int, row_timeout: float = ROW_TIMEOUT) -> float:
+    """Seconds the columnar pass over a chunk gets before it falls back to per-row isolation."""
+    return row_timeout + BATCH_ROW_BUDGET * rows
+
+
+class ExtractionTimeout(Exception):
+    pass
+
+
+@contextmanager
+def _deadline(seconds: float):
+    """Raise ExtractionTimeout after `seconds` (SIGALRM, main thread of a POSIX process only)."""
+    if not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def _expire(signum, frame):
+        raise ExtractionTimeout()
+
+    previous = signal.signal(signal.SIGALRM, _expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+# state of a worker process, set once by the pool initializer
+_worker: dict = {}
+
+
+def _init_worker(preprocessor, extractor, row_timeout: float) -> None:
+    _worker.update(preprocessor=preprocessor, extractor=extractor, row_timeout=row_timeout)
+
+
+def _extract(codes: Sequence[str], preprocessor, extractor) -> np.ndarray:
+    return np.asarray(extractor.extract_batch(preprocessor.clean_batch(list(codes))), dtype=np.float32)
+
+
+def _run_chunk(codes: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """(X, failed) for one work unit: the whole chunk at once, else row by row."""
+    pre, fx, row_timeout = _worker["preprocessor"], _worker["extractor"], _worker["row_timeout"]
+    try:
+        with _deadline(chunk_deadline(len(codes), row_timeout)):
+            return _extract(codes, pre, fx), np.zeros(len(codes), dtype=bool)
+    except Exception:
+        pass
+    X = np.zeros((len(codes), len(fx.FEATURE_ORDER)), dtype=np.float32)
+    failed = np.zeros(len(codes), dtype=bool)
+    for i, code in enumerate(codes):
+        try:
+            with _deadline(row_timeout):
+                X[i] = _extract([code], pre, fx)[0]
+        except Exception:
+            failed[i] = True
+    return X, failed
+
+
+@dataclass
+class ExtractionResult:
+    X: np.ndarray           # (n_rows, n_features) float32; failed rows are zeros
+    failed: np.ndarray      # (n_rows,) bool
+
+
+class ParallelExtractor(ProgressSubject):
+    """Order-preserving, chunked feature extraction across a ProcessPoolExecutor.
+
+    `workers=1` (or a single chunk) runs in-process with the same failure isolation.
+    """
+
+    def __init__(self, preprocessor, extractor, workers: int | None = None,
+                 chunk_rows: int = CHUNK_ROWS, row_timeout: float = ROW_TIMEOUT) -> None:
+        super().__init__()
+        self.preprocessor = preprocessor
+        self.extractor = extractor
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_rows = chunk_rows
+        self.row_timeout = row_timeout
+
+    def extract(self, codes: Sequence[str]) -> ExtractionResult:
+        codes = [c if isinstance(c, str) else "" for c in codes]
+        chunks = (codes[i:i + self.chunk_rows] for i in range(0, len(codes), self.chunk_rows))
+        Xs, failed = [], []
+        for X, bad in self.iter_extract(chunks, total=len(codes)):
+            Xs.append(X)
+            failed.append(bad)
+        if not Xs:
+            return ExtractionResult(np.zeros((0, len(self.extractor.FEATURE_ORDER)), dtype=np.float32),
+                                    np.zeros(0, dtype=bool))
+        return ExtractionResult(np.concatenate(Xs), np.concatenate(failed))
+
+    def iter_extract(self, chunks: Iterable[Sequence[str]], total: int | None = None
+                     ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """(X, failed) per chunk, in input order, with at most 2 * workers chunks in flight."""
+        done = 0
+        for X, failed in self._results(iter(chunks)):
+            done += len(failed)
+            payload = {"step": "extract_features", "rows": done, "failed": int(failed.sum())}
+            if total:
+                payload["progress"] = round(100 * done / total)
+            self.notify(payload)
+            yield X, failed
+
+    def _results(self, chunks: Iterator[Sequence[str]]) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        if self.workers <= 1:
+            _init_worker(self.preprocessor, self.extractor, self.row_timeout)
+            for chunk in chunks:
+                yield _run_chunk(chunk)
+            return
+
+        pool = self._pool()
+        pending: deque = deque()   # (chunk, future), oldest first
+        try:
+            while True:
+                while len(pending) < 2 * self.workers:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        break
+                    pending.append((chunk, pool.submit(_run_chunk, chunk)))
+                if not pending:
+                    return
+                chunk, future = pending.popleft()
+                try:
+                    yield future.result(timeout=self._hang_limit(len(chunk)))
+                    continue
+                except (FutureTimeout, BrokenProcessPool):
+                    # a hung or dead worker: any in-flight chunk may be the culprit, so this one
+                    # re-runs alone and the rest are resubmitted to a fresh pool
+                    self._kill(pool)
+                yield self._isolate(chunk)
+                pool = self._pool()
+                pending = deque((c, pool.submit(_run_chunk, c)) for c, _ in pending)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _hang_limit(self, rows: int) -> float:
+        # the worker enforces its own deadlines; this only catches workers the alarm cannot reach
+        return 2 * chunk_deadline(rows, self.row_timeout) + self.row_timeout
+
+    def _isolate(self, chunk: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Run `chunk` in a pool of its own, halving it while it hangs or kills its worker."""
+        pool = ProcessPoolExecutor(max_workers=1, initializer=_init_worker,
+                                   initargs=(self.preprocessor, self.extractor, self.row_timeout))
+        try:
+            return pool.submit(_run_chunk, chunk).result(timeout=self._hang_limit(len(chunk)))
+        except (FutureTimeout, BrokenProcessPool):
+            self._kill(pool)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+        if len(chunk) == 1:
+            return (np.zeros((1, len(self.extractor.FEATURE_ORDER)), dtype=np.float32),
+                    np.ones(1, dtype=bool))
+        half = len(chunk) // 2
+        (X1, f1), (X2, f2) = self._isolate(chunk[:half]), self._isolate(chunk[half:])
+        return np.concatenate([X1, X2]), np.concatenate([f1, f2])
+
+    def _pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                   initargs=(self.preprocessor, self.extractor, self.row_timeout))
+
+    @staticmethod
+    def _kill(pool: ProcessPoolExecutor) -> None:
+        # ProcessPoolExecutor cannot cancel a running task; terminating its workers is the only way out
+        for proc in list(getattr(pool, "_processes", {}).values()):
+            proc.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
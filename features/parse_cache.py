@@ -0,0 +1,95 @@
+"""Parse-once cache shared by the structural extractors and decorators.
+
+`parse_code(code, lang)` resolves the language (detecting it from the lexicons when not
+given), parses Python with `ast` and everything else (or Python that does not parse) with
+a small offline lexer. Results are kept in a bounded LRU keyed by content hash, so every
+extractor in a chain sees the same tree without parsing again.
+"""
+from __future__ import annotations
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Tuple
+import ast
+import hashlib
+import re
+import threading
+
+from .lexicons import normalize_language
+
+_LEX = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z)|\#[^\n]*)
+  | (?P<string>"(?:\\.|[^"\\\n])*"?|'(?:\\.|[^'\\\n])*'?|`(?:\\.|[^`\\])*`?)
+  | (?P<open>[(\[{])
+  | (?P<close>[)\]}])
+  | (?P<name>[^\W\d]\w*)
+  | (?P<number>\d[\w.]*)
+  | (?P<op>[^\s\w])
+""", re.S | re.X)
+
+
+@dataclass(frozen=True)
+class ParsedCode:
+    language: str | None
+    tree: ast.AST | None = None                 # Python AST, when the code parses
+    tokens: Tuple[Tuple[str, str], ...] = ()    # (kind, text) from the lexer otherwise
+
+
+def tokenize(code: str) -> Tuple[Tuple[str, str], ...]:
+    """(kind, text) tokens without whitespace and comments; kinds: string/open/close/name/number/op."""
+    return tuple(
+        (m.lastgroup, m.group())
+        for m in _LEX.finditer(code)
+        if m.lastgroup not in ("space", "comment")
+    )
+
+
+class ParseCache:
+    """Thread-safe LRU of ParsedCode keyed by (content hash, language hint)."""
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self.maxsize = maxsize
+        self._items: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(code: str, lang: str | None) -> tuple:
+        digest = hashlib.blake2b(code.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        return digest, normalize_language(lang)
+
+    def get(self, code: str, lang: str | None = None) -> ParsedCode:
+        key = self.key(code, lang)
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key]
+        parsed = self._parse(code, key[1])
+        with self._lock:
+            self._items[key] = parsed
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+        return parsed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    @staticmethod
+    def _parse(code: str, language: str | None) -> ParsedCode:
+        if language is None:
+            from .extractors.lexicon import detect_language
+            language = detect_language(code)
+        if language == "python":
+            try:
+                return ParsedCode(language, tree=ast.parse(code))
+            except (SyntaxError, ValueError, RecursionError, MemoryError):
+                pass
+        return ParsedCode(language, tokens=tokenize(code))
+
+
+_DEFAULT = ParseCache()
+
+
+def parse_code(code: str, lang: str | None = None) -> ParsedCode:
+    return _DEFAULT.get(code if isinstance(code, str) else "", lang)
@@ -0,0 +1,79 @@
+"""Cheap, rich features for the distilled student model.
+
+Three stateless blocks, stacked into one sparse row per code (no fit pass, so chunks of
+any corpus can be featurized independently and in any order):
+
+- character n-grams (2-4, within word boundaries), hashed;
+- identifier / operator tokens and their bigrams, hashed;
+- numeric code statistics: basic counts, structural AST stats, lexicon counts,
+  indentation, identifier entropy; log-scaled and hashed by name.
+"""
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction import FeatureHasher
+from sklearn.feature_extraction.text import HashingVectorizer
+
+from features.decorator import (
+    IdentifierEntropyDecorator,
+    IndentationStyleDecorator,
+    PerplexityLikeDecorator,
+    compile_pipeline,
+)
+from features.extractors.ast_stats import ASTStatsExtractor
+from features.extractors.basic import BasicFeatureExtractor
+from features.extractors.lexicon import LexiconExtractor
+
+CHAR_FEATURES = 1 << 18
+TOKEN_FEATURES = 1 << 18
+STAT_FEATURES = 1 << 10
+_TOKENS = r"[A-Za-z_]\w*|\d+|[^\w\s]{1,3}"
+
+
+class StudentFeaturizer:
+    cache_version = "student/1"
+
+    def __init__(self, char_features: int = CHAR_FEATURES, token_features: int = TOKEN_FEATURES,
+                 stat_features: int = STAT_FEATURES) -> None:
+        self.chars = HashingVectorizer(analyzer="char_wb", ngram_range=(2, 4), n_features=char_features,
+                                       alternate_sign=False, norm="l2", dtype=np.float32, lowercase=False)
+        self.tokens = HashingVectorizer(token_pattern=_TOKENS, ngram_range=(1, 2), n_features=token_features,
+                                        alternate_sign=False, norm="l2", dtype=np.float32, lowercase=False)
+        self.stats = FeatureHasher(n_features=stat_features, input_type="dict", alternate_sign=False,
+                                   dtype=np.float32)
+        self.basic = BasicFeatureExtractor()
+        self.structure = compile_pipeline(
+            IndentationStyleDecorator(IdentifierEntropyDecorator(PerplexityLikeDecorator(ASTStatsExtractor())))
+        )
+        self.lexicon = LexiconExtractor()
+
+    def config(self) -> Dict[str, int]:
+        """Constructor arguments: the featurizer has no fitted state, so this is all a model saves."""
+        return {"char_features": self.chars.n_features, "token_features": self.tokens.n_features,
+                "stat_features": self.stats.n_features}
+
+    @property
+    def n_features(self) -> int:
+        return self.chars.n_features + self.tokens.n_features + self.stats.n_features
+
+    def _stat_dict(self, code: str, basic_row: np.ndarray) -> Dict[str, Any]:
+        feats: Dict[str, Any] = dict(zip(self.basic.FEATURE_ORDER, basic_row.tolist()))
+        feats.update(self.structure.extract_features(code))
+        feats.update(self.lexicon.extract_features(code))
+        out: Dict[str, Any] = {}
+        for name, value in feats.items():
+            if isinstance(value, str):
+                out[f"{name}={value}"] = 1.0        # categorical, e.g. lex_lang / ast_parser
+            elif isinstance(value, (bool, np.bool_)):
+                out[name] = float(value)
+            else:
+                out[name] = float(np.log1p(max(float(value), 0.0)))
+        return out
+
+    def transform(self, codes: Iterable[str]) -> sp.csr_matrix:
+        codes: List[str] = [c if isinstance(c, str) else "" for c in codes]
+        basic = self.basic.extract_batch(codes)
+        stats = self.stats.transform(self._stat_dict(c, row) for c, row in zip(codes, basic))
+        return sp.hstack([self.chars.transform(codes), self.tokens.transform(codes), stats], format="csr")
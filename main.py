@@ -1,6 +1,7 @@
 from flask import Flask, jsonify, request, Request, json
 from werkzeug.utils import secure_filename
 from flask_cors import CORS
+import os
 import logging
 import traceback
 import MOP.monitor1
@@ -29,10 +30,14 @@ from core.preprocessor import Preprocessor
 from models.adaboost import AdaBoostStrategy
 from core.preprocessor import Preprocessor
 from features.extractors.basic import BasicFeatureExtractor
+from features.extractors.fused import FusedBasicExtractor
 from core.prediction_facade import PredictionFacade
+from core.feature_cache import FEATURE_CACHE
+from core.micro_batcher import MicroBatcher
 from models.lstm import LSTMModel
 from models.svm import SVMModel
 from models.transformer import TransformerModel
+from models.cascade import DEFAULT_BAND, CascadePredictor, CascadeStage
 from MOP.model_loaded_monitor import mop_model_load, mop_predict_only_if_loaded
 
 AdaBoostStrategy.load = mop_model_load("adaboost")(AdaBoostStrategy.load)
@@ -46,6 +51,7 @@ LSTMModel.predict = mop_predict_only_if_loaded("lstm")(LSTMModel.predict)
 
 TransformerModel.load = mop_model_load("transformer")(TransformerModel.load)
 TransformerModel.predict = mop_predict_only_if_loaded("transformer")(TransformerModel.predict)
+TransformerModel.predict_batch = mop_predict_only_if_loaded("transformer")(TransformerModel.predict_batch)
 
 
 import threading
@@ -55,9 +61,50 @@ MODELS = {"adaboost": None, "lstm": None, "transformer": None, "svm": None}
 
 FACADES = {"adaboost": None, "lstm": None, "transformer": None, "svm": None}
 
+# concurrent transformer requests are padded into one forward pass
+# (TRANSFORMER_BATCH_SIZE / TRANSFORMER_BATCH_WAIT_MS)
+BATCHERS = {"transformer": None}
+
+# "torch" (default), "onnx" (onnxruntime on data/transformer_onnx, training/export_onnx.py)
+# or "int8" (dynamically quantized data/transformer_int8, training/quantize_report.py)
+TRANSFORMER_BACKEND = os.getenv("TRANSFORMER_BACKEND", "torch").lower()
+
+if TRANSFORMER_BACKEND == "onnx":
+    # onnxruntime is only needed (and imported) for this backend; same MOP guards as TransformerModel
+    from models.onnx_transformer import OnnxTransformerModel
+
+    OnnxTransformerModel.load = mop_model_load("transformer")(OnnxTransformerModel.load)
+    OnnxTransformerModel.predict = mop_predict_only_if_loaded("transformer")(OnnxTransformerModel.predict)
+    OnnxTransformerModel.predict_batch = mop_predict_only_if_loaded("transformer")(OnnxTransformerModel.predict_batch)
+# uploads longer than the context: "window" (sliding windows, at most TRANSFORMER_MAX_WINDOWS) or "truncate"
+TRANSFORMER_LONG_INPUTS = os.getenv("TRANSFORMER_LONG_INPUTS", "window").lower()
+
+# cheap models first, the transformer only inside their uncertainty bands
+# (bands from training/tune_cascade.py; stage order: the config's, else CASCADE_STAGES)
+CASCADE = None
+CASCADE_CONFIG = os.getenv("CASCADE_CONFIG", "data/cascade.json")
+
+
+def build_cascade():
+    bands = CascadePredictor.load_bands(CASCADE_CONFIG)
+    names = list(bands) or os.getenv("CASCADE_STAGES", "svm,lstm").split(",")
+    missing = [name for name in names if FACADES.get(name) is None]
+    for name in missing:
+        logger.warning("[CASCADE] Stage %s is not loaded, the cascade runs without it", name)
+    if bands and missing:
+        # the other bands were tuned on the inputs the missing stage passed on
+        logger.warning("[CASCADE] Bands in %s were tuned with %s; using the default band %s",
+                       CASCADE_CONFIG, ", ".join(missing), DEFAULT_BAND)
+    stages = [
+        CascadeStage(name, (lambda code, facade=FACADES[name]: facade.analyze(code)["probability_machine"]),
+                     *(() if missing else bands.get(name, ())), threshold=FACADES[name].threshold)
+        for name in names if FACADES.get(name) is not None
+    ]
+    return CascadePredictor(stages, fallback=BATCHERS["transformer"], tuned_stages=list(bands))
+
 
 def load_models_thread():
-    global MODELS, FACADES
+    global MODELS, FACADES, BATCHERS, CASCADE
 
     print("Loading models...")
 
@@ -65,12 +112,11 @@ def load_models_thread():
         # ==== AdaBoost ====
         try:
             model = AdaBoostStrategy().load("data/adaboost.pkl")
-            preprocessor = Preprocessor()
-            feature_extractor = BasicFeatureExtractor()
+            feature_extractor = FusedBasicExtractor()
 
             FACADES["adaboost"] = PredictionFacade(
                 model=model,
-                preprocessor=preprocessor,
+                preprocessor=None,  # FusedBasicExtractor cleans on the fly
                 feature_extractor=feature_extractor,
             )
 
@@ -85,12 +131,11 @@ def load_models_thread():
 
         try:
             svm_model = SVMModel().load("data/svm_model.pkl")
-            preprocessor = Preprocessor()
-            feature_extractor = BasicFeatureExtractor()
+            feature_extractor = FusedBasicExtractor()
 
             FACADES["svm"] = PredictionFacade(
                 model=svm_model,
-                preprocessor=preprocessor,
+                preprocessor=None,  # FusedBasicExtractor cleans on the fly
                 feature_extractor=feature_extractor,
             )
 
@@ -105,12 +150,11 @@ def load_models_thread():
 
         try:
             lstm_model = LSTMModel().load("data/lstm_model.pkl")
-            preprocessor = Preprocessor()
-            feature_extractor_lstm = BasicFeatureExtractor()
+            feature_extractor_lstm = FusedBasicExtractor()
 
             FACADES["lstm"] = PredictionFacade(
                 model=lstm_model,
-                preprocessor=preprocessor,
+                preprocessor=None,  # FusedBasicExtractor cleans on the fly
                 feature_extractor=feature_extractor_lstm,
             )
 
@@ -123,7 +167,15 @@ def load_models_thread():
 
         # ==== Transformer ====
         try:
-            transformer_model = TransformerModel().load("data/transformer_model.pkl")
+            if TRANSFORMER_BACKEND == "onnx":
+                transformer_model = OnnxTransformerModel().load("data/transformer_onnx")
+            elif TRANSFORMER_BACKEND == "int8":
+                # dynamic int8 artifact from training/quantize_report.py, loaded as is (no re-quantization)
+                transformer_model = TransformerModel(model_name=None).load("data/transformer_int8")
+            else:
+                # the inference export loads in seconds; the pickle also carries the optimizer state
+                transformer_path = "data/transformer_export" if os.path.isdir("data/transformer_export") else "data/transformer_model.pkl"
+                transformer_model = TransformerModel(model_name=None).load(transformer_path)
             preprocessor = Preprocessor()
             feature_extractor_transformer = BasicFeatureExtractor()
 
@@ -133,12 +185,24 @@ def load_models_thread():
                 feature_extractor=feature_extractor_transformer,
             )
 
+            # every backend (torch, int8, onnx) windows the same way; no silent truncation
+            if TRANSFORMER_LONG_INPUTS == "window":
+                transformer_model.configure_long_inputs(
+                    "window", max_windows=int(os.getenv("TRANSFORMER_MAX_WINDOWS", "16"))
+                )
+            BATCHERS["transformer"] = MicroBatcher.from_env(
+                "transformer", transformer_model.predict_batch, max_batch=16, max_wait_ms=10
+            )
             MODELS["transformer"] = transformer_model
-            print("Transformer Model has been loaded!")
+            print(f"Transformer Model has been loaded! (backend: {TRANSFORMER_BACKEND})")
         except Exception as e:
             print("Couldn't load Transformer: ", e)
             traceback.print_exc()
 
+        CASCADE = build_cascade()
+        print(f"Cascade ready: {[s.name for s in CASCADE.stages]} -> "
+              f"{'transformer' if CASCADE.fallback is not None else 'no fallback'}")
+
     except Exception as e:
         print(e)
         traceback.print_exc()
@@ -233,13 +297,45 @@ def predict_transformer():
         return error, status
 
     try:
-        result = MODELS["transformer"].predict(code)  # 👈 trimit text brut
-        return jsonify({"model": "Transformer", **result})
+        p_machine = BATCHERS["transformer"](code)  # 👈 trimit text brut
+        return jsonify({"model": "Transformer", **TransformerModel.result(p_machine)})
     except Exception as e:
         print("Transformer error:", e)
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/predict/cascade", methods=["POST"])
+def predict_cascade():
+    if CASCADE is None or (not CASCADE.stages and CASCADE.fallback is None):
+        return jsonify({"error": "Cascade models not loaded"}), 503
+
+    code, error, status = extract_code_from_request()
+    if error:
+        return error, status
+
+    try:
+        return jsonify({"model": "Cascade", **CASCADE.analyze(code)})
+    except Exception as e:
+        print("Cascade error:", e)
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/stats/cascade", methods=["GET"])
+def cascade_stats():
+    return jsonify(CASCADE.stats() if CASCADE is not None else {})
+
+
+@app.route("/stats/feature-cache", methods=["GET"])
+def feature_cache_stats():
+    # all facades share FEATURE_CACHE: repeated uploads are a hash lookup
+    return jsonify(FEATURE_CACHE.stats())
+
+
+@app.route("/stats/batching", methods=["GET"])
+def batching_stats():
+    return jsonify({name: b.stats() for name, b in BATCHERS.items() if b is not None})
+
+
 threading.Thread(target=load_models_thread, daemon=True).start()
 
 def require_auth(f):
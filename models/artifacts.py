@@ -0,0 +1,40 @@
+"""Directory artifacts (exports, ONNX, int8) swapped into place without a gap.
+
+A writer builds the new artifact in a temporary directory next to the target and hands
+it to `replace_directory`. The previous artifact is renamed aside, the new one renamed
+into place, and only then is the old copy deleted: at every point one complete artifact
+exists under the target name or under the aside name, never a half-deleted one.
+"""
+import os
+import shutil
+import tempfile
+
+
+def staging_directory(directory: str, prefix: str) -> str:
+    """Empty temporary directory in the parent of `directory` (same filesystem, so renames are atomic)."""
+    parent = os.path.dirname(os.path.abspath(directory))
+    os.makedirs(parent, exist_ok=True)
+    return tempfile.mkdtemp(dir=parent, prefix=prefix)
+
+
+def replace_directory(tmp: str, directory: str) -> str:
+    """Move the finished `tmp` to `directory`, replacing what was there.
+
+    If the final rename fails, the previous artifact is renamed back and `tmp` is left
+    for the caller to clean up.
+    """
+    old = None
+    if os.path.isdir(directory):
+        parent = os.path.dirname(os.path.abspath(directory))
+        old = tempfile.mkdtemp(dir=parent, prefix=".old-")
+        os.rmdir(old)
+        os.replace(directory, old)
+    try:
+        os.replace(tmp, directory)
+    except BaseException:
+        if old is not None:
+            os.replace(old, directory)
+        raise
+    if old is not None:
+        shutil.rmtree(old, ignore_errors=True)
+    return directory
@@ -0,0 +1,63 @@
+"""Length-aware batch plans for the transformer strategies (numpy only, no torch import).
+
+Padding every sequence of a batch to the longest one wastes attention compute on pad
+tokens; grouping samples of similar length keeps each batch's padded size close to its
+real size.
+"""
+from typing import List, Sequence
+
+import numpy as np
+
+# how many batches are pooled before sorting by length: large enough to group similar
+# lengths, small enough that training batches stay (locally) random
+POOL_BATCHES = 50
+
+
+def length_grouped_batches(lengths: Sequence[int], batch_size: int, shuffle: bool = True,
+                           seed: int = 0, pool_batches: int = POOL_BATCHES) -> List[np.ndarray]:
+    """Index batches of samples with similar lengths.
+
+    Without `shuffle` the whole set is sorted by length (longest first, so an OOM shows up
+    on the first batch). With `shuffle` the indices are permuted, cut into pools of
+    `pool_batches` batches, each pool is sorted by length, and the batch order is shuffled;
+    the same `seed` gives the same plan.
+    """
+    lengths = np.asarray(lengths)
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be >= 1, got {batch_size}")
+    if not shuffle:
+        order = np.argsort(-lengths, kind="stable")
+        return [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(lengths))
+    pool = batch_size * pool_batches
+    batches = []
+    for start in range(0, len(order), pool):
+        chunk = order[start:start + pool]
+        chunk = chunk[np.argsort(-lengths[chunk], kind="stable")]
+        batches.extend(chunk[i:i + batch_size] for i in range(0, len(chunk), batch_size))
+    return [batches[i] for i in rng.permutation(len(batches))]
+
+
+def token_budget_batches(lengths: Sequence[int], max_tokens: int, max_batch: int = 256) -> List[np.ndarray]:
+    """Longest-first index batches whose padded size (rows x longest row) stays within `max_tokens`.
+
+    Short inputs are packed many per batch and long ones few, so every forward pass costs
+    about the same; a single input longer than the budget still gets its own batch.
+    """
+    lengths = np.asarray(lengths)
+    order = np.argsort(-lengths, kind="stable")
+    batches, start = [], 0
+    while start < len(order):
+        longest = max(int(lengths[order[start]]), 1)
+        size = max(1, min(max_batch, max_tokens // longest))
+        batches.append(order[start:start + size])
+        start += size
+    return batches
+
+
+def padded_tokens(lengths: Sequence[int], batches: Sequence[np.ndarray]) -> int:
+    """Tokens (real + padding) the batches cost once each is padded to its longest sample."""
+    lengths = np.asarray(lengths)
+    return int(sum(lengths[b].max() * len(b) for b in batches if len(b)))
@@ -0,0 +1,186 @@
+"""Confidence cascade: cheap feature-based models first, the transformer only for hard inputs.
+
+Each cheap stage has an uncertainty band [low, high]. A probability outside it is
+answered by that stage; inside it the input moves on to the next stage and, past the
+last one, to the fallback (the transformer). The bands come from `tune_cascade` on a
+labelled validation set, for a target fraction of inputs that reach the fallback.
+
+An answer is labelled with the threshold of the model that gave it: a stage's own
+(its facade's, so `/predict/<stage>` and the cascade agree), `THRESHOLD` for the fallback.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+import json
+import os
+import threading
+
+import numpy as np
+
+from .service import ModelService
+
+THRESHOLD = 0.5
+DEFAULT_BAND = (0.2, 0.8)
+
+
+@dataclass
+class CascadeStage:
+    name: str
+    predict: Callable[[str], float]     # one code -> P(machine)
+    low: float = DEFAULT_BAND[0]
+    high: float = DEFAULT_BAND[1]
+    threshold: float = THRESHOLD        # P(machine) above which the stage says "machine"
+
+    def decides(self, p: float) -> bool:
+        return p < self.low or p > self.high
+
+    def label(self, p: float) -> str:
+        return "machine" if p > self.threshold else "human"
+
+
+class CascadePredictor(ModelService):
+    """`stages` in order, then `fallback` (e.g. the transformer's micro-batcher) for what they leave.
+
+    `tuned_stages`: the stages the bands were tuned for, reported next to the loaded ones.
+    """
+
+    def __init__(self, stages: Sequence[CascadeStage], fallback: Callable[[str], float] | None,
+                 fallback_name: str = "transformer", threshold: float = THRESHOLD,
+                 tuned_stages: Sequence[str] = ()):
+        self.stages = list(stages)
+        self.fallback = fallback
+        self.fallback_name = fallback_name
+        self.threshold = threshold
+        self.tuned_stages = list(tuned_stages)
+        self._lock = threading.Lock()
+        self._decided = {name: 0 for name in [s.name for s in self.stages] + [fallback_name]}
+
+    def train(self, X, y):
+        raise NotImplementedError("the cascade reuses trained models; tune its bands with `tune_cascade`")
+
+    def analyze(self, code: str) -> Dict[str, Any]:
+        """Response for one code: probability, label, the deciding stage and every stage's score."""
+        if not self.stages and self.fallback is None:
+            raise RuntimeError("cascade has no stage to run")
+        trace: List[Dict[str, Any]] = []
+        decided_by = label = None
+        for stage in self.stages:
+            p = float(stage.predict(code))
+            trace.append({"stage": stage.name, "probability_machine": p})
+            if stage.decides(p):
+                decided_by, label = stage.name, stage.label(p)
+                break
+        uncertain = False
+        if decided_by is None:
+            if self.fallback is not None:
+                p = float(self.fallback(code))
+                trace.append({"stage": self.fallback_name, "probability_machine": p})
+                decided_by, label = self.fallback_name, "machine" if p >= self.threshold else "human"
+            else:
+                # fallback not loaded: the last cheap stage answers inside its band
+                decided_by, label, uncertain = self.stages[-1].name, self.stages[-1].label(p), True
+        with self._lock:
+            self._decided[decided_by] += 1
+        return {
+            "probability_machine": p,
+            "label": label,
+            "decided_by": decided_by,
+            "escalated": decided_by == self.fallback_name,
+            "uncertain": uncertain,
+            "stages": trace,
+        }
+
+    def predict(self, X):
+        """P(machine) per code; a single string gives a length-1 array."""
+        codes = [X] if isinstance(X, str) else list(X)
+        return np.array([self.analyze(c)["probability_machine"] for c in codes], dtype="float32")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            decided = dict(self._decided)
+        total = sum(decided.values())
+        return {
+            "requests": total,
+            "decided_by": decided,
+            "escalation_rate": decided[self.fallback_name] / total if total else 0.0,
+            "bands": {s.name: [s.low, s.high] for s in self.stages},
+            "loaded_stages": [s.name for s in self.stages],
+            "tuned_stages": self.tuned_stages,
+        }
+
+    @staticmethod
+    def load_bands(path: str) -> Dict[str, Tuple[float, float]]:
+        """{stage: (low, high)} from a `tune_cascade` config; empty if the file does not exist."""
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            config = json.load(f)
+        return {s["name"]: (float(s["low"]), float(s["high"])) for s in config["stages"]}
+
+
+def tune_band(proba, y, escalate: float, threshold: float = THRESHOLD) -> Tuple[float, float]:
+    """Band holding a fraction `escalate` of `proba` with the fewest errors outside it.
+
+    The escalated inputs are a contiguous run of the sorted probabilities; every start of
+    that run is tried and the one that leaves the fewest misclassified inputs to this stage
+    wins. Bounds sit halfway between the neighbouring probabilities.
+    """
+    proba = np.asarray(proba, dtype="float64")
+    y = np.asarray(y)
+    n = len(proba)
+    k = int(round(np.clip(escalate, 0.0, 1.0) * n))
+    if n == 0 or k == 0:
+        return float(threshold), float(threshold)
+    if k >= n:
+        return 0.0, 1.0
+    order = np.argsort(proba, kind="stable")
+    p = proba[order]
+    errors = np.concatenate([[0], np.cumsum((p > threshold) != y[order])])
+    # errors left to the stage when sorted rows [i, i + k) are escalated
+    outside = errors[-1] - (errors[k:] - errors[:n - k + 1])
+    i = int(np.argmin(outside))
+    low = 0.0 if i == 0 else (p[i - 1] + p[i]) / 2
+    high = 1.0 if i + k == n else (p[i + k - 1] + p[i + k]) / 2
+    return float(low), float(high)
+
+
+def tune_cascade(stage_proba: Dict[str, np.ndarray], y, target_rate: float,
+                 threshold: float = THRESHOLD,
+                 thresholds: Dict[str, float] | None = None) -> List[Dict[str, Any]]:
+    """Bands for stages run in `stage_proba` order so that about `target_rate` of `y` escalates.
+
+    Every stage passes on the same share of what reaches it, `target_rate ** (1 / stages)`.
+    A stage's errors are counted at its label threshold (`thresholds`, else `threshold`).
+    """
+    y = np.asarray(y)
+    reaching = np.arange(len(y))
+    share = float(target_rate) ** (1.0 / max(len(stage_proba), 1))
+    bands = []
+    for name, proba in stage_proba.items():
+        proba = np.asarray(proba, dtype="float64")
+        cut = (thresholds or {}).get(name, threshold)
+        low, high = tune_band(proba[reaching], y[reaching], share, cut)
+        decided = (proba[reaching] < low) | (proba[reaching] > high)
+        bands.append({"name": name, "low": low, "high": high, "threshold": cut, "reached": int(len(reaching)),
+                      "decided": int(decided.sum()),
+                      "accuracy": float(np.mean((proba[reaching][decided] > cut) == y[reaching][decided]))
+                      if decided.any() else None})
+        reaching = reaching[~decided]
+    return bands
+
+
+def simulate_cascade(stage_proba: Dict[str, np.ndarray], fallback_proba,
+                     bands: Dict[str, Tuple[float, float]]) -> Tuple[np.ndarray, np.ndarray]:
+    """(final probability, deciding stage index) per row, len(stages) meaning the fallback."""
+    fallback_proba = np.asarray(fallback_proba, dtype="float64")
+    final = fallback_proba.copy()
+    stage_of = np.full(len(final), len(stage_proba), dtype=np.int64)
+    open_rows = np.ones(len(final), dtype=bool)
+    for j, (name, proba) in enumerate(stage_proba.items()):
+        proba = np.asarray(proba, dtype="float64")
+        low, high = bands[name]
+        decided = open_rows & ((proba < low) | (proba > high))
+        final[decided] = proba[decided]
+        stage_of[decided] = j
+        open_rows &= ~decided
+    return final, stage_of
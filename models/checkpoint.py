@@ -0,0 +1,99 @@
+"""Rolling training checkpoints: atomic writes, newest `keep` files retained.
+
+A checkpoint is one file `step-<optimizer step>.pt` holding whatever state dict the
+training loop hands over. It is written to a temporary file in the same directory,
+fsynced and renamed into place, so a node killed mid-write leaves the previous
+checkpoint intact and never a truncated one under a checkpoint name.
+
+Pruning only touches checkpoints of the current run: the files this manager wrote, plus
+the ones it `adopt`ed when resuming. Checkpoints of another run in the same directory
+(with possibly higher step numbers) are never mistaken for newer ones of this run.
+"""
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Callable, List, Optional
+import os
+import re
+import tempfile
+
+_NAME = re.compile(r"^step-(\d+)\.pt$")
+
+
+def _torch_save(obj, f):
+    import torch
+    torch.save(obj, f)
+
+
+def _torch_load(f):
+    import torch
+    # the checkpoint holds optimizer/scheduler/RNG state, not only tensors
+    return torch.load(f, map_location="cpu", weights_only=False)
+
+
+class CheckpointManager:
+    def __init__(self, directory: str | os.PathLike, keep: int = 3,
+                 dump: Callable[[Any, Any], None] = _torch_save, load: Callable[[Any], Any] = _torch_load) -> None:
+        if keep < 1:
+            raise ValueError(f"keep must be >= 1, got {keep}")
+        self.directory = Path(directory)
+        self.keep = keep
+        self._dump = dump
+        self._load = load
+        self._own: List[Path] = []     # this run's checkpoints, oldest first
+
+    def path(self, step: int) -> Path:
+        return self.directory / f"step-{step:09d}.pt"
+
+    def checkpoints(self) -> List[Path]:
+        """Complete checkpoints, oldest first."""
+        if not self.directory.is_dir():
+            return []
+        found = [(int(m.group(1)), p) for p in self.directory.iterdir() if (m := _NAME.match(p.name))]
+        return [p for _, p in sorted(found)]
+
+    def latest(self) -> Optional[Path]:
+        found = self.checkpoints()
+        return found[-1] if found else None
+
+    def adopt(self) -> None:
+        """Treat the checkpoints already in the directory as this run's (resuming it)."""
+        self._own = self.checkpoints()
+
+    def clear(self) -> None:
+        """Delete every checkpoint in the directory (starting a run over)."""
+        for path in self.checkpoints():
+            path.unlink(missing_ok=True)
+        self._own = []
+
+    def save(self, state: Any, step: int) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".step-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                self._dump(state, f)
+                f.flush()
+                os.fsync(f.fileno())
+            target = self.path(step)
+            os.replace(tmp, target)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        if target in self._own:
+            self._own.remove(target)
+        self._own.append(target)
+        self._prune()
+        return target
+
+    def load(self, path: str | os.PathLike | None = None) -> Any:
+        """State of `path` (default: the latest checkpoint); None when there is none."""
+        path = path or self.latest()
+        if path is None:
+            return None
+        with open(path, "rb") as f:
+            return self._load(f)
+
+    def _prune(self) -> None:
+        stale, self._own = self._own[:-self.keep], self._own[-self.keep:]
+        for old in stale:
+            old.unlink(missing_ok=True)
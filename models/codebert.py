@@ -1,25 +1,88 @@
+import os
+
+import numpy as np
 import torch
 from transformers import RobertaTokenizer, RobertaForSequenceClassification
+from core.fingerprint import artifact_fingerprint
+from .batching import length_grouped_batches
+from .quantization import is_quantized_artifact, load_quantized, quantize_dynamic_int8, save_quantized
 from .service import ModelService
+from .windows import aggregate_windows, window_inputs
+
+MAX_LENGTH = 512
 
 class CodeBERTStrategy(ModelService):
-    def __init__(self, model_path="microsoft/codebert-base", device=None):
+    def __init__(self, model_path="microsoft/codebert-base", device=None, quantize=False, long_inputs="truncate"):
+        """`model_path` may also be an int8 artifact written by `export_quantized`.
+
+        `long_inputs="window"` scores codes longer than 512 tokens with `predict_windows`
+        instead of truncating them.
+        """
         self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        self.quantized = False
+        self.long_inputs = long_inputs
+        # local weights: their files, so retraining in place invalidates stored embeddings
+        self.weights_fingerprint = artifact_fingerprint(model_path) if os.path.exists(model_path) else None
+        if is_quantized_artifact(model_path):
+            self.model, self.tokenizer, _ = load_quantized(model_path)
+            self.device, self.quantized = "cpu", True
+            return
         self.tokenizer = RobertaTokenizer.from_pretrained(model_path)
         self.model = RobertaForSequenceClassification.from_pretrained(model_path)
         self.model.to(self.device)
         self.model.eval()
+        if quantize:
+            self.quantize()
+
+    @property
+    def embedding_version(self) -> str:
+        """Identifies the vectors `embed` returns (weights, pooling, precision).
+
+        Hub models are identified by the snapshot revision they resolved to.
+        """
+        weights = self.weights_fingerprint
+        if weights is None:
+            config = self.model.config
+            weights = f"{config._name_or_path}@{getattr(config, '_commit_hash', None) or 'unknown'}"
+        return f"{weights}:mean/{MAX_LENGTH}:{'int8' if self.quantized else 'fp32'}"
+
+    @torch.no_grad()
+    def embed(self, codes, batch_size=16):
+        """Mean-pooled last hidden states, (n, hidden) float32, in input order."""
+        codes = list(codes)
+        ids = self.tokenizer(codes, truncation=True, max_length=MAX_LENGTH)["input_ids"]
+        out = np.empty((len(codes), self.model.config.hidden_size), dtype="float32")
+        for idx in length_grouped_batches([len(i) for i in ids], batch_size, shuffle=False):
+            tokens = self.tokenizer.pad([{"input_ids": ids[i]} for i in idx], return_tensors="pt").to(self.device)
+            hidden = self.model.base_model(**tokens).last_hidden_state
+            mask = tokens["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+            out[idx] = ((hidden * mask).sum(1) / mask.sum(1).clamp(min=1)).float().cpu().numpy()
+        return out
+
+    def quantize(self):
+        """Dynamic int8 Linear layers for CPU inference."""
+        self.model = quantize_dynamic_int8(self.model)
+        self.device, self.quantized = "cpu", True
+        return self
+
+    def export_quantized(self, directory: str):
+        """Persist the int8 model so servers load it instead of re-quantizing at startup."""
+        if not self.quantized:
+            self.quantize()
+        return save_quantized(self.model, self.tokenizer, directory, max_length=MAX_LENGTH)
 
     def train(self, X, y):
         raise NotImplementedError("CodeBERT fine-tuning should be done separately.")
 
     @torch.no_grad()
     def predict(self, code: str):
+        if self.long_inputs == "window":
+            return float(self.predict_windows([code])[0])
         tokens = self.tokenizer(
             code,
             truncation=True,
             padding=True,
-            max_length=512,
+            max_length=MAX_LENGTH,
             return_tensors="pt"
         ).to(self.device)
 
@@ -27,3 +90,36 @@ class CodeBERTStrategy(ModelService):
         probs = torch.softmax(outputs.logits, dim=-1)
         prob_machine = float(probs[0][1].item())  # clasa 1 = machine-generated
         return prob_machine
+
+    @torch.no_grad()
+    def predict_batch(self, codes):
+        """P(machine) for several codes in one forward pass (padded to the longest one).
+
+        With `long_inputs="window"` the codes go through `predict_windows`, so a micro-batched
+        request scores exactly like a single `predict`.
+        """
+        if self.long_inputs == "window":
+            return self.predict_windows(list(codes)).tolist()
+        tokens = self.tokenizer(
+            list(codes),
+            truncation=True,
+            padding=True,
+            max_length=MAX_LENGTH,
+            return_tensors="pt"
+        ).to(self.device)
+
+        outputs = self.model(**tokens)
+        probs = torch.softmax(outputs.logits, dim=-1)
+        return probs[:, 1].cpu().tolist()
+
+
+    @torch.no_grad()
+    def predict_windows(self, codes, overlap=64, max_windows=16, aggregate="mean", batch_size=16):
+        """P(machine) per code from overlapping 512-token windows, all windows batched together."""
+        windows, owners, weights = window_inputs(self.tokenizer, codes, MAX_LENGTH, overlap, max_windows)
+        proba = np.empty(len(windows), dtype="float32")
+        for idx in length_grouped_batches([len(w) for w in windows], batch_size, shuffle=False):
+            tokens = self.tokenizer.pad([{"input_ids": windows[i]} for i in idx], return_tensors="pt").to(self.device)
+            probs = torch.softmax(self.model(**tokens).logits, dim=-1)
+            proba[idx] = probs[:, 1].cpu().numpy()
+        return aggregate_windows(proba, owners, weights, len(codes), aggregate)
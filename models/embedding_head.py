@@ -0,0 +1,85 @@
+"""Classical heads (`LSTMModel`'s MLP, `SVMModel`, ...) on cached transformer embeddings.
+
+`CachedEncoder` wraps an encoder (`CodeBERTStrategy.embed`) with a per-content-hash LRU
+and, optionally, a precomputed corpus (`data.embedding_store`), so a repeated upload
+never reaches the transformer. `EmbeddingHeadModel` is the servable strategy: code in,
+encoder + head, probability out.
+"""
+import os
+
+import joblib
+import numpy as np
+
+from core.feature_cache import LRUCache, content_hash
+from .service import ModelService
+
+
+class CachedEncoder:
+    def __init__(self, encoder, cache: LRUCache | None = None, corpus=None, maxsize: int = 4096):
+        self.encoder = encoder
+        self.cache = cache if cache is not None else LRUCache(maxsize)
+        self.corpus = corpus  # StoredEmbeddings: rows embedded offline
+        self.embedding_version = encoder.embedding_version
+
+    def embed(self, codes) -> np.ndarray:
+        """float32 embeddings of `codes`; only codes seen nowhere before go through the encoder."""
+        codes = list(codes)
+        keys = [content_hash(c) for c in codes]
+        found, missing = {}, {}
+        for i, key in enumerate(keys):
+            if key in found or key in missing:
+                continue
+            vector = self.cache.get((key, self.embedding_version))
+            if vector is None and self.corpus is not None:
+                vector = self.corpus.lookup(key)
+                if vector is not None:
+                    self.cache.put((key, self.embedding_version), np.asarray(vector))
+            if vector is None:
+                missing[key] = codes[i]
+            else:
+                found[key] = vector
+        if missing:
+            computed = np.asarray(self.encoder.embed(list(missing.values())), dtype=np.float16)
+            for key, vector in zip(missing, computed):
+                self.cache.put((key, self.embedding_version), vector)
+                found[key] = vector
+        return np.stack([found[k] for k in keys]).astype(np.float32) if keys else np.zeros((0, 0), np.float32)
+
+    def stats(self):
+        return self.cache.stats()
+
+
+class EmbeddingHeadModel(ModelService):
+    """`head` (any feature-matrix strategy) applied to `encoder` embeddings of raw code."""
+
+    def __init__(self, encoder, head: ModelService):
+        self.encoder = encoder if isinstance(encoder, CachedEncoder) else CachedEncoder(encoder)
+        self.head = head
+
+    def train(self, X, y):
+        """X: codes. To reuse stored embeddings call `head.train(E, y)` directly."""
+        self.head.train(self.encoder.embed(X), y)
+        return self
+
+    def predict(self, X):
+        """P(machine) per code; a single string gives a length-1 array."""
+        codes = [X] if isinstance(X, str) else list(X)
+        return self.head.predict(self.encoder.embed(codes))
+
+    def save(self, path: str):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        # the head only: the encoder is shared and loaded on its own
+        joblib.dump({"embedding_version": self.encoder.embedding_version, "head": self.head}, path)
+        return path
+
+    def load(self, path: str):
+        saved = joblib.load(path)
+        if saved["embedding_version"] != self.encoder.embedding_version:
+            raise ValueError(
+                f"head {path} was trained on {saved['embedding_version']} embeddings, "
+                f"encoder gives {self.encoder.embedding_version}"
+            )
+        self.head = saved["head"]
+        return self
@@ -7,6 +7,8 @@ from sklearn.neural_network import MLPClassifier
 
 logger = logging.getLogger(__name__)
 
+CLASSES = np.array([0, 1])
+
 """
 method for refactoring: Extract Method
 duplicate code ( _prepare_X ) extracted from train and predict methods
@@ -67,6 +69,12 @@ class LSTMModel(ModelService):
         logger.info("[MLP] Finished fit.")
         return self
 
+    def partial_fit(self, X, y):
+        """One incremental pass over a chunk (used by `train_incremental`)."""
+        X = self._prepare_X(X, context="partial_fit")
+        self.model.partial_fit(X, np.asarray(y), classes=CLASSES)
+        return self
+
     def predict(self, X):
         X = self._prepare_X(X, context="predict")
         proba = self.model.predict_proba(X)[:, 1]
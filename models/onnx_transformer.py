@@ -0,0 +1,178 @@
+"""ONNX Runtime backend for the fine-tuned transformer (CPU execution provider).
+
+`export_onnx` converts a `TransformerModel` to `model.onnx` with dynamic batch and
+sequence axes, next to its tokenizer files; `OnnxTransformerModel` serves that directory
+without torch, with the same batching and long-input windowing as the torch backend.
+`parity_check` compares both backends on the same texts.
+"""
+import json
+import os
+import shutil
+
+import numpy as np
+import onnxruntime as ort
+from transformers import AutoTokenizer
+
+from .artifacts import replace_directory, staging_directory
+from .batching import length_grouped_batches, token_budget_batches
+from .service import ModelService
+from .windows import aggregate_windows, window_inputs
+
+ONNX_FILE = "model.onnx"
+OPSET = 17
+
+
+def export_onnx(model, directory: str, opset: int = OPSET) -> str:
+    """Write `model.onnx` + tokenizer + `inference.json` for a `TransformerModel`, swapped in by `models.artifacts`."""
+    import torch
+
+    tmp = staging_directory(directory, ".onnx-")
+    net = model.model
+    try:
+        names = list(model.tokenizer.model_input_names)
+        sample = model.tokenizer(["def f(x):\n    return x", "x = 1"], return_tensors="pt", padding=True)
+        inputs = tuple(sample[name] for name in names)
+        axes = {name: {0: "batch", 1: "sequence"} for name in names}
+        axes["logits"] = {0: "batch"}
+
+        net.to("cpu").eval()
+        with torch.no_grad():
+            # TorchScript exporter: honours `dynamic_axes` and `opset_version` as given, and
+            # does not need onnxscript (the dynamo exporter, default since torch 2.9, does)
+            torch.onnx.export(
+                net,
+                inputs,
+                os.path.join(tmp, ONNX_FILE),
+                input_names=names,
+                output_names=["logits"],
+                dynamic_axes=axes,
+                opset_version=opset,
+                do_constant_folding=True,
+                dynamo=False,
+            )
+        model.tokenizer.save_pretrained(tmp)
+        with open(os.path.join(tmp, "inference.json"), "w") as f:
+            json.dump({"format": "onnx", "opset": opset, "max_length": model.max_length, "inputs": names}, f, indent=2)
+        replace_directory(tmp, directory)
+    finally:
+        net.to(model.device)
+        shutil.rmtree(tmp, ignore_errors=True)
+    return directory
+
+
+def _softmax_machine(logits: np.ndarray) -> np.ndarray:
+    logits = logits.astype("float64")
+    logits -= logits.max(axis=1, keepdims=True)
+    e = np.exp(logits)
+    return (e[:, 1] / e.sum(axis=1)).astype("float32")
+
+
+class OnnxTransformerModel(ModelService):
+    """Inference-only `TransformerModel` replacement running `model.onnx` on onnxruntime."""
+
+    def __init__(self, intra_op_threads: int | None = None):
+        self.intra_op_threads = intra_op_threads
+        self.session = None
+        self.tokenizer = None
+        self.input_names = []
+        self.max_length = None
+        # inputs longer than max_length: "truncate" or "window" (see configure_long_inputs)
+        self.long_inputs = "truncate"
+        self.window_overlap = 64
+        self.max_windows = 16
+        self.window_aggregate = "mean"
+
+    def train(self, X, y):
+        raise NotImplementedError("Train TransformerModel and convert it with export_onnx.")
+
+    def configure_long_inputs(self, mode="window", overlap=64, max_windows=16, aggregate="mean"):
+        """Same as `TransformerModel.configure_long_inputs`."""
+        if mode not in ("truncate", "window"):
+            raise ValueError(f"mode must be 'truncate' or 'window', got {mode!r}")
+        self.long_inputs = mode
+        self.window_overlap = overlap
+        self.max_windows = max_windows
+        self.window_aggregate = aggregate
+        return self
+
+    def load(self, path: str):
+        with open(os.path.join(path, "inference.json")) as f:
+            info = json.load(f)
+        if info.get("format") != "onnx":
+            raise ValueError(f"{path} is not an ONNX transformer export")
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.intra_op_threads:
+            options.intra_op_num_threads = self.intra_op_threads
+        self.session = ort.InferenceSession(
+            os.path.join(path, ONNX_FILE), sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(path)
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        self.max_length = info["max_length"]
+        return self
+
+    def tokenize(self, texts):
+        """Token ids per text (truncated to `max_length`, unpadded)."""
+        return self.tokenizer(list(texts), truncation=True, max_length=self.max_length)["input_ids"]
+
+    def _run(self, input_ids) -> np.ndarray:
+        encoded = self.tokenizer.pad({"input_ids": [list(ids) for ids in input_ids]}, return_tensors="np")
+        feeds = {}
+        for name in self.input_names:
+            values = encoded.get(name)
+            if values is None:  # e.g. token_type_ids of a single-segment input
+                values = np.zeros_like(encoded["input_ids"])
+            feeds[name] = values.astype("int64")
+        (logits,) = self.session.run(["logits"], feeds)
+        return _softmax_machine(logits)
+
+    @staticmethod
+    def result(p_machine: float):
+        label = "machine" if p_machine >= 0.5 else "human"
+        return {"label": label, "probability_machine": float(p_machine)}
+
+    def predict(self, seq: str):
+        return self.result(float(self.predict_batch([seq])[0]))
+
+    def predict_batch(self, texts, batch_size=32, max_tokens=None):
+        """P(machine) for many texts, in input order (length-sorted, dynamically padded batches)."""
+        if self.long_inputs == "window":
+            return self.predict_windows(texts, batch_size)
+        return self.predict_ids(self.tokenize(texts), batch_size, max_tokens)
+
+    def predict_windows(self, texts, batch_size=32, overlap=None, max_windows=None, aggregate=None):
+        """P(machine) per text from sliding windows; the windows of all texts share batches."""
+        windows, owners, weights = window_inputs(
+            self.tokenizer, texts, self.max_length,
+            overlap=self.window_overlap if overlap is None else overlap,
+            max_windows=max_windows or self.max_windows,
+        )
+        proba = self.predict_ids(windows, batch_size)
+        return aggregate_windows(proba, owners, weights, len(texts), aggregate or self.window_aggregate)
+
+    def predict_ids(self, input_ids, batch_size=32, max_tokens=None):
+        """P(machine) for already tokenized sequences, in input order (see `TransformerModel.predict_ids`)."""
+        lengths = input_ids.lengths() if hasattr(input_ids, "lengths") else [len(ids) for ids in input_ids]
+        if max_tokens:
+            plan = token_budget_batches(lengths, max_tokens)
+        else:
+            plan = length_grouped_batches(lengths, batch_size, shuffle=False)
+        proba = np.empty(len(input_ids), dtype="float32")
+        for idx in plan:
+            proba[idx] = self._run([input_ids[i] for i in idx])
+        return proba
+
+
+def parity_check(torch_model, onnx_model, texts, atol: float = 1e-4):
+    """Largest |P_torch - P_onnx| over `texts`; `ok` when it stays within `atol`."""
+    p_torch = np.asarray(torch_model.predict_batch(texts), dtype="float64")
+    p_onnx = np.asarray(onnx_model.predict_batch(texts), dtype="float64")
+    diff = np.abs(p_torch - p_onnx)
+    return {
+        "samples": len(diff),
+        "max_abs_diff": float(diff.max()) if len(diff) else 0.0,
+        "mean_abs_diff": float(diff.mean()) if len(diff) else 0.0,
+        "label_agreement": float(((p_torch >= 0.5) == (p_onnx >= 0.5)).mean()) if len(diff) else 1.0,
+        "ok": bool((diff <= atol).all()),
+    }
@@ -0,0 +1,72 @@
+"""Dynamic int8 quantization of transformer classifiers for CPU inference.
+
+The Linear layers get int8 weights (activations are quantized on the fly), which roughly
+halves the model in memory. The quantized model is persisted as its own artifact
+(config + tokenizer + int8 state dict), so servers load it directly instead of
+re-quantizing the fp32 weights at every startup.
+"""
+import io
+import json
+import os
+import shutil
+
+import torch
+from transformers import AutoConfig, AutoModelForSequenceClassification, AutoTokenizer
+
+from .artifacts import replace_directory, staging_directory
+
+QUANTIZED_FORMAT = "int8-dynamic"
+STATE_FILE = "quantized.pt"
+
+
+def quantize_dynamic_int8(module: torch.nn.Module) -> torch.nn.Module:
+    """int8 copy of `module` with dynamically quantized Linear layers (CPU only)."""
+    module = module.to("cpu").eval()
+    return torch.ao.quantization.quantize_dynamic(module, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def serialized_bytes(module: torch.nn.Module) -> int:
+    """Size of the module's state dict once saved (packed int8 weights included)."""
+    buffer = io.BytesIO()
+    torch.save(module.state_dict(), buffer)
+    return buffer.tell()
+
+
+def is_quantized_artifact(path: str) -> bool:
+    info = os.path.join(path, "inference.json")
+    if not os.path.isfile(info):
+        return False
+    with open(info) as f:
+        return json.load(f).get("format") == QUANTIZED_FORMAT
+
+
+def save_quantized(model: torch.nn.Module, tokenizer, directory: str, **info) -> str:
+    """Write config, tokenizer, int8 state dict and `inference.json`, swapped in by `models.artifacts`."""
+    tmp = staging_directory(directory, ".int8-")
+    try:
+        model.config.save_pretrained(tmp)
+        tokenizer.save_pretrained(tmp)
+        torch.save(model.state_dict(), os.path.join(tmp, STATE_FILE))
+        with open(os.path.join(tmp, "inference.json"), "w") as f:
+            json.dump({"format": QUANTIZED_FORMAT, **info}, f, indent=2)
+        replace_directory(tmp, directory)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return directory
+
+
+def load_quantized(directory: str):
+    """(model, tokenizer, info) of a `save_quantized` artifact, on CPU, in eval mode.
+
+    The skeleton is built from the config (no pretrained download), given the same
+    quantized structure, and the int8 weights are loaded into it.
+    """
+    with open(os.path.join(directory, "inference.json")) as f:
+        info = json.load(f)
+    if info.get("format") != QUANTIZED_FORMAT:
+        raise ValueError(f"{directory} is not an {QUANTIZED_FORMAT} artifact")
+    config = AutoConfig.from_pretrained(directory)
+    skeleton = quantize_dynamic_int8(AutoModelForSequenceClassification.from_config(config))
+    state = torch.load(os.path.join(directory, STATE_FILE), map_location="cpu", weights_only=False)
+    skeleton.load_state_dict(state)
+    return skeleton.eval(), AutoTokenizer.from_pretrained(directory), info
@@ -1,4 +1,9 @@
 from abc import ABC, abstractmethod
+import copy
+import os
+
+import numpy as np
+from sklearn.metrics import log_loss
 
 
 # Strategy Design Pattern
@@ -11,3 +16,72 @@ class ModelService(ABC):
     @abstractmethod
     def predict(self, X) -> float:
         pass
+
+    def partial_fit(self, X, y):
+        """One incremental update on a chunk; strategies that support streaming override it."""
+        raise NotImplementedError(f"{type(self).__name__} does not support incremental training")
+
+    def train_incremental(self, chunks, eval_chunks=None, epochs: int = 1, eval_every: int = 10,
+                          patience: int = 3, tol: float = 1e-4, checkpoint_path: str | None = None,
+                          checkpoint_every: int = 50):
+        """Train on a stream of (X, y) chunks with `partial_fit`.
+
+        `chunks` / `eval_chunks` are iterables of objects with `.X` / `.y` (e.g.
+        `Dataset.stream_features`) or of (X, y) pairs; pass a zero-argument callable instead
+        to re-read the stream for every epoch or evaluation. Every `eval_every` chunks the
+        held-out log loss is measured; after `patience` evaluations without an improvement
+        of `tol` training stops and the best model is restored. Every `checkpoint_every`
+        chunks the model is saved (atomically) to `checkpoint_path`.
+        """
+        self.history = []
+        best_loss, best_model, stale = np.inf, None, 0
+        seen = samples = 0
+        for epoch in range(epochs):
+            if stale >= patience:
+                break
+            for X, y in _pairs(chunks):
+                self.partial_fit(X, y)
+                seen += 1
+                samples += len(y)
+                if checkpoint_path and seen % checkpoint_every == 0:
+                    self._checkpoint(checkpoint_path)
+                if eval_chunks is None or seen % eval_every:
+                    continue
+                loss = self._held_out_loss(eval_chunks)
+                self.history.append({"epoch": epoch, "chunks": seen, "samples": samples, "val_loss": loss})
+                if loss < best_loss - tol:
+                    best_loss, best_model, stale = loss, copy.deepcopy(self.model), 0
+                else:
+                    stale += 1
+                if stale >= patience:
+                    break
+
+        if eval_chunks is not None and seen % eval_every:
+            loss = self._held_out_loss(eval_chunks)
+            self.history.append({"epoch": epochs - 1, "chunks": seen, "samples": samples, "val_loss": loss})
+            if loss < best_loss - tol:
+                best_loss, best_model = loss, None  # the current model is the best one
+        if best_model is not None:
+            self.model = best_model
+        if checkpoint_path:
+            self._checkpoint(checkpoint_path)
+        return self
+
+    def _held_out_loss(self, eval_chunks) -> float:
+        y_true, proba = [], []
+        for X, y in _pairs(eval_chunks):
+            y_true.append(np.asarray(y))
+            proba.append(np.asarray(self.predict(X), dtype="float64").reshape(-1))
+        if not y_true:
+            return np.inf
+        return float(log_loss(np.concatenate(y_true), np.concatenate(proba), labels=[0, 1]))
+
+    def _checkpoint(self, path: str) -> None:
+        tmp = f"{path}.tmp"
+        self.save(tmp)
+        os.replace(tmp, path)
+
+
+def _pairs(chunks):
+    for chunk in (chunks() if callable(chunks) else chunks):
+        yield (chunk.X, chunk.y) if hasattr(chunk, "X") else chunk
@@ -0,0 +1,82 @@
+"""Classical student distilled from the transformer: raw code in, P(machine) out.
+
+Targets may be soft (the teacher's probabilities) as well as hard 0/1 labels. A soft
+target p is learnt as two weighted copies of the row, labelled 1 with weight p and 0 with
+weight 1 - p; with the log loss this is exactly the cross-entropy against p.
+"""
+import os
+
+import joblib
+import numpy as np
+import scipy.sparse as sp
+from sklearn.linear_model import SGDClassifier
+
+from features.student import StudentFeaturizer
+from .service import ModelService
+
+CLASSES = np.array([0, 1])
+
+
+def soft_targets(soft, hard=None, alpha: float = 1.0) -> np.ndarray:
+    """`alpha * soft + (1 - alpha) * hard`: how much the teacher counts against the ground truth."""
+    soft = np.asarray(soft, dtype="float64")
+    if hard is None or alpha >= 1.0:
+        return np.clip(soft, 0.0, 1.0)
+    hard = np.asarray(hard, dtype="float64")
+    return np.clip(alpha * soft + (1.0 - alpha) * hard, 0.0, 1.0)
+
+
+class DistilledStudent(ModelService):
+    """Logistic regression (SGD) over `StudentFeaturizer` features."""
+
+    def __init__(self, featurizer: StudentFeaturizer | None = None, alpha: float = 1e-6,
+                 random_state: int = 42):
+        self.featurizer = featurizer or StudentFeaturizer()
+        self.model = SGDClassifier(loss="log_loss", alpha=alpha, random_state=random_state)
+
+    def featurize(self, codes):
+        return self.featurizer.transform([codes] if isinstance(codes, str) else codes)
+
+    def train(self, X, y, epochs: int = 5):
+        """X: codes, y: P(machine) targets (soft or 0/1). A few passes of `partial_fit`."""
+        features = self.featurize(X)
+        for _ in range(epochs):
+            self._fit_features(features, y)
+        return self
+
+    def partial_fit(self, X, y):
+        """One update on a chunk of codes; lets `train_incremental` stream a large corpus."""
+        return self._fit_features(self.featurize(X), y)
+
+    def _fit_features(self, features, targets):
+        targets = np.asarray(targets, dtype="float64")
+        n = len(targets)
+        rows = sp.vstack([features, features], format="csr")
+        labels = np.concatenate([np.ones(n, dtype=int), np.zeros(n, dtype=int)])
+        weights = np.concatenate([targets, 1.0 - targets])
+        keep = weights > 0
+        self.model.partial_fit(rows[keep], labels[keep], classes=CLASSES, sample_weight=weights[keep])
+        return self
+
+    def predict(self, X):
+        """P(machine) per code; a single string gives a length-1 array."""
+        return self.model.predict_proba(self.featurize(X))[:, 1].astype("float32")
+
+    def save(self, path: str):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        joblib.dump({"features": self.featurizer.cache_version, "featurizer": self.featurizer.config(),
+                     "model": self.model}, path)
+        return path
+
+    def load(self, path: str):
+        saved = joblib.load(path)
+        if saved["features"] != StudentFeaturizer.cache_version:
+            raise ValueError(
+                f"student {path} was trained on {saved['features']} features, "
+                f"this code builds {StudentFeaturizer.cache_version}"
+            )
+        self.featurizer = StudentFeaturizer(**saved["featurizer"])
+        self.model = saved["model"]
+        return self
@@ -2,10 +2,75 @@ from .service import ModelService
 import joblib
 import numpy as np
 from sklearn.svm import LinearSVC
+from sklearn.linear_model import SGDClassifier
+from sklearn.preprocessing import StandardScaler
 from sklearn.calibration import CalibratedClassifierCV
 from typing import Union, Iterable
 
 
+# step size when continuing from a batch-trained SVM: the "optimal" schedule starts with
+# steps large enough to wipe the loaded weights out on the first chunk
+WARM_ETA0 = 0.01
+
+
+def linear_coefficients(model):
+    """(coef, intercept) on raw features of a fitted LinearSVC, averaged over calibration folds.
+
+    None for an unfitted model (nothing to continue from).
+    """
+    if isinstance(model, CalibratedClassifierCV):
+        if not hasattr(model, "calibrated_classifiers_"):
+            return None
+        estimators = [c.estimator for c in model.calibrated_classifiers_]
+    elif hasattr(model, "coef_"):
+        estimators = [model]
+    else:
+        raise ValueError(f"[SVM] cannot continue training a {type(model).__name__} incrementally")
+    coef = np.mean([np.ravel(e.coef_) for e in estimators], axis=0)
+    intercept = float(np.mean([np.ravel(e.intercept_)[0] for e in estimators]))
+    return coef, intercept
+
+
+class StreamingLinearSVM:
+    """Linear SVM learnt chunk by chunk: running StandardScaler + SGD with a smoothed hinge loss.
+
+    The modified-Huber loss keeps the SVM margin and also gives `predict_proba`.
+    `warm_start=(coef, intercept)` (raw-feature weights, see `linear_coefficients`) makes
+    the first chunk continue from a batch-trained SVM instead of from zero.
+    """
+
+    def __init__(self, alpha: float = 1e-4, random_state: int = 42, warm_start=None):
+        self.scaler = StandardScaler()
+        self.clf = SGDClassifier(loss="modified_huber", alpha=alpha, random_state=random_state)
+        self.warm_start = warm_start
+        if warm_start is not None:
+            self.clf.set_params(learning_rate="constant", eta0=WARM_ETA0)
+
+    def partial_fit(self, X, y, classes=None):
+        self.scaler.partial_fit(X)
+        Xs = self.scaler.transform(X)
+        if self.warm_start is not None:
+            self._load_weights(Xs, y, classes)
+        self.clf.partial_fit(Xs, y, classes=classes)
+        return self
+
+    def _load_weights(self, Xs, y, classes) -> None:
+        # a zero-weight step allocates the SGD state; the raw-feature weights are then
+        # rewritten for the scaled features: w.x + b == (w * scale).z + (b + w.mean)
+        self.clf.partial_fit(Xs[:1], np.asarray(y)[:1], classes=classes, sample_weight=[0.0])
+        coef, intercept = self.warm_start
+        dtype = self.clf.coef_.dtype
+        self.clf.coef_ = (coef * self.scaler.scale_).reshape(1, -1).astype(dtype)
+        self.clf.intercept_ = np.array([intercept + coef @ self.scaler.mean_], dtype=dtype)
+        self.warm_start = None
+
+    def predict_proba(self, X):
+        return self.clf.predict_proba(self.scaler.transform(X))
+
+    def decision_function(self, X):
+        return self.clf.decision_function(self.scaler.transform(X))
+
+
 class SVMModel(ModelService):
     """SVM-based model for detecting AI-generated text.
 
@@ -43,6 +108,29 @@ class SVMModel(ModelService):
         print("[SVM] Finished fit.")
         return self
 
+    def partial_fit(self, X, y):
+        """One incremental step (used by `train_incremental`).
+
+        LinearSVC cannot learn incrementally, so incremental mode switches to a
+        `StreamingLinearSVM` that starts from the loaded LinearSVC's weights (a fresh one
+        for an untrained model); one that is already streaming (e.g. a resumed checkpoint)
+        keeps learning.
+        """
+        if not isinstance(self.model, StreamingLinearSVM):
+            warm_start = linear_coefficients(self.model)
+            if warm_start is not None:
+                print("[SVM] Continuing from the loaded LinearSVC weights")
+            self.model = StreamingLinearSVM(warm_start=warm_start)
+
+        if hasattr(X, "toarray"):
+            X = X.toarray()
+        X = np.asarray(X, dtype="float32")
+        if X.ndim == 1:
+            X = X.reshape(-1, 1)
+
+        self.model.partial_fit(X, np.asarray(y), classes=np.array([0, 1]))
+        return self
+
     def predict(self, X):
         """Return probability (or probabilities) that input(s) are AI-generated.
 
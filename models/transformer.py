@@ -1,20 +1,142 @@
+import contextlib
+import json
+import os
+import random
+import shutil
+import time
+
+import numpy as np
 import torch
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
+from torch.utils.data import DataLoader, Dataset as TorchDataset, Sampler
+from transformers import AutoTokenizer, AutoModelForSequenceClassification, get_linear_schedule_with_warmup
+
+from events.observer import ProgressSubject
+from .artifacts import replace_directory, staging_directory
+from .batching import length_grouped_batches, token_budget_batches
+from .checkpoint import CheckpointManager
+from .quantization import is_quantized_artifact, load_quantized, quantize_dynamic_int8, save_quantized
 from .service import ModelService
+from .windows import aggregate_windows, window_inputs
 
+MAX_LENGTH = 512
+EXPORT_FORMAT = 1
 
-class TransformerModel(ModelService):
-    def __init__(self, model_name="distilbert-base-uncased", device=None):
-        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-        self.model = AutoModelForSequenceClassification.from_pretrained(
-            model_name, num_labels=2
-        )
-        self.device = device if device else torch.device(
+
+class TokenizedTexts(TorchDataset):
+    """Unpadded token ids (+ labels); padding happens per batch in the collate function."""
+
+    def __init__(self, input_ids, labels=None):
+        self.input_ids = input_ids
+        self.labels = labels
+
+    def __len__(self):
+        return len(self.input_ids)
+
+    def __getitem__(self, i):
+        item = {"input_ids": self.input_ids[i]}
+        if self.labels is not None:
+            item["labels"] = int(self.labels[i])
+        return item
+
+
+class LengthGroupedSampler(Sampler):
+    """Batch sampler over `length_grouped_batches`; reshuffled every epoch via `set_epoch`.
+
+    The plan depends only on (lengths, batch_size, seed, epoch), so `start_batch` resumes an
+    epoch at the exact batch where a previous run stopped.
+    """
+
+    def __init__(self, lengths, batch_size: int, shuffle: bool = True, seed: int = 42):
+        self.lengths = np.asarray(lengths)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.seed = seed
+        self.epoch = 0
+        self.start_batch = 0
+
+    def set_epoch(self, epoch: int, start_batch: int = 0) -> None:
+        self.epoch = epoch
+        self.start_batch = start_batch
+
+    def __iter__(self):
+        batches = length_grouped_batches(self.lengths, self.batch_size, self.shuffle, self.seed + self.epoch)
+        return iter([b.tolist() for b in batches[self.start_batch:]])
+
+    def __len__(self):
+        return -(-len(self.lengths) // self.batch_size)
+
+
+def cpu_bf16_supported():
+    """Native bfloat16 matmuls on this CPU: oneDNN plus AVX512-BF16 or AMX tiles.
+
+    Without them CPU autocast still runs, but emulated bf16 is slower than fp32.
+    """
+    if not torch.backends.mkldnn.is_available():
+        return False
+    probes = ("_is_avx512_bf16_supported", "_is_amx_tile_supported")
+    return any(getattr(torch.cpu, name, lambda: False)() for name in probes)
+
+
+def autocast_dtype(device, bf16=None):
+    """bfloat16 when requested (None: when the device supports it natively), otherwise None (fp32).
+
+    `bf16=True` on a device without bf16 support raises instead of silently running fp32.
+    """
+    if bf16 is False:
+        return None
+    device = torch.device(device)
+    if device.type == "cuda":
+        supported = torch.cuda.is_bf16_supported()
+    elif device.type == "cpu":
+        supported = cpu_bf16_supported()
+    else:
+        supported = False
+    if bf16 is True and not supported:
+        raise RuntimeError(f"bf16 autocast is not supported on {device}")
+    return torch.bfloat16 if supported else None
+
+
+class TransformerModel(ModelService, ProgressSubject):
+    def __init__(self, model_name="distilbert-base-uncased", device=None, max_length=MAX_LENGTH, lr=1e-5):
+        """`model_name=None` builds an empty shell for `load` (no pretrained download)."""
+        ProgressSubject.__init__(self)
+        self.device = torch.device(device) if device else torch.device(
             "cuda" if torch.cuda.is_available() else "cpu"
         )
-        self.model.to(self.device)
-        self.optimizer = torch.optim.Adam(self.model.parameters(), lr=1e-5)
+        self.max_length = max_length
+        self.lr = lr
+        self.tokenizer = self.model = self.optimizer = None
+        self.quantized = False
+        if model_name is not None:
+            self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+            self.model = AutoModelForSequenceClassification.from_pretrained(
+                model_name, num_labels=2
+            )
+            self.model.to(self.device)
+            self.optimizer = torch.optim.Adam(self.model.parameters(), lr=lr)
+        self.scheduler = None
         self.criterion = torch.nn.CrossEntropyLoss()
+        self.history = []
+        # inputs longer than max_length: "truncate" or "window" (see configure_long_inputs)
+        self.long_inputs = "truncate"
+        self.window_overlap = 64
+        self.max_windows = 16
+        self.window_aggregate = "mean"
+
+    def configure_long_inputs(self, mode="window", overlap=64, max_windows=16, aggregate="mean"):
+        """Score over-length inputs on overlapping windows instead of truncating them.
+
+        Each text is cut into windows of `max_length` tokens sharing `overlap` tokens, at
+        most `max_windows` per text (bounding the worst-case latency), and the window
+        probabilities are combined with `aggregate`: "mean", "max" or "length" (token-weighted).
+        """
+        if mode not in ("truncate", "window"):
+            raise ValueError(f"mode must be 'truncate' or 'window', got {mode!r}")
+        self.long_inputs = mode
+        self.window_overlap = overlap
+        self.max_windows = max_windows
+        self.window_aggregate = aggregate
+        return self
 
     def encode(self, texts):
         """Tokenize input texts and move tensors to device."""
@@ -22,41 +144,302 @@ class TransformerModel(ModelService):
             texts,
             return_tensors="pt",
             truncation=True,
+            max_length=self.max_length,
             padding=True
         ).to(self.device)
 
+    def tokenize(self, texts, max_length=None):
+        """Unpadded token ids per text (batched fast tokenizer), truncated to `max_length`."""
+        return self.tokenizer(
+            list(texts),
+            truncation=True,
+            max_length=max_length or self.max_length,
+        )["input_ids"]
+
+    def _collate(self, items):
+        # dynamic padding: each batch is padded only to its own longest sequence
+        return self.tokenizer.pad(items, return_tensors="pt")
+
+    def loader(self, texts, labels=None, batch_size=16, shuffle=True, seed=42, max_length=None):
+        """DataLoader of length-grouped, dynamically padded batches."""
+        return self.ids_loader(self.tokenize(texts, max_length), labels, batch_size, shuffle, seed)
+
+    def ids_loader(self, input_ids, labels=None, batch_size=16, shuffle=True, seed=42):
+        """`loader` over already tokenized sequences."""
+        lengths = input_ids.lengths() if hasattr(input_ids, "lengths") else [len(ids) for ids in input_ids]
+        sampler = LengthGroupedSampler(lengths, batch_size, shuffle, seed)
+        return DataLoader(TokenizedTexts(input_ids, labels), batch_sampler=sampler, collate_fn=self._collate)
+
     def get_label_from_probs(self, probs):
         """Return label and probability based on model outputs."""
-        p_machine = float(probs[0, 1].cpu().item())
+        return self.result(float(probs[0, 1].cpu().item()))
+
+    @staticmethod
+    def result(p_machine: float):
+        """`predict`'s response for a machine probability (also used for batched predictions)."""
         label = "machine" if p_machine >= 0.5 else "human"
-        return {"label": label, "probability_machine": p_machine}
+        return {"label": label, "probability_machine": float(p_machine)}
 
-    def train(self, batch: list, labels: list):
-        self.model.train()
-        inputs = self.encode(batch)
-        labels_tensor = torch.tensor(labels).to(self.device)
+    def train(self, X, y, **kwargs):
+        """Fine-tune on texts `X` / labels `y` (see `fit`)."""
+        return self.fit(X, y, **kwargs)
 
-        outputs = self.model(**inputs)
-        loss = self.criterion(outputs.logits, labels_tensor)
-        loss.backward()
-        self.optimizer.step()
+    def fit(self, texts, labels, epochs=1, batch_size=16, grad_accum_steps=1, max_length=None,
+            bf16=None, warmup_ratio=0.0, max_grad_norm=1.0, seed=42, log_every=20,
+            checkpoint_dir=None, checkpoint_every=500, keep_checkpoints=3, resume=False,
+            overwrite_checkpoints=False, input_ids=None):
+        """Mini-batch fine-tuning.
+
+        Batches hold samples of similar token length and are padded per batch. The optimizer
+        steps every `grad_accum_steps` batches (effective batch `batch_size * grad_accum_steps`)
+        under a linear warmup/decay schedule. `bf16=None` autocasts to bfloat16 where the
+        device supports it natively (bf16 CUDA GPUs; CPUs with AVX512-BF16 or AMX), `bf16=True`
+        requires it. Every `log_every` optimizer steps observers receive the loss and
+        the throughput in samples/s.
+
+        With `checkpoint_dir`, model, optimizer, scheduler, RNG state and the position in the
+        epoch are saved every `checkpoint_every` optimizer steps (the newest
+        `keep_checkpoints` are kept). `resume=True` continues from the latest checkpoint at
+        the batch after the last optimizer step; texts, labels and batching settings must be
+        the ones of the interrupted run. A new run refuses a directory that already holds
+        checkpoints unless `overwrite_checkpoints=True` deletes them.
+
+        `input_ids` (e.g. a `data.token_store` corpus view) skips tokenization; `texts` is
+        then ignored.
+        """
+        if self.quantized:
+            raise RuntimeError("a quantized TransformerModel is inference-only; fine-tune the fp32 model")
+        torch.manual_seed(seed)
+        if self.optimizer is None:  # loaded from an inference export
+            self.optimizer = torch.optim.Adam(self.model.parameters(), lr=self.lr)
+        labels = np.asarray(labels)
+        if input_ids is None:
+            input_ids = self.tokenize(texts, max_length)
+        data = self.ids_loader(input_ids, labels, batch_size, shuffle=True, seed=seed)
+        n_batches = len(data.batch_sampler)
+        steps_per_epoch = -(-n_batches // grad_accum_steps)
+        total_steps = steps_per_epoch * epochs
+        self.scheduler = get_linear_schedule_with_warmup(
+            self.optimizer, int(warmup_ratio * total_steps), total_steps
+        )
+        dtype = autocast_dtype(self.device, bf16)
+        run = {"samples": len(labels), "batch_size": batch_size, "grad_accum_steps": grad_accum_steps,
+               "seed": seed, "max_length": max_length or self.max_length}
+        checkpoints = CheckpointManager(checkpoint_dir, keep=keep_checkpoints) if checkpoint_dir else None
+        self.history = []
+
+        step, start_epoch, start_batch = 0, 0, 0
+        if checkpoints is not None and checkpoints.latest() is not None and not resume:
+            if not overwrite_checkpoints:
+                raise FileExistsError(
+                    f"{checkpoint_dir} holds checkpoints of an earlier run; resume it or "
+                    f"pass overwrite_checkpoints=True (or use another directory)"
+                )
+            checkpoints.clear()
+        if resume and checkpoints is not None and checkpoints.latest() is not None:
+            checkpoints.adopt()
+            step, start_epoch, start_batch = self._restore(checkpoints.load(), run)
+            self.notify({"step": "resume_transformer", "optimizer_step": step, "epoch": start_epoch,
+                         "batch": start_batch, "progress": round(100 * step / total_steps)})
+
+        self.model.train()
         self.optimizer.zero_grad()
-        return loss.item()
+        for epoch in range(start_epoch, epochs):
+            skip = start_batch if epoch == start_epoch else 0
+            data.batch_sampler.set_epoch(epoch, skip)
+            window_loss, window_samples, window_start = 0.0, 0, time.perf_counter()
+            for i, batch in enumerate(data, start=skip):
+                batch = batch.to(self.device)
+                labels_tensor = batch.pop("labels")
+                with self._autocast(dtype):
+                    logits = self.model(**batch).logits
+                # the loss is averaged over the accumulated batches, in fp32; the last
+                # window of an epoch may hold fewer than `grad_accum_steps` of them
+                accumulated = min(grad_accum_steps, n_batches - i // grad_accum_steps * grad_accum_steps)
+                loss = self.criterion(logits.float(), labels_tensor) / accumulated
+                loss.backward()
+                window_loss += loss.item() * len(labels_tensor) * accumulated
+                window_samples += len(labels_tensor)
+
+                if (i + 1) % grad_accum_steps and i + 1 != n_batches:
+                    continue
+                if max_grad_norm:
+                    torch.nn.utils.clip_grad_norm_(self.model.parameters(), max_grad_norm)
+                self.optimizer.step()
+                self.scheduler.step()
+                self.optimizer.zero_grad()
+                step += 1
+
+                if step % log_every == 0 or step == total_steps:
+                    elapsed = time.perf_counter() - window_start
+                    entry = {
+                        "step": "train_transformer",
+                        "epoch": epoch,
+                        "optimizer_step": step,
+                        "loss": window_loss / window_samples,
+                        "samples_per_s": window_samples / elapsed if elapsed else float("inf"),
+                        "lr": self.scheduler.get_last_lr()[0],
+                        "progress": round(100 * step / total_steps),
+                    }
+                    self.history.append(entry)
+                    self.notify(entry)
+                    window_loss, window_samples, window_start = 0.0, 0, time.perf_counter()
+
+                if checkpoints is not None and (step % checkpoint_every == 0 or step == total_steps):
+                    # position of the next sample: the rest of this epoch, or the next one
+                    position = (epoch, i + 1) if i + 1 < n_batches else (epoch + 1, 0)
+                    checkpoints.save(self._training_state(step, position, run), step)
+        self.model.eval()
+        return self
+
+    def _training_state(self, step, position, run):
+        return {
+            "model": self.model.state_dict(),
+            "optimizer": self.optimizer.state_dict(),
+            "scheduler": self.scheduler.state_dict(),
+            "rng": {
+                "python": random.getstate(),
+                "numpy": np.random.get_state(),
+                "torch": torch.get_rng_state(),
+                "cuda": torch.cuda.get_rng_state_all() if torch.cuda.is_available() else None,
+            },
+            "optimizer_step": step,
+            "epoch": position[0],
+            "batch": position[1],
+            "run": run,
+            "history": list(self.history),
+        }
+
+    def _restore(self, state, run):
+        if state["run"] != run:
+            raise ValueError(f"checkpoint was written by a different run: {state['run']} != {run}")
+        self.model.load_state_dict(state["model"])
+        self.optimizer.load_state_dict(state["optimizer"])
+        self.scheduler.load_state_dict(state["scheduler"])
+        rng = state["rng"]
+        random.setstate(rng["python"])
+        np.random.set_state(rng["numpy"])
+        torch.set_rng_state(rng["torch"])
+        if rng["cuda"] is not None and torch.cuda.is_available():
+            torch.cuda.set_rng_state_all(rng["cuda"])
+        self.history = list(state["history"])
+        return state["optimizer_step"], state["epoch"], state["batch"]
+
+    def _autocast(self, dtype):
+        if dtype is None:
+            return contextlib.nullcontext()
+        return torch.autocast(device_type=self.device.type, dtype=dtype)
 
     def predict(self, seq: str):
+        if self.long_inputs == "window":
+            return self.result(float(self.predict_windows([seq])[0]))
         self.model.eval()
-        inputs = self.encode([seq])  
+        inputs = self.encode([seq])
         with torch.no_grad():
             outputs = self.model(**inputs)
             probs = torch.softmax(outputs.logits, dim=-1)
-        return self.get_label_from_probs(probs) 
+        return self.get_label_from_probs(probs)
+
+    def predict_batch(self, texts, batch_size=32, max_length=None, max_tokens=None):
+        """P(machine) for many texts, in input order (length-sorted, dynamically padded batches)."""
+        if self.long_inputs == "window":
+            return self.predict_windows(texts, batch_size)
+        return self.predict_ids(self.tokenize(texts, max_length), batch_size, max_tokens)
+
+    def predict_windows(self, texts, batch_size=32, overlap=None, max_windows=None, aggregate=None):
+        """P(machine) per text from sliding windows; the windows of all texts share batches."""
+        windows, owners, weights = window_inputs(
+            self.tokenizer, texts, self.max_length,
+            overlap=self.window_overlap if overlap is None else overlap,
+            max_windows=max_windows or self.max_windows,
+        )
+        proba = self.predict_ids(windows, batch_size)
+        return aggregate_windows(proba, owners, weights, len(texts), aggregate or self.window_aggregate)
+
+    def predict_ids(self, input_ids, batch_size=32, max_tokens=None):
+        """P(machine) for already tokenized sequences, in input order.
+
+        Sequences are sorted by length; with `max_tokens` each batch is packed up to that
+        many padded tokens (many short inputs or few long ones), otherwise `batch_size` rows.
+        """
+        lengths = input_ids.lengths() if hasattr(input_ids, "lengths") else [len(ids) for ids in input_ids]
+        if max_tokens:
+            plan = token_budget_batches(lengths, max_tokens)
+        else:
+            plan = length_grouped_batches(lengths, batch_size, shuffle=False)
+        self.model.eval()
+        proba = np.empty(len(input_ids), dtype="float32")
+        with torch.no_grad():
+            for idx in plan:
+                batch = self._collate([{"input_ids": input_ids[i]} for i in idx]).to(self.device)
+                logits = self.model(**batch).logits
+                proba[idx] = torch.softmax(logits.float(), dim=-1)[:, 1].cpu().numpy()
+        return proba
 
     def save(self, path: str):
         import joblib
         joblib.dump(self, path)
         return path
 
+    def quantize(self):
+        """Switch to dynamic int8 Linear layers for CPU inference (drops the training state)."""
+        self.model = quantize_dynamic_int8(self.model)
+        self.device = torch.device("cpu")
+        self.optimizer = self.scheduler = None
+        self.quantized = True
+        return self
+
+    def export(self, directory: str):
+        """Inference-only artifact: `model.safetensors` + config, tokenizer files, `inference.json`.
+
+        No optimizer state and no pickle; `load(directory)` memory-maps the weights. The
+        artifact is staged next to `directory` and swapped in by `models.artifacts`, so an
+        earlier export stays loadable until the new one is complete. A quantized model is
+        written as an int8 artifact instead (see `models.quantization`).
+        """
+        if self.quantized:
+            return save_quantized(self.model, self.tokenizer, directory, max_length=self.max_length)
+        tmp = staging_directory(directory, ".export-")
+        try:
+            self.model.save_pretrained(tmp, safe_serialization=True)
+            self.tokenizer.save_pretrained(tmp)
+            with open(os.path.join(tmp, "inference.json"), "w") as f:
+                json.dump({"format": EXPORT_FORMAT, "max_length": self.max_length}, f, indent=2)
+            replace_directory(tmp, directory)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        return directory
+
+    def _load_export(self, directory: str):
+        with open(os.path.join(directory, "inference.json")) as f:
+            info = json.load(f)
+        if info.get("format") != EXPORT_FORMAT:
+            raise ValueError(f"unsupported transformer export format {info.get('format')} in {directory}")
+        self.tokenizer = AutoTokenizer.from_pretrained(directory)
+        # safetensors are memory-mapped and assigned directly: no random init of a throwaway model
+        self.model = AutoModelForSequenceClassification.from_pretrained(
+            directory, use_safetensors=True, low_cpu_mem_usage=True
+        )
+        self.model.to(self.device)
+        self.model.eval()
+        self.max_length = info.get("max_length", MAX_LENGTH)
+        self.optimizer = self.scheduler = None
+        return self
+
+    def _load_quantized(self, directory: str):
+        self.model, self.tokenizer, info = load_quantized(directory)
+        self.device = torch.device("cpu")
+        self.max_length = info.get("max_length", MAX_LENGTH)
+        self.optimizer = self.scheduler = None
+        self.quantized = True
+        return self
+
     def load(self, path: str):
+        """Load an `export` directory (inference only, fp32 or int8) or a pickled `save` file (resumable)."""
+        if os.path.isdir(path):
+            if is_quantized_artifact(path):
+                return self._load_quantized(path)
+            return self._load_export(path)
         import joblib
         loaded = joblib.load(path)
         self.tokenizer = loaded.tokenizer
@@ -64,4 +447,13 @@ class TransformerModel(ModelService):
         self.device = loaded.device
         self.optimizer = loaded.optimizer
         self.criterion = loaded.criterion
+        self.scheduler = getattr(loaded, "scheduler", None)
+        self.max_length = getattr(loaded, "max_length", MAX_LENGTH)
+        self.quantized = getattr(loaded, "quantized", False)
         return self
+
+    def __getstate__(self):
+        # observers (consoles, log files) belong to the training run, not to the artifact
+        state = self.__dict__.copy()
+        state["_observers"] = []
+        return state
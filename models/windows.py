@@ -0,0 +1,77 @@
+"""Sliding-window scoring of inputs longer than the transformer's context (no torch import).
+
+A long token sequence is cut into overlapping windows of at most `max_length` tokens
+(special tokens included); all windows of all texts are scored as ordinary batch rows and
+the window probabilities are folded back into one probability per text. `max_windows`
+caps the windows per text, so the cost of a huge upload is bounded: beyond the cap the
+windows are spread evenly over the document instead of covering all of it.
+"""
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+AGGREGATES = ("mean", "max", "length")
+
+
+def window_spans(n_tokens: int, window: int, overlap: int = 64, max_windows: int = 16) -> List[Tuple[int, int]]:
+    """[start, end) spans of at most `window` tokens, consecutive ones sharing `overlap` tokens.
+
+    The last span ends exactly at `n_tokens`. With more than `max_windows` spans, an evenly
+    spaced subset is kept (always the first and the last one).
+    """
+    if window < 1:
+        raise ValueError(f"window must be >= 1, got {window}")
+    if not 0 <= overlap < window:
+        raise ValueError(f"overlap must be in [0, {window}), got {overlap}")
+    if n_tokens <= window:
+        return [(0, n_tokens)]
+    step = window - overlap
+    starts = list(range(0, n_tokens - window, step)) + [n_tokens - window]
+    if len(starts) > max_windows:
+        keep = np.unique(np.linspace(0, len(starts) - 1, max(1, max_windows)).round().astype(int))
+        starts = [starts[i] for i in keep]
+    return [(s, s + window) for s in starts]
+
+
+def span_weights(spans: Sequence[Tuple[int, int]]) -> np.ndarray:
+    """Tokens each span adds that the previous spans did not cover (so every token counts once)."""
+    weights, covered = [], 0
+    for start, end in spans:
+        weights.append(end - max(start, covered))
+        covered = max(covered, end)
+    return np.asarray(weights, dtype="float64")
+
+
+def window_inputs(tokenizer, texts, max_length: int, overlap: int = 64,
+                  max_windows: int = 16) -> Tuple[List[List[int]], np.ndarray, np.ndarray]:
+    """(window input ids, owner text index, window weight) for `texts`.
+
+    Texts that fit in `max_length` give a single window identical to plain truncation-free
+    encoding.
+    """
+    budget = max_length - tokenizer.num_special_tokens_to_add(pair=False)
+    content = tokenizer(list(texts), add_special_tokens=False, truncation=False)["input_ids"]
+    windows, owners, weights = [], [], []
+    for owner, ids in enumerate(content):
+        spans = window_spans(len(ids), budget, min(overlap, budget - 1), max_windows)
+        for (start, end), weight in zip(spans, span_weights(spans)):
+            windows.append(tokenizer.build_inputs_with_special_tokens(ids[start:end]))
+            owners.append(owner)
+            weights.append(weight)
+    return windows, np.asarray(owners, dtype=np.int64), np.asarray(weights, dtype="float64")
+
+
+def aggregate_windows(proba: Sequence[float], owners: np.ndarray, weights: np.ndarray, n_texts: int,
+                      how: str = "mean") -> np.ndarray:
+    """One probability per text from its windows: plain mean, max, or token-weighted ("length") mean."""
+    if how not in AGGREGATES:
+        raise ValueError(f"aggregate must be one of {AGGREGATES}, got {how!r}")
+    proba = np.asarray(proba, dtype="float64")
+    if how == "max":
+        out = np.full(n_texts, -np.inf)
+        np.maximum.at(out, owners, proba)
+        return out.astype("float32")
+    w = np.ones_like(proba) if how == "mean" else np.maximum(weights, 1.0)
+    total = np.bincount(owners, weights=w * proba, minlength=n_texts)
+    norm = np.bincount(owners, weights=w, minlength=n_texts)
+    return (total / norm).astype("float32")
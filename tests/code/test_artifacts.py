@@ -0,0 +1,39 @@
+import os
+
+import pytest
+
+from models import artifacts
+from models.artifacts import replace_directory, staging_directory
+
+
+def stage(target, content):
+    tmp = staging_directory(str(target), ".test-")
+    with open(os.path.join(tmp, "weights"), "w") as f:
+        f.write(content)
+    return tmp
+
+
+def test_replaces_the_previous_artifact(tmp_path):
+    target = tmp_path / "export"
+    replace_directory(stage(target, "v1"), str(target))
+    replace_directory(stage(target, "v2"), str(target))
+    assert (target / "weights").read_text() == "v2"
+    assert [p.name for p in tmp_path.iterdir()] == ["export"]
+
+
+def test_failed_swap_keeps_the_previous_artifact(tmp_path, monkeypatch):
+    target = tmp_path / "export"
+    replace_directory(stage(target, "v1"), str(target))
+    tmp = stage(target, "v2")
+    real_replace = os.replace
+
+    def replace(src, dst):
+        if src == tmp:
+            raise OSError("disk full")
+        return real_replace(src, dst)
+
+    monkeypatch.setattr(artifacts.os, "replace", replace)
+    with pytest.raises(OSError):
+        replace_directory(tmp, str(target))
+    assert (target / "weights").read_text() == "v1"
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(["export", os.path.basename(tmp)])
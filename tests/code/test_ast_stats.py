@@ -0,0 +1,46 @@
+import ast
+
+from features.extractors.ast_stats import ASTStatsExtractor
+from features.parse_cache import ParseCache, parse_code
+
+PY = "class A:\n    def f(self, x):\n        if x:\n            return g(x)\n        for i in range(3):\n            print(i)\n"
+JAVA = ("public class Main {\n"
+        "  public static void main(String[] args) throws IOException {\n"
+        "    if (x > 0) { System.out.println(foo(x)); }\n"
+        "  }\n"
+        "  int foo(int a) { return a; }\n"
+        "}\n")
+
+
+def test_python_counts_match_ast_walk():
+    feats = ASTStatsExtractor().extract_features(PY, lang="python")
+    nodes = list(ast.walk(ast.parse(PY)))
+    assert feats["ast_parser"] == "python"
+    assert feats["ast_nodes"] == len(nodes)
+    assert feats["ast_funcs"] == 1 and feats["ast_classes"] == 1
+    assert feats["ast_ifs"] == 1 and feats["ast_loops"] == 1 and feats["ast_calls"] == 3
+    assert feats["ast_max_depth"] > 3 and feats["ast_max_branching"] >= 2
+
+
+def test_other_languages_use_the_token_tree():
+    feats = ASTStatsExtractor().extract_features(JAVA, lang="java")
+    assert feats["ast_parser"] == "tokens"
+    assert feats["ast_classes"] == 1
+    assert feats["ast_funcs"] == 2      # main(...) throws ... { and foo(...) {
+    assert feats["ast_calls"] == 2      # println(...) and foo(x)
+    assert feats["ast_ifs"] == 1 and feats["ast_returns"] == 1
+    assert feats["ast_max_depth"] >= 4
+
+
+def test_broken_python_falls_back_to_tokens():
+    feats = ASTStatsExtractor().extract_features("def f(:\n    return g(1\n", lang="python")
+    assert feats["ast_parser"] == "tokens"
+    assert feats["ast_funcs"] == 1 and feats["ast_returns"] == 1
+
+
+def test_parse_is_cached_by_content():
+    assert parse_code(PY, "python") is parse_code(PY, "py")
+    cache = ParseCache(maxsize=1)
+    first = cache.get(PY, "python")
+    cache.get(JAVA, "java")
+    assert cache.get(PY, "python") is not first
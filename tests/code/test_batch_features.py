@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from core.preprocessor import Preprocessor
+from features.extractors.basic import BasicFeatureExtractor
+
+
+CODES = [
+    "def f(x):\n    for i in range(x):\n        if i:   return i   \n",
+    "int main() {\r\n\t\tconst a = 1; // let\r\n\treturn a;\r\n}\r\n",
+    "x = 1\x00\x1c\n\n   \n\t\n",
+    "café = 'for' 　\nréturn if x  \n",
+    "function  var  let\tclass",
+    "",
+    "\n",
+]
+
+
+def _row_path(pre, fx, codes):
+    rows = []
+    for code in codes:
+        feats = fx.extract_features(pre.clean(code))
+        rows.append([float(feats[k]) for k in fx.FEATURE_ORDER])
+    return np.asarray(rows, dtype=np.float32)
+
+
+def test_clean_batch_matches_clean():
+    pre = Preprocessor()
+    out = pre.clean_batch(CODES)
+    assert out.to_pylist() == [pre.clean(c) for c in CODES]
+
+
+def test_clean_batch_non_strings_become_empty():
+    pre = Preprocessor()
+    out = pre.clean_batch(pd.Series(["a  b", None, 3], dtype=object))
+    assert out.to_pylist() == ["a b", "", ""]
+
+
+def test_extract_batch_matches_row_path():
+    pre = Preprocessor()
+    fx = BasicFeatureExtractor()
+
+    X = fx.extract_batch(pre.clean_batch(pd.Series(CODES)))
+
+    assert X.dtype == np.float32
+    assert X.shape == (len(CODES), len(fx.FEATURE_ORDER))
+    np.testing.assert_array_equal(X, _row_path(pre, fx, CODES))
+
+
+def test_extract_batch_accepts_arrow_column():
+    fx = BasicFeatureExtractor()
+    col = pa.chunked_array([CODES[:3], CODES[3:]])
+
+    X = fx.extract_batch(col)
+
+    np.testing.assert_array_equal(X, fx.extract_batch(CODES))
+    assert fx.extract_batch([]).shape == (0, 6)
@@ -0,0 +1,39 @@
+import numpy as np
+
+from models.batching import length_grouped_batches, padded_tokens, token_budget_batches
+
+
+def lengths(n=1000, seed=0):
+    return np.random.default_rng(seed).integers(5, 512, size=n)
+
+
+def test_every_sample_once_per_epoch():
+    lens = lengths()
+    for shuffle in (False, True):
+        batches = length_grouped_batches(lens, 16, shuffle=shuffle, seed=3)
+        assert sorted(np.concatenate(batches).tolist()) == list(range(len(lens)))
+        assert all(1 <= len(b) <= 16 for b in batches)
+
+
+def test_sorted_plan_starts_with_longest():
+    lens = lengths()
+    batches = length_grouped_batches(lens, 16, shuffle=False)
+    assert lens[batches[0]].min() >= lens[batches[1]].max()
+
+
+def test_grouping_cuts_padding_and_is_seeded():
+    lens = lengths()
+    grouped = length_grouped_batches(lens, 16, seed=1)
+    assert [b.tolist() for b in grouped] == [b.tolist() for b in length_grouped_batches(lens, 16, seed=1)]
+    assert [b.tolist() for b in grouped] != [b.tolist() for b in length_grouped_batches(lens, 16, seed=2)]
+    random = np.array_split(np.random.default_rng(1).permutation(len(lens)), len(lens) // 16)
+    assert padded_tokens(lens, grouped) < 0.75 * padded_tokens(lens, random)
+
+
+def test_token_budget_packs_short_inputs_and_isolates_long_ones():
+    lens = np.concatenate([lengths(), [4000]])
+    batches = token_budget_batches(lens, max_tokens=4096)
+    assert sorted(np.concatenate(batches).tolist()) == list(range(len(lens)))
+    assert batches[0].tolist() == [len(lens) - 1]          # over-budget input on its own
+    assert all(lens[b].max() * len(b) <= 4096 for b in batches[1:])
+    assert len(batches[-1]) > len(batches[1])               # short inputs share bigger batches
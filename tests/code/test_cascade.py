@@ -0,0 +1,76 @@
+import json
+
+import numpy as np
+
+from models.cascade import CascadePredictor, CascadeStage, simulate_cascade, tune_band, tune_cascade
+
+
+def test_confident_stage_answers_without_the_fallback():
+    calls = []
+    fallback = lambda code: calls.append(code) or 0.9
+    cascade = CascadePredictor([CascadeStage("svm", lambda code: 0.05, 0.2, 0.8)], fallback)
+    result = cascade.analyze("x = 1")
+    assert result["decided_by"] == "svm" and not result["escalated"]
+    assert result["label"] == "human" and calls == []
+
+
+def test_uncertain_input_escalates_through_every_stage():
+    stages = [CascadeStage("svm", lambda code: 0.5, 0.2, 0.8), CascadeStage("lstm", lambda code: 0.6, 0.3, 0.7)]
+    cascade = CascadePredictor(stages, fallback=lambda code: 0.95)
+    result = cascade.analyze("x = 1")
+    assert result["decided_by"] == "transformer" and result["label"] == "machine"
+    assert [s["stage"] for s in result["stages"]] == ["svm", "lstm", "transformer"]
+    assert cascade.stats()["escalation_rate"] == 1.0
+
+
+def test_stage_answers_are_labelled_with_the_stage_threshold():
+    svm = CascadeStage("svm", lambda code: 0.6, 0.2, 0.55, threshold=0.7)
+    cascade = CascadePredictor([svm], fallback=lambda code: 0.6)
+    result = cascade.analyze("x = 1")
+    # what `/predict/svm` answers for p=0.6; the transformer alone would say "machine"
+    assert result["decided_by"] == "svm" and result["label"] == "human"
+    assert CascadePredictor([], fallback=lambda code: 0.6).analyze("x = 1")["label"] == "machine"
+
+
+def test_stats_report_loaded_against_tuned_stages():
+    cascade = CascadePredictor([CascadeStage("svm", lambda code: 0.1)], fallback=None, tuned_stages=["svm", "lstm"])
+    stats = cascade.stats()
+    assert stats["loaded_stages"] == ["svm"] and stats["tuned_stages"] == ["svm", "lstm"]
+
+
+def test_without_fallback_the_last_stage_answers_as_uncertain():
+    cascade = CascadePredictor([CascadeStage("svm", lambda code: 0.55)], fallback=None)
+    result = cascade.analyze("x = 1")
+    assert result["decided_by"] == "svm" and result["uncertain"]
+
+
+def test_tuned_band_escalates_the_target_share_around_the_errors():
+    rng = np.random.default_rng(0)
+    y = rng.integers(0, 2, 1000)
+    proba = np.clip(y * 0.6 + 0.2 + rng.normal(0, 0.15, 1000), 0, 1)
+    low, high = tune_band(proba, y, 0.2)
+    escalated = (proba >= low) & (proba <= high)
+    assert abs(escalated.mean() - 0.2) < 0.01
+    assert low < 0.5 < high
+    # the kept rows are classified better than all rows
+    kept = ~escalated
+    assert np.mean((proba[kept] >= 0.5) == y[kept]) > np.mean((proba >= 0.5) == y)
+
+
+def test_tuned_cascade_matches_target_rate_and_simulation(tmp_path):
+    rng = np.random.default_rng(1)
+    y = rng.integers(0, 2, 2000)
+    stage_proba = {name: np.clip(y * 0.5 + 0.25 + rng.normal(0, 0.2, 2000), 0, 1) for name in ("svm", "lstm")}
+    stages = tune_cascade(stage_proba, y, target_rate=0.25)
+    bands = {s["name"]: (s["low"], s["high"]) for s in stages}
+    final, stage_of = simulate_cascade(stage_proba, y.astype(float), bands)
+    assert abs(np.mean(stage_of == 2) - 0.25) < 0.02
+    assert np.all(final[stage_of == 2] == y[stage_of == 2])
+
+    strict = tune_cascade(stage_proba, y, target_rate=0.25, thresholds={"svm": 0.7})
+    assert strict[0]["threshold"] == 0.7 and strict[1]["threshold"] == 0.5
+
+    path = tmp_path / "cascade.json"
+    path.write_text(json.dumps({"stages": stages}))
+    assert CascadePredictor.load_bands(str(path)) == bands
+    assert CascadePredictor.load_bands(str(tmp_path / "missing.json")) == {}
@@ -0,0 +1,59 @@
+import pickle
+
+import pytest
+
+from models.checkpoint import CheckpointManager
+
+
+def manager(path, keep=3):
+    return CheckpointManager(path, keep=keep, dump=pickle.dump, load=pickle.load)
+
+
+def test_keeps_the_newest_checkpoints(tmp_path):
+    ckpt = manager(tmp_path / "ckpt", keep=2)
+    assert ckpt.latest() is None and ckpt.load() is None
+    for step in (10, 20, 30):
+        ckpt.save({"step": step}, step)
+    assert [p.name for p in ckpt.checkpoints()] == ["step-000000020.pt", "step-000000030.pt"]
+    assert ckpt.load() == {"step": 30}
+    assert ckpt.load(ckpt.path(20)) == {"step": 20}
+
+
+def test_failed_write_keeps_previous_checkpoint(tmp_path):
+    ckpt = manager(tmp_path)
+    ckpt.save({"step": 1}, 1)
+
+    def crash(obj, f):
+        f.write(b"partial")
+        raise KeyboardInterrupt  # e.g. the node is recycled mid-write
+
+    broken = CheckpointManager(tmp_path, dump=crash, load=pickle.load)
+    with pytest.raises(KeyboardInterrupt):
+        broken.save({"step": 2}, 2)
+    assert [p.name for p in tmp_path.iterdir()] == ["step-000000001.pt"]
+    assert ckpt.load() == {"step": 1}
+
+
+def test_pruning_ignores_checkpoints_of_another_run(tmp_path):
+    earlier = manager(tmp_path, keep=2)
+    for step in (14, 16):
+        earlier.save({"run": "a", "step": step}, step)
+
+    current = manager(tmp_path, keep=2)
+    for step in (2, 4, 6):
+        current.save({"run": "b", "step": step}, step)
+    names = sorted(p.name for p in tmp_path.iterdir())
+    assert names == ["step-000000004.pt", "step-000000006.pt", "step-000000014.pt", "step-000000016.pt"]
+
+    current.clear()
+    assert current.latest() is None
+
+
+def test_resumed_run_prunes_its_adopted_checkpoints(tmp_path):
+    first = manager(tmp_path, keep=2)
+    for step in (1, 2):
+        first.save({"step": step}, step)
+    resumed = manager(tmp_path, keep=2)
+    resumed.adopt()
+    resumed.save({"step": 3}, 3)
+    assert [p.name for p in resumed.checkpoints()] == ["step-000000002.pt", "step-000000003.pt"]
@@ -0,0 +1,47 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from data.dataset import Dataset, hashing_vectorizer, iter_parquet
+
+
+def write_parquet(path, n):
+    codes = [f"def f{i}():\n    return {i}\n" if i % 5 else None for i in range(n)]
+    labels = [i % 2 if i % 7 else None for i in range(n)]
+    extra = ["x" * 1000] * n   # never read: not a projected column
+    pq.write_table(pa.table({"code": codes, "label": labels, "extra": extra}), path, row_group_size=16)
+    return codes, labels
+
+
+def test_iter_parquet_projects_and_drops_missing_rows(tmp_path):
+    path = tmp_path / "train.parquet"
+    codes, labels = write_parquet(path, 100)
+    chunks = list(iter_parquet(path, batch_rows=10))
+    assert all(len(c) <= 10 for c, _ in chunks)
+    got = [c for chunk, _ in chunks for c in chunk]
+    want = [c for c, l in zip(codes, labels) if c is not None and l is not None]
+    assert got == want
+    assert np.concatenate([y for _, y in chunks]).tolist() == [
+        l for c, l in zip(codes, labels) if c is not None and l is not None]
+
+
+def test_from_parquet_matches_one_shot_hashing(tmp_path):
+    path = tmp_path / "train.parquet"
+    codes, labels = write_parquet(path, 100)
+    ds = Dataset.from_parquet(path, hashing_vectorizer(), batch_rows=7)
+    kept = [c for c, l in zip(codes, labels) if c is not None and l is not None]
+    assert ds.X.shape == (len(kept), ds.vectorizer.n_features)
+    np.testing.assert_allclose(ds.X.toarray(), hashing_vectorizer().transform(kept).toarray())
+    assert len(ds.y) == len(kept)
+
+
+def test_from_parquet_default_is_the_six_term_tfidf(tmp_path):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    path = tmp_path / "train.parquet"
+    codes, labels = write_parquet(path, 100)
+    ds = Dataset.from_parquet(path, batch_rows=7)
+    kept = [c for c, l in zip(codes, labels) if c is not None and l is not None]
+    want = TfidfVectorizer(max_features=6).fit_transform(kept)
+    assert ds.X.shape == want.shape == (len(kept), 6)
+    np.testing.assert_allclose(ds.X.toarray(), want.toarray(), rtol=1e-6)
@@ -0,0 +1,73 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from data.embedding_store import EmbeddingStore
+from models.embedding_head import CachedEncoder, EmbeddingHeadModel
+from models.lstm import LSTMModel
+
+
+class FakeEncoder:
+    """Deterministic 'embeddings': code statistics, plus a count of encoded codes."""
+
+    embedding_version = "fake/1"
+
+    def __init__(self):
+        self.encoded = 0
+
+    def embed(self, codes):
+        self.encoded += len(codes)
+        return np.array([[len(c), c.count("\n"), c.count("_"), c.count(" ")] for c in codes], dtype=np.float32)
+
+
+def write_parquet(path):
+    codes = ["def f():\n    return 1\n", "x=1", None, "def f():\n    return 1\n", "my_long_name = other_name"]
+    pq.write_table(pa.table({"code": codes * 20, "label": [1, 0, 1, 1, 0] * 20}), path)
+    return codes * 20
+
+
+def test_store_embeds_distinct_codes_once(tmp_path):
+    path = tmp_path / "train.parquet"
+    codes = write_parquet(path)
+    encoder = FakeEncoder()
+    store = EmbeddingStore(tmp_path / "emb", chunk_rows=7)
+    stored = store.load(path, encoder)
+    assert encoder.encoded == 3 and stored.meta["distinct"] == 3
+    assert stored.E.dtype == np.float16
+
+    X, y = stored.labelled()
+    keep = [i for i, c in enumerate(codes) if c is not None]
+    assert X.shape == (len(keep), 4) and y.tolist() == [[1, 0, 1, 1, 0][i % 5] for i in keep]
+    np.testing.assert_allclose(X, FakeEncoder().embed([codes[i] for i in keep]), rtol=1e-3)
+
+    store.load(path, encoder)
+    assert encoder.encoded == 3                      # second load maps the stored matrix
+
+
+def test_cached_encoder_serves_repeats_without_the_encoder(tmp_path):
+    path = tmp_path / "train.parquet"
+    write_parquet(path)
+    corpus = EmbeddingStore(tmp_path / "emb").load(path, FakeEncoder())
+    encoder = FakeEncoder()
+    cached = CachedEncoder(encoder, corpus=corpus)
+
+    cached.embed(["x=1", "def f():\n    return 1\n"])   # both in the corpus
+    assert encoder.encoded == 0
+    cached.embed(["new_code()", "new_code()"])
+    cached.embed(["new_code()"])
+    assert encoder.encoded == 1
+
+
+@pytest.mark.filterwarnings("ignore::sklearn.exceptions.ConvergenceWarning")
+def test_head_trains_on_embeddings_and_round_trips(tmp_path):
+    path = tmp_path / "train.parquet"
+    write_parquet(path)
+    X, y = EmbeddingStore(tmp_path / "emb").load(path, FakeEncoder()).labelled()
+    model = EmbeddingHeadModel(FakeEncoder(), LSTMModel(hidden_layer_sizes=(8,), max_iter=50).train(X, y))
+    saved = model.save(str(tmp_path / "head.pkl"))
+
+    loaded = EmbeddingHeadModel(FakeEncoder(), LSTMModel()).load(saved)
+    p = loaded.predict(["x=1", "def f():\n    return 1\n"])
+    np.testing.assert_allclose(p, model.predict(["x=1", "def f():\n    return 1\n"]))
+    assert p.shape == (2,)
@@ -0,0 +1,70 @@
+import threading
+
+from core.feature_cache import FeatureCache, LRUCache, pipeline_version
+from core.prediction_facade import PredictionFacade
+from core.preprocessor import Preprocessor
+from features.extractors.basic import BasicFeatureExtractor
+from features.extractors.fused import FusedBasicExtractor
+
+
+class CountingModel:
+    def predict(self, X):
+        return [0.9]
+
+
+class CountingFused(FusedBasicExtractor):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def extract_features(self, code, lang=None):
+        self.calls += 1
+        return super().extract_features(code, lang)
+
+
+def test_lru_evicts_least_recent_and_counts():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1          # "b" is now least recent
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.stats() == {"size": 2, "maxsize": 2, "hits": 1, "misses": 1}
+
+
+def test_facades_with_the_same_pipeline_share_entries():
+    cache = FeatureCache()
+    fx = CountingFused()
+    first = PredictionFacade(CountingModel(), None, fx, cache=cache)
+    second = PredictionFacade(CountingModel(), None, fx, cache=cache)
+    legacy = PredictionFacade(CountingModel(), Preprocessor(), BasicFeatureExtractor(), cache=cache)
+    assert first.cache_version == legacy.cache_version
+
+    for facade in (first, second, legacy, first):
+        facade.analyze("def f():\n    return 1\n")
+    assert fx.calls == 1
+    assert cache.stats()["hits"] == 3
+
+
+def test_unversioned_pipelines_are_not_cached():
+    class Plain:
+        def extract_features(self, code, lang=None):
+            return {}
+    assert pipeline_version(Preprocessor(), Plain()) is None
+
+
+def test_concurrent_access_stays_bounded():
+    cache = LRUCache(maxsize=8)
+
+    def work(offset):
+        for i in range(200):
+            cache.get_or_compute((offset + i) % 16, lambda: i)
+
+    threads = [threading.Thread(target=work, args=(k,)) for k in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stats = cache.stats()
+    assert stats["size"] <= 8 and stats["hits"] + stats["misses"] == 800
+
@@ -0,0 +1,61 @@
+from features.decorator import (FeatureDecorator, CommentRemovalDecorator, IndentationStyleDecorator,
+                                IdentifierEntropyDecorator, PerplexityLikeDecorator, compile_pipeline)
+
+
+class CountingExtractor:
+    def __init__(self):
+        self.calls = []
+
+    def extract_features(self, code, lang=None):
+        self.calls.append(code)
+        return {"base_len": len(code)}
+
+
+class LegacyDecorator(FeatureDecorator):
+    """Old-style stage that still returns a new dict from `_post`."""
+    def _post(self, feats, code, lang):
+        d = dict(feats)
+        d["legacy_len"] = len(code)
+        return d
+
+
+CODE = "def f():\n\tx = 1  # one\n    return x\n"
+
+
+def nested(code, lang):
+    """What the chain computed when every decorator called the next one."""
+    pre = CommentRemovalDecorator(CountingExtractor())._pre(code, lang)
+    feats = {"base_len": len(pre), "legacy_len": len(pre), "comments_removed": True}
+    for dec in (IndentationStyleDecorator, IdentifierEntropyDecorator, PerplexityLikeDecorator):
+        feats = dec(CountingExtractor())._post(feats, code, lang)
+    return feats
+
+
+def test_plan_matches_nested_calls():
+    base = CountingExtractor()
+    chain = PerplexityLikeDecorator(
+                IdentifierEntropyDecorator(
+                    IndentationStyleDecorator(
+                        CommentRemovalDecorator(
+                            LegacyDecorator(base)))))
+    feats = chain.extract_features(CODE, lang="python")
+    assert feats == nested(CODE, "python")
+    assert list(feats) == list(nested(CODE, "python"))
+    assert base.calls == [CommentRemovalDecorator(base)._pre(CODE, "python")]
+
+
+def test_compile_flattens_the_chain():
+    base = CountingExtractor()
+    plan = compile_pipeline(PerplexityLikeDecorator(IndentationStyleDecorator(base)))
+    assert plan.base is base and len(plan.stages) == 2
+
+
+def test_instrumentation_is_opt_in(capsys):
+    quiet = PerplexityLikeDecorator(CountingExtractor())
+    quiet.extract_features(CODE)
+    assert capsys.readouterr().out == ""
+
+    loud = PerplexityLikeDecorator(CountingExtractor(), instrument=True)
+    loud.extract_features(CODE)
+    out = capsys.readouterr().out
+    assert "[LOG]" in out and "[TIME]" in out
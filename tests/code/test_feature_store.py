@@ -0,0 +1,46 @@
+import os
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from core.preprocessor import Preprocessor
+from data.feature_store import FeatureStore
+from features.extractors.basic import BasicFeatureExtractor
+
+
+def write_parquet(path, codes, labels):
+    pq.write_table(pa.table({"code": codes, "label": labels}), path, row_group_size=2)
+
+
+def test_store_materializes_once_and_mmaps(tmp_path):
+    data = tmp_path / "train.parquet"
+    codes = ["x = 1\n", None, "for i in y:\n\tpass\n", "def f():\n    return 2\n", "y\r\n"]
+    write_parquet(data, codes, [0, 1, None, 1, 0])
+    store = FeatureStore(tmp_path / "features")
+    pre, fx = Preprocessor(), BasicFeatureExtractor()
+
+    first = store.load(data, pre, fx)
+    assert isinstance(first.X, np.memmap)
+    np.testing.assert_array_equal(first.X, fx.extract_batch(pre.clean_batch(codes)))
+    X, y = first.labelled()
+    assert y.tolist() == [0, 1, 0] and X.shape == (3, len(fx.FEATURE_ORDER))
+
+    entry = store.entry(data, pre, fx)
+    stamp = os.stat(entry / "X.npy").st_mtime_ns
+    store.load(data, pre, fx)
+    assert os.stat(entry / "X.npy").st_mtime_ns == stamp
+
+
+def test_store_invalidates_when_the_parquet_changes(tmp_path):
+    data = tmp_path / "val.parquet"
+    store = FeatureStore(tmp_path / "features")
+    pre, fx = Preprocessor(), BasicFeatureExtractor()
+    write_parquet(data, ["a\n"], [1])
+    before = store.entry(data, pre, fx)
+    store.load(data, pre, fx)
+
+    write_parquet(data, ["a\n", "b\n\n"], [1, 0])
+    os.utime(data, ns=(1, 1))
+    assert store.entry(data, pre, fx) != before
+    assert store.load(data, pre, fx).X.shape[0] == 2
@@ -0,0 +1,18 @@
+from core.fingerprint import artifact_fingerprint
+
+
+def test_artifact_fingerprint_follows_rewritten_weights(tmp_path):
+    (tmp_path / "config.json").write_text("{}")
+    (tmp_path / "model.safetensors").write_bytes(b"v1")
+    before = artifact_fingerprint(tmp_path)
+    assert artifact_fingerprint(tmp_path) == before
+    (tmp_path / "model.safetensors").write_bytes(b"v2-retrained")
+    assert artifact_fingerprint(tmp_path) != before
+
+
+def test_artifact_fingerprint_of_a_single_file(tmp_path):
+    path = tmp_path / "model.pkl"
+    path.write_bytes(b"v1")
+    before = artifact_fingerprint(path)
+    path.write_bytes(b"v2-retrained")
+    assert artifact_fingerprint(path) != before
@@ -0,0 +1,55 @@
+import random
+from pathlib import Path
+
+import pytest
+
+from core.preprocessor import Preprocessor
+from core.prediction_facade import PredictionFacade
+from features.extractors.basic import BasicFeatureExtractor
+from features.extractors.fused import FusedBasicExtractor
+
+
+PIECES = [
+    "for", "while", "if", "class", "def", "return", "function", "var", "let", "const",
+    "fort", "_if", "éfor", "x1", "lets", " ", "  ", "\t", "\t\t", "\n", "\r", "\r\n",
+    "\x00", "\x0b", "\x1c", "\xa0", "\u3000", "é", ";", "(", ")", "{", "}", "#",
+]
+
+
+def _two_stage(code):
+    return BasicFeatureExtractor().extract_features(Preprocessor().clean(code))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_fused_matches_clean_then_extract(seed):
+    rng = random.Random(seed)
+    fused = FusedBasicExtractor(min_vectorized=0)
+    for _ in range(400):
+        code = "".join(rng.choice(PIECES) for _ in range(rng.randint(0, 80)))
+        assert fused.extract_features(code) == _two_stage(code), repr(code)
+
+
+@pytest.mark.parametrize("code", ["", "\n", "   \t  ", "\r\r\n", "x = 1\n\n\ndef f():  \n\treturn x\t \n"])
+def test_fused_edge_cases(code):
+    assert FusedBasicExtractor(min_vectorized=0).extract_features(code) == _two_stage(code)
+
+
+def test_fused_large_input_and_short_fallback_agree():
+    code = (Path(__file__).parent / "ai_code.py").read_text(encoding="utf-8") * 20
+    assert FusedBasicExtractor().extract_features(code) == _two_stage(code)
+    assert FusedBasicExtractor().extract_features("if x:\n  y") == _two_stage("if x:\n  y")
+
+
+def test_facade_without_preprocessor_passes_raw_code():
+    class Model:
+        def predict(self, X):
+            self.X = X
+            return [0.9]
+
+    model = Model()
+    facade = PredictionFacade(model=model, preprocessor=None, feature_extractor=FusedBasicExtractor())
+    out = facade.analyze("def f():\r\n    return 1   \r\n")
+
+    feats = _two_stage("def f():\r\n    return 1   \r\n")
+    assert model.X == [[float(feats[k]) for k in facade.feature_order]]
+    assert out["label"] == "machine"
@@ -0,0 +1,70 @@
+import os
+
+import numpy as np
+
+from data.dataset import Dataset
+from models.lstm import LSTMModel
+from models.mock import MockModel
+from models.svm import SVMModel
+
+import pytest
+
+
+def chunks(n_chunks=20, rows=64, seed=0):
+    rng = np.random.default_rng(seed)
+    out = []
+    for _ in range(n_chunks):
+        X = rng.normal(size=(rows, 6)).astype(np.float32)
+        y = (X[:, 0] + X[:, 1] > 0).astype(int)
+        out.append(Dataset(X, y))
+    return out
+
+
+@pytest.mark.parametrize("factory", [lambda: LSTMModel(learning_rate_init=1e-2), SVMModel])
+def test_train_incremental_learns_and_checkpoints(tmp_path, factory):
+    model = factory()
+    ckpt = str(tmp_path / "model.ckpt")
+    held_out = chunks(2, seed=1)
+    model.train_incremental(chunks(), held_out, eval_every=5, checkpoint_path=ckpt, checkpoint_every=5)
+
+    assert os.path.exists(ckpt) and not os.path.exists(ckpt + ".tmp")
+    assert [h["chunks"] for h in model.history] == [5, 10, 15, 20]
+    X, y = held_out[0].X, held_out[0].y
+    assert ((model.predict(X) > 0.5) == y).mean() > 0.8
+
+
+def test_early_stopping_restores_the_best_model():
+    class Worsening(LSTMModel):
+        """Validation loss only grows after the first evaluation."""
+        calls = 0
+
+        def partial_fit(self, X, y):
+            self.calls += 1
+            return super().partial_fit(X, 1 - y if self.calls > 5 else y)
+
+    model = Worsening(learning_rate_init=1e-2)
+    held_out = chunks(2, seed=1)
+    model.train_incremental(chunks(40), held_out, eval_every=5, patience=2)
+    losses = [h["val_loss"] for h in model.history]
+    assert len(losses) == 3          # best at chunk 5, then two worse evaluations
+    assert model.history[-1]["chunks"] == 15
+    assert model._held_out_loss(held_out) == pytest.approx(losses[0])
+
+
+def test_strategies_without_partial_fit_refuse():
+    with pytest.raises(NotImplementedError):
+        MockModel().train_incremental(chunks(1))
+
+
+def test_svm_partial_fit_continues_from_a_batch_trained_model():
+    data = chunks(10, seed=2)
+    X = np.concatenate([d.X for d in data])
+    y = np.concatenate([d.y for d in data])
+    model = SVMModel().train(X, y)
+    held_out = chunks(2, seed=1)[0]
+    before = ((model.predict(held_out.X) > 0.5) == held_out.y).mean()
+
+    new = chunks(1, rows=16, seed=3)[0]
+    model.partial_fit(new.X, new.y)
+    after = ((model.predict(held_out.X) > 0.5) == held_out.y).mean()
+    assert before > 0.95 and after > before - 0.03
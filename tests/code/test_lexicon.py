@@ -0,0 +1,57 @@
+import pytest
+
+from features.decorator import CommentRemovalDecorator
+from features.extractors.lexicon import Lexicon, LexiconExtractor, detect_language
+from features.lexicons import normalize_language
+
+
+SAMPLES = {
+    "python": "import os\ndef f(x):\n    for i in range(len(x)):\n        print(os.path.join('a', i))\n    return None\n",
+    "cpp": "#include <bits/stdc++.h>\nusing namespace std;\nint main(){ vector<int> v; v.push_back(1); std::cout << v.size() << endl; }",
+    "java": "public class Main { public static void main(String[] args) { System.out.println(Integer.parseInt(args[0])); } }",
+    "javascript": "function f(a) { let x = a.map(v => v * 2); console.log(JSON.stringify(x)); return x; }",
+    "go": "package main\nimport \"fmt\"\nfunc main() { x := make([]int, 0); fmt.Println(len(x)) }",
+}
+
+
+@pytest.mark.parametrize("lang", sorted(SAMPLES))
+def test_detect_language(lang):
+    assert detect_language(SAMPLES[lang]) == lang
+
+
+def test_counts_respect_word_boundaries_and_qualified_names():
+    lex = Lexicon({"java": {"keyword": ("for", "if"), "api": ("System.out.println",)}})
+    counts = lex.count("for (;;) { if (x) System.out.println(fortune); }")
+    by_term = {lex.terms[i][2]: int(c) for i, c in enumerate(counts)}
+    assert by_term == {"for": 1, "if": 1, "System.out.println": 1}
+
+
+def test_extractor_uses_given_language_and_per_term_features():
+    feats = LexiconExtractor(per_term=True).extract_features(SAMPLES["python"], lang="py")
+    assert feats["lex_lang"] == "python"
+    assert feats["lex_keyword"] == 6
+    assert feats["lex_keyword__for"] == 1
+    assert feats["lex_api__os.path.join"] == 1
+    assert feats["lex_total"] == feats["lex_keyword"] + feats["lex_builtin"] + feats["lex_api"]
+
+
+def test_extractor_without_matches():
+    feats = LexiconExtractor().extract_features("123 + 456")
+    assert feats == {"lex_lang": "unknown", "lex_api": 0, "lex_builtin": 0, "lex_keyword": 0, "lex_total": 0}
+
+
+def test_normalize_language_and_comment_markers():
+    assert normalize_language("C++") == "cpp"
+    assert normalize_language("JS") == "javascript"
+    assert normalize_language("cobol") is None
+
+    class Capture:
+        def extract_features(self, code, lang=None):
+            self.code = code
+            return {}
+
+    base = Capture()
+    CommentRemovalDecorator(base).extract_features("x = 1 # c\ny = 2 // d", lang="python")
+    assert base.code == "x = 1 \ny = 2 // d"
+    CommentRemovalDecorator(base).extract_features("int a; // c # d", lang="java")
+    assert base.code == "int a; "
@@ -0,0 +1,59 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core.micro_batcher import MicroBatcher
+
+
+class Recorder:
+    def __init__(self, delay=0.0):
+        self.batches = []
+        self.delay = delay
+
+    def __call__(self, items):
+        self.batches.append(list(items))
+        time.sleep(self.delay)
+        return [x * 2 for x in items]
+
+
+def test_concurrent_requests_share_forward_passes():
+    model = Recorder(delay=0.01)
+    batcher = MicroBatcher(model, max_batch=8, max_wait_ms=20)
+    with ThreadPoolExecutor(32) as pool:
+        results = list(pool.map(batcher, range(64)))
+    batcher.close()
+    assert results == [2 * i for i in range(64)]
+    assert max(len(b) for b in model.batches) <= 8
+    assert len(model.batches) < 64 / 2
+    assert batcher.stats()["items"] == 64
+
+
+def test_lone_request_waits_at_most_the_window():
+    batcher = MicroBatcher(Recorder(), max_batch=16, max_wait_ms=30)
+    start = time.perf_counter()
+    assert batcher(21) == 42
+    assert time.perf_counter() - start < 0.5
+    batcher.close()
+
+
+def test_failure_reaches_every_caller_of_the_batch():
+    def broken(items):
+        raise ValueError("boom")
+
+    batcher = MicroBatcher(broken, max_batch=4, max_wait_ms=50)
+    futures = [batcher.submit(i) for i in range(3)]
+    for f in futures:
+        with pytest.raises(ValueError, match="boom"):
+            f.result(timeout=5)
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.submit(1)
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.setenv("TRANSFORMER_BATCH_SIZE", "3")
+    monkeypatch.setenv("TRANSFORMER_BATCH_WAIT_MS", "7.5")
+    batcher = MicroBatcher.from_env("transformer", Recorder())
+    assert batcher.stats()["max_batch"] == 3 and batcher.stats()["max_wait_ms"] == 7.5
+    batcher.close()
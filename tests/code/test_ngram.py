@@ -0,0 +1,46 @@
+import random
+from collections import Counter
+
+import pytest
+
+from features.extractors.ngram import NgramStatsExtractor
+
+
+def _counter_ngrams(code, k, top):
+    s = code.replace("\n", " ")
+    grams = [s[i:i + k] for i in range(len(s) - k + 1)]
+    out = {}
+    for i, (g, c) in enumerate(Counter(grams).most_common(top), start=1):
+        out[f"ngram_{k}_{i}__{g}"] = c
+    out[f"ngram_{k}_uniq"] = len(set(grams))
+    return out
+
+
+def _docs(seed, n=200):
+    rng = random.Random(seed)
+    alpha = list("ab \n\tcé中")
+    docs = ["".join(rng.choice(alpha) for _ in range(rng.randint(0, 40))) for _ in range(n)]
+    return [d if i % 3 else d.encode("ascii", "ignore").decode() for i, d in enumerate(docs)]
+
+
+@pytest.mark.parametrize("k", [1, 2, 3, 5, 9])
+def test_matches_counter_including_tie_order(k):
+    ex = NgramStatsExtractor(k=k, top=5)
+    for code in _docs(k, n=60):
+        assert list(ex.extract_features(code).items()) == list(_counter_ngrams(code, k, 5).items())
+
+
+@pytest.mark.parametrize("k", [2, 4])
+def test_batch_matches_per_document(k):
+    ex = NgramStatsExtractor(k=k, top=3)
+    docs = _docs(100 + k)
+    assert ex.extract_batch(docs) == [_counter_ngrams(d, k, 3) for d in docs]
+
+
+def test_grams_do_not_span_documents():
+    ex = NgramStatsExtractor(k=3)
+    assert ex.extract_batch(["ab", "cd", None]) == [{"ngram_3_uniq": 0}] * 3
+    assert ex.extract_batch(["abab", "x"]) == [
+        {"ngram_3_1__aba": 1, "ngram_3_2__bab": 1, "ngram_3_uniq": 2},
+        {"ngram_3_uniq": 0},
+    ]
@@ -0,0 +1,67 @@
+import os
+
+import numpy as np
+
+from core.preprocessor import Preprocessor
+from events.observer import ProgressObserver
+from features.extractors.basic import BasicFeatureExtractor
+from features.parallel import ParallelExtractor
+
+
+class Recorder(ProgressObserver):
+    def __init__(self):
+        self.payloads = []
+
+    def update(self, subject, payload):
+        self.payloads.append(payload)
+
+
+class FragileExtractor(BasicFeatureExtractor):
+    """Fails on any batch that contains the poison row."""
+    def extract_batch(self, codes):
+        if any("POISON" in c for c in codes.to_pylist()):
+            raise ValueError("bad row")
+        return super().extract_batch(codes)
+
+
+CODES = [f"def f{i}():\n\treturn {i}  \n" * (i % 4 + 1) for i in range(50)]
+
+
+def test_pool_preserves_order_and_reports_progress():
+    pre, fx = Preprocessor(), BasicFeatureExtractor()
+    stage = ParallelExtractor(pre, fx, workers=2, chunk_rows=7)
+    recorder = Recorder()
+    stage.attach(recorder)
+    result = stage.extract(CODES)
+    np.testing.assert_array_equal(result.X, fx.extract_batch(pre.clean_batch(CODES)))
+    assert not result.failed.any()
+    assert recorder.payloads[-1]["progress"] == 100 and len(recorder.payloads) == 8
+
+
+def test_failures_stay_on_their_row():
+    codes = list(CODES)
+    codes[10] = "POISON"
+    pre, fx = Preprocessor(), FragileExtractor()
+    result = ParallelExtractor(pre, fx, workers=1, chunk_rows=8).extract(codes)
+    assert result.failed.tolist() == [i == 10 for i in range(len(codes))]
+    assert not result.X[10].any()
+    ok = [c for i, c in enumerate(codes) if i != 10]
+    np.testing.assert_array_equal(result.X[~result.failed], BasicFeatureExtractor().extract_batch(pre.clean_batch(ok)))
+
+
+class CrashingExtractor(BasicFeatureExtractor):
+    """Kills its worker process (like the OOM killer) on the poison row."""
+    def extract_batch(self, codes):
+        if any("CRASH" in c for c in codes.to_pylist()):
+            os._exit(1)
+        return super().extract_batch(codes)
+
+
+def test_dead_worker_only_loses_its_row():
+    codes = list(CODES)
+    codes[23] = "CRASH"
+    pre = Preprocessor()
+    result = ParallelExtractor(pre, CrashingExtractor(), workers=2, chunk_rows=8).extract(codes)
+    assert result.failed.tolist() == [i == 23 for i in range(len(codes))]
+    ok = [c for i, c in enumerate(codes) if i != 23]
+    np.testing.assert_array_equal(result.X[~result.failed], BasicFeatureExtractor().extract_batch(pre.clean_batch(ok)))
@@ -0,0 +1,47 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from features.student import StudentFeaturizer
+from models.student import DistilledStudent, soft_targets
+from training.distill import _has_code, student_chunks
+
+HUMAN = "def total(items):\n    s = 0\n    for item in items:\n        s += item\n    return s\n"
+MACHINE = ("def calculate_total_sum(input_list: list) -> int:\n"
+           "    \"\"\"Calculate the total sum of the list.\"\"\"\n"
+           "    return sum(input_list)\n")
+
+
+def test_featurizer_is_stateless():
+    featurizer = StudentFeaturizer()
+    X = featurizer.transform([HUMAN, MACHINE, None])
+    assert X.shape == (3, featurizer.n_features)
+    assert X.dtype == np.float32
+    # no fit: a row does not depend on the rest of the batch
+    assert (featurizer.transform([MACHINE]) != X[1]).nnz == 0
+
+
+def test_student_learns_soft_labels(tmp_path):
+    codes = [HUMAN, MACHINE] * 20
+    soft = np.array([0.1, 0.9] * 20)
+    student = DistilledStudent().train(codes, soft, epochs=10)
+    proba = student.predict([HUMAN, MACHINE])
+    assert proba[0] < 0.5 < proba[1]
+
+    path = student.save(str(tmp_path / "student.pkl"))
+    assert np.allclose(DistilledStudent().load(path).predict([HUMAN, MACHINE]), proba)
+
+
+def test_soft_targets_blend_with_ground_truth():
+    assert np.allclose(soft_targets([0.8, 0.2], [0, 1], alpha=0.5), [0.4, 0.6])
+    assert np.allclose(soft_targets([0.8, 0.2], [0, 1], alpha=1.0), [0.8, 0.2])
+
+
+def test_student_chunks_skip_rows_without_teacher_label(tmp_path):
+    path = tmp_path / "unlabeled.parquet"
+    pq.write_table(pa.table({"code": ["a", None, "b", "c", "d"]}), path)
+    soft = np.array([0.9, np.nan, 0.2, 0.7, 0.4], dtype="float32")
+    chunks = list(student_chunks(path, soft, alpha=1.0, chunk_rows=2))
+    assert [c for codes, _ in chunks for c in codes] == ["a", "b", "c", "d"]
+    assert np.allclose(np.concatenate([t for _, t in chunks]), [0.9, 0.2, 0.7, 0.4])
+    assert _has_code(path, chunk_rows=2).tolist() == [True, False, True, True, True]
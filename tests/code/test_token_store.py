@@ -0,0 +1,64 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from core.preprocessor import Preprocessor
+from data.token_store import TokenStore
+
+
+class CharTokenizer:
+    """Character-code tokenizer with the call signature of a HF tokenizer."""
+
+    name_or_path = "chars"
+
+    def __len__(self):
+        return 256
+
+    def __call__(self, texts, truncation=True, max_length=None):
+        return {"input_ids": [[ord(c) % 256 for c in t][:max_length] for t in texts]}
+
+
+def write_parquet(path, n):
+    codes = [f"def f{i}():   \n    return {'x' * (i % 40)}\n" if i % 9 else None for i in range(n)]
+    labels = [i % 2 for i in range(n)]
+    pq.write_table(pa.table({"code": codes, "label": labels}), path)
+    return codes, labels
+
+
+def test_corpus_matches_direct_tokenization(tmp_path):
+    path = tmp_path / "train.parquet"
+    codes, labels = write_parquet(path, 500)
+    tok = CharTokenizer()
+    store = TokenStore(tmp_path / "tokens", workers=4, chunk_rows=32)
+    corpus = store.load(path, tok, max_length=24)
+
+    assert len(corpus) == 500 and corpus.meta["rows"] == 500
+    assert corpus.valid.tolist() == [c is not None for c in codes]
+    assert corpus.labels.tolist() == labels
+    for i in (1, 17, 499):
+        assert corpus[i].tolist() == tok([codes[i]], max_length=24)["input_ids"][0]
+    assert len(corpus[0]) == 0                       # missing code: empty row
+    assert corpus.lengths().max() <= 24
+
+
+def test_entry_is_reused_and_keyed_by_settings(tmp_path):
+    path = tmp_path / "train.parquet"
+    codes, _ = write_parquet(path, 50)
+    store = TokenStore(tmp_path / "tokens")
+    first = store.load(path, CharTokenizer(), max_length=16)
+    assert store.load(path, CharTokenizer(), max_length=16).meta == first.meta
+    assert len(list((tmp_path / "tokens").iterdir())) == 1
+
+    cleaned = store.load(path, CharTokenizer(), max_length=64, preprocessor=Preprocessor())
+    assert len(list((tmp_path / "tokens").iterdir())) == 2
+    assert "   \n" not in "".join(map(chr, cleaned[1]))     # trailing spaces cleaned away
+
+
+def test_subset_is_a_zero_copy_view(tmp_path):
+    path = tmp_path / "train.parquet"
+    write_parquet(path, 50)
+    corpus = TokenStore(tmp_path / "tokens").load(path, CharTokenizer(), max_length=16)
+    view = corpus.subset([3, 1])
+    assert len(view) == 2 and view.labels.tolist() == [1, 1]
+    assert view.lengths().tolist() == [len(corpus[3]), len(corpus[1])]
+    assert np.shares_memory(view[0], corpus.ids)
@@ -0,0 +1,26 @@
+import json
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from training.train_all import main
+
+
+def test_train_all_fits_every_strategy_from_one_feature_pass(tmp_path):
+    human = ["x = 1\nprint(x)\n", "for i in range(3):\n  print(i)\n", "a=b+c\n"]
+    machine = ["def add(a, b):\n    return a + b\n\n\n", "class A:\n    def f(self):\n        return 1\n"]
+    codes = (human + machine) * 12
+    labels = ([0] * len(human) + [1] * len(machine)) * 12
+    data = tmp_path / "train.parquet"
+    pq.write_table(pa.table({"code": codes, "label": labels}), data)
+
+    report = main(["--data", str(data), "--out", str(tmp_path / "out"),
+                   "--features-root", str(tmp_path / "features")])
+
+    assert set(report["models"]) == {"adaboost", "svm", "lstm"}
+    for res in report["models"].values():
+        assert res["train_status"] == "ok" and res["eval_status"] == "ok"
+        assert 0.0 <= res["f1"] <= 1.0 and (tmp_path / "out").joinpath(res["artifact"].split("/")[-1]).exists()
+    saved = json.loads((tmp_path / "out" / "training_report.json").read_text())
+    assert saved["samples"] == len(codes)
+    assert len(list((tmp_path / "features").iterdir())) == 1
@@ -0,0 +1,61 @@
+import numpy as np
+
+from data.dataset import Dataset
+from events.observer import ProgressObserver
+from models.adaboost import AdaBoostStrategy
+from models.lstm import LSTMModel
+from models.service import ModelService
+from training.shared_arrays import SharedArrays, attach
+from training.trainer import Trainer
+
+
+class Recorder(ProgressObserver):
+    def __init__(self):
+        self.payloads = []
+
+    def update(self, subject, payload):
+        self.payloads.append(payload)
+
+
+class Broken(ModelService):
+    def train(self, X, y):
+        raise RuntimeError("boom")
+
+    def predict(self, X):
+        return np.zeros(len(X))
+
+
+def make_data(n=120, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 6)).astype(np.float32)
+    y = (X[:, 0] + X[:, 1] > 0).astype(np.int32)
+    return Dataset(X, y)
+
+
+def test_shared_arrays_round_trip():
+    X = np.arange(12, dtype=np.float32).reshape(3, 4)
+    with SharedArrays() as shared:
+        spec = shared.put(X)
+        with attach(spec, None) as (view, missing):
+            np.testing.assert_array_equal(view, X)
+            assert missing is None
+
+
+def test_strategies_fit_concurrently_and_report_progress():
+    recorder = Recorder()
+    trainer = Trainer()
+    trainer.attach(recorder)
+    models, results = (trainer.prepareData(make_data(), make_data(seed=1))
+                              .setModels({"adaboost": AdaBoostStrategy(), "lstm": LSTMModel(max_iter=50),
+                                          "broken": Broken()})
+                              .initializeModel()
+                              .fitModel(workers=2)
+                              .evaluateModel()
+                              .build())
+    assert results["adaboost"]["train_status"] == "ok" and results["adaboost"]["accuracy"] > 0.7
+    assert results["lstm"]["eval_status"] == "ok"
+    assert results["broken"]["train_status"] == "error" and "boom" in results["broken"]["error"]
+    assert models["adaboost"].is_trained()
+    assert len(models["lstm"].predict(make_data(5).X)) == 5
+    steps = [p["step"] for p in recorder.payloads]
+    assert "fit:adaboost" in steps and steps[-1] == "eval"
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from models.windows import aggregate_windows, span_weights, window_inputs, window_spans
+
+
+class WordTokenizer:
+    """Whitespace tokenizer with [CLS] ... [SEP] framing, shaped like a HF tokenizer."""
+
+    CLS, SEP = -1, -2
+
+    def num_special_tokens_to_add(self, pair=False):
+        return 2
+
+    def __call__(self, texts, add_special_tokens=True, truncation=False):
+        return {"input_ids": [[len(w) for w in t.split()] for t in texts]}
+
+    def build_inputs_with_special_tokens(self, ids):
+        return [self.CLS, *ids, self.SEP]
+
+
+def test_spans_overlap_and_cover_the_document():
+    spans = window_spans(1000, 128, overlap=32, max_windows=100)
+    assert spans[0] == (0, 128) and spans[-1] == (872, 1000)
+    assert all(e - s == 128 for s, e in spans)
+    assert all(a[1] - b[0] >= 32 for a, b in zip(spans, spans[1:]))
+    assert span_weights(spans).sum() == 1000
+
+
+def test_short_input_is_one_window_and_cap_bounds_the_cost():
+    assert window_spans(50, 128) == [(0, 50)]
+    capped = window_spans(100_000, 128, overlap=32, max_windows=8)
+    assert len(capped) == 8
+    assert capped[0][0] == 0 and capped[-1][1] == 100_000
+
+
+def test_window_inputs_respect_max_length():
+    texts = ["a " * 3, "bb " * 25]
+    windows, owners, weights = window_inputs(WordTokenizer(), texts, max_length=10, overlap=2)
+    assert all(len(w) <= 10 and w[0] == WordTokenizer.CLS and w[-1] == WordTokenizer.SEP for w in windows)
+    assert owners.tolist().count(0) == 1 and owners.tolist().count(1) > 1
+    assert weights[owners == 1].sum() == 25
+
+
+def test_aggregates():
+    owners = np.array([0, 1, 1, 1])
+    weights = np.array([5.0, 8.0, 6.0, 2.0])
+    proba = [0.2, 0.9, 0.1, 0.5]
+    assert aggregate_windows(proba, owners, weights, 2, "mean") == pytest.approx([0.2, 0.5])
+    assert aggregate_windows(proba, owners, weights, 2, "max") == pytest.approx([0.2, 0.9])
+    assert aggregate_windows(proba, owners, weights, 2, "length") == pytest.approx([0.2, (7.2 + 0.6 + 1.0) / 16])
+    with pytest.raises(ValueError):
+        aggregate_windows(proba, owners, weights, 2, "median")
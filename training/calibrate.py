@@ -4,7 +4,7 @@ from sklearn.metrics import f1_score
 
 from core.preprocessor import Preprocessor
 from features.extractors.basic import BasicFeatureExtractor
-from core.prediction_facade import PredictionFacade
+from data.feature_store import FeatureStore
 
 from models.lstm import LSTMModel
 from models.adaboost import AdaBoostStrategy
@@ -12,22 +12,13 @@ from models.svm import SVMModel
 
 SAMPLE_PATH = "data/test_sample.parquet"
 
-def make_X(df, pre, fx):
-    feature_order = PredictionFacade(None, None, None).feature_order
-    rows = []
-    for code in df["code"]:
-        cleaned = pre.clean(str(code))
-        feats = fx.extract_features(cleaned)
-        rows.append([float(feats.get(k, 0)) for k in feature_order])
-    return np.asarray(rows, dtype="float32")
-
 def main():
     df = pd.read_parquet(SAMPLE_PATH)
     y_true = df["label"].astype(int).values
 
     pre = Preprocessor()
     fx = BasicFeatureExtractor()
-    X = make_X(df, pre, fx)
+    X = FeatureStore().load(SAMPLE_PATH, pre, fx).X
 
     lstm = LSTMModel().load("data/lstm_model.pkl")
     ada  = AdaBoostStrategy().load("data/adaboost.pkl")
@@ -0,0 +1,185 @@
+"""Distil the transformer into a cheap classical student.
+
+    python -m training.distill [--teacher data/transformer_export] [--unlabeled data/train.parquet]
+                               [--val data/validation.parquet] [--out data/student.pkl]
+                               [--epochs 3] [--alpha 1.0] [--report data/distill_report.json]
+
+1. The teacher scores every code of `--unlabeled` (labels are not needed) in token-budget
+   batches over the token store; its probabilities are cached next to the tokens, so a
+   second run (other epochs, other alpha) skips the transformer entirely.
+2. The student (`models.student.DistilledStudent`: hashed character / token n-grams plus
+   lexicon and structural statistics, logistic regression) streams the same parquet in
+   chunks and learns the teacher's soft labels, blended with the ground truth when the
+   file has labels and `--alpha` < 1.
+3. Both models are scored on `--val`; the report gives the accuracy the student retains
+   and the per-request latency it saves.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pyarrow.parquet as pq
+
+from core.fingerprint import artifact_fingerprint
+from data.token_store import TokenStore
+from models.student import DistilledStudent, soft_targets
+from training.trainer import evaluation_metrics
+
+TEACHER_MAX_TOKENS = 16384
+CHUNK_ROWS = 4096
+LATENCY_SAMPLES = 200
+
+
+def teacher_soft_labels(teacher, teacher_path: str, path: str, store: TokenStore,
+                        max_tokens: int = TEACHER_MAX_TOKENS, chunk_rows: int = CHUNK_ROWS) -> np.ndarray:
+    """P(machine) from the teacher for every row of `path` (NaN where the code is missing)."""
+    entry = store.entry(path, teacher.tokenizer, teacher.max_length)
+    cache = entry.with_name(f"{entry.name}-teacher-{artifact_fingerprint(teacher_path)}.npy")
+    if cache.exists():
+        print(f"[DISTILL] Teacher labels from cache: {cache}")
+        return np.load(cache)
+
+    corpus = store.load(path, teacher.tokenizer, teacher.max_length)
+    rows = np.flatnonzero((corpus.lengths() > 0) & _has_code(path, chunk_rows))
+    soft = np.full(len(corpus), np.nan, dtype="float32")
+    start = time.perf_counter()
+    for begin in range(0, len(rows), chunk_rows):
+        chunk = rows[begin:begin + chunk_rows]
+        soft[chunk] = teacher.predict_ids(corpus.subset(chunk), max_tokens=max_tokens)
+        done = begin + len(chunk)
+        print(f"[DISTILL] Teacher: {done}/{len(rows)} rows "
+              f"({done / max(time.perf_counter() - start, 1e-9):.0f} rows/s)")
+
+    fd, tmp = tempfile.mkstemp(dir=cache.parent, suffix=".npy")
+    with os.fdopen(fd, "wb") as f:
+        np.save(f, soft)
+    os.replace(tmp, cache)
+    return soft
+
+
+def _has_code(path: str, chunk_rows: int = CHUNK_ROWS) -> np.ndarray:
+    """Rows whose code is not null, one column chunk in memory at a time."""
+    pf = pq.ParquetFile(path)
+    masks = [batch.column(0).is_valid().to_numpy(zero_copy_only=False)
+             for batch in pf.iter_batches(batch_size=chunk_rows, columns=["code"])]
+    return np.concatenate(masks) if masks else np.zeros(0, dtype=bool)
+
+
+def student_chunks(path: str, soft: np.ndarray, alpha: float, chunk_rows: int = CHUNK_ROWS):
+    """(codes, targets) chunks of `path` aligned with the teacher's labels, rows without one skipped."""
+    pf = pq.ParquetFile(path)
+    columns = ["code"] + (["label"] if alpha < 1.0 and "label" in pf.schema_arrow.names else [])
+    offset = 0
+    for batch in pf.iter_batches(batch_size=chunk_rows, columns=columns):
+        codes = batch.column(0).to_pylist()
+        target = soft[offset:offset + len(codes)]
+        hard = None
+        if len(columns) == 2:
+            labels = batch.column(1).to_numpy(zero_copy_only=False)
+            hard = np.where(np.isnan(labels.astype("float64")), target, labels)
+        keep = ~np.isnan(target)
+        offset += len(codes)
+        if not keep.any():
+            continue
+        yield ([c for c, k in zip(codes, keep) if k],
+               soft_targets(target[keep], None if hard is None else hard[keep], alpha))
+
+
+def per_request_latency(predict, codes, repeats: int = 1) -> float:
+    """Median seconds for one single-code prediction."""
+    times = []
+    for code in codes:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            predict(code)
+            times.append(time.perf_counter() - start)
+    return float(np.median(times)) if times else float("nan")
+
+
+def distillation_report(teacher, student: DistilledStudent, val_path: str, store: TokenStore,
+                        max_tokens: int = TEACHER_MAX_TOKENS, latency_samples: int = LATENCY_SAMPLES):
+    val = pq.read_table(val_path, columns=["code", "label"]).to_pandas().dropna(subset=["code", "label"])
+    codes = val["code"].astype(str).tolist()
+    y = val["label"].astype(int).to_numpy()
+
+    tokens = store.load(val_path, teacher.tokenizer, teacher.max_length).subset(val.index.to_numpy())
+    start = time.perf_counter()
+    teacher_proba = teacher.predict_ids(tokens, max_tokens=max_tokens)
+    teacher_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    student_proba = student.predict(codes)
+    student_seconds = time.perf_counter() - start
+
+    sample = codes[:latency_samples]
+    teacher_latency = per_request_latency(teacher.predict, sample)
+    student_latency = per_request_latency(student.predict, sample)
+
+    teacher_metrics = evaluation_metrics(y, teacher_proba)
+    student_metrics = evaluation_metrics(y, student_proba)
+    return {
+        "validation_rows": len(y),
+        "teacher": {**teacher_metrics, "batch_seconds": teacher_seconds, "latency_ms": 1000 * teacher_latency},
+        "student": {**student_metrics, "batch_seconds": student_seconds, "latency_ms": 1000 * student_latency},
+        "agreement": float(np.mean((teacher_proba > 0.5) == (student_proba > 0.5))),
+        "accuracy_retained": student_metrics["accuracy"] / teacher_metrics["accuracy"]
+        if teacher_metrics["accuracy"] else None,
+        "f1_retained": student_metrics["f1"] / teacher_metrics["f1"] if teacher_metrics["f1"] else None,
+        "latency_saved": 1.0 - student_latency / teacher_latency if teacher_latency else None,
+        "speedup": teacher_latency / student_latency if student_latency else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Distil the transformer into a classical student.")
+    parser.add_argument("--teacher", default="data/transformer_export", help="export dir or pickled model")
+    parser.add_argument("--unlabeled", default="data/train.parquet", help="parquet with a `code` column")
+    parser.add_argument("--val", default="data/validation.parquet")
+    parser.add_argument("--out", default="data/student.pkl")
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--alpha", type=float, default=1.0,
+                        help="weight of the teacher's labels against the ground truth (1 = teacher only)")
+    parser.add_argument("--max-tokens", type=int, default=TEACHER_MAX_TOKENS,
+                        help="padded tokens per teacher forward pass")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--token-root", default="data/tokens")
+    parser.add_argument("--report", default="data/distill_report.json")
+    args = parser.parse_args(argv)
+
+    from models.transformer import TransformerModel  # torch only for the teacher
+    teacher = TransformerModel(model_name=None).load(args.teacher)
+    store = TokenStore(args.token_root)
+
+    soft = teacher_soft_labels(teacher, args.teacher, args.unlabeled, store, args.max_tokens, args.chunk_rows)
+    print(f"[DISTILL] Teacher labels: {int(np.sum(~np.isnan(soft)))} rows, "
+          f"mean P(machine)={np.nanmean(soft):.3f}")
+
+    student = DistilledStudent()
+    for epoch in range(args.epochs):
+        start, seen = time.perf_counter(), 0
+        for codes, targets in student_chunks(args.unlabeled, soft, args.alpha, args.chunk_rows):
+            student.partial_fit(codes, targets)
+            seen += len(codes)
+        print(f"[DISTILL] Student epoch {epoch + 1}/{args.epochs}: {seen} rows in {time.perf_counter() - start:.1f}s")
+    student.save(args.out)
+    print(f"[DISTILL] Student saved to {args.out}")
+
+    report = distillation_report(teacher, student, args.val, store, args.max_tokens)
+    print(f"[DISTILL] Teacher acc={report['teacher']['accuracy']:.4f} f1={report['teacher']['f1']:.4f} "
+          f"latency={report['teacher']['latency_ms']:.2f}ms")
+    print(f"[DISTILL] Student acc={report['student']['accuracy']:.4f} f1={report['student']['f1']:.4f} "
+          f"latency={report['student']['latency_ms']:.2f}ms")
+    print(f"[DISTILL] Accuracy retained={report['accuracy_retained']:.1%}, "
+          f"latency saved={report['latency_saved']:.1%} ({report['speedup']:.1f}x)")
+    if args.report:
+        Path(args.report).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.report).write_text(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,23 @@
+import os
+import time
+
 import numpy as np
 import pandas as pd
 from sklearn.metrics import accuracy_score, f1_score, roc_auc_score
 
 from core.preprocessor import Preprocessor
 from features.extractors.basic import BasicFeatureExtractor
-from core.prediction_facade import PredictionFacade
+from data.feature_store import FeatureStore
+from data.token_store import TokenStore
 
 from models.adaboost import AdaBoostStrategy
 from models.svm import SVMModel
 from models.lstm import LSTMModel
 from models.transformer import TransformerModel
 
-
-def make_X(df: pd.DataFrame, pre: Preprocessor, fx: BasicFeatureExtractor) -> np.ndarray:
-    """
-    X numeric pentru modelele clasice: exact ca PredictionFacade
-    """
-    feature_order = PredictionFacade(None, None, None).feature_order
-    rows = []
-    for code in df["code"].astype(str).tolist():
-        processed = pre.clean(code)
-        feats = fx.extract_features(processed)
-        rows.append([float(feats.get(f, 0.0)) for f in feature_order])
-    return np.asarray(rows, dtype="float32")
+VAL_PATH = "data/validation.parquet"
+# padded tokens per transformer forward pass (e.g. 32 x 512 or 512 x 32)
+EVAL_MAX_TOKENS = 16384
 
 
 def metrics_from_proba(y_true, proba, threshold=0.5):
@@ -58,11 +53,35 @@ def evaluate_classic(name: str, model, X_val, y_val):
     return m
 
 
-def evaluate_transformer(model: TransformerModel, df_val: pd.DataFrame, y_val: np.ndarray):
-    probas = []
-    for code in df_val["code"].astype(str).tolist():
-        res = model.predict(code)  # text brut
-        probas.append(pick_probability_from_transformer_result(res))
+def evaluate_transformer(model: TransformerModel, df_val: pd.DataFrame, y_val: np.ndarray,
+                         max_tokens: int = EVAL_MAX_TOKENS, tokens=None):
+    """`tokens`: the rows of `df_val` already tokenized (a `TokenStore` corpus), else tokenized here.
+
+    Scored the way the model serves: with `long_inputs == "window"` the rows that fill the
+    context (cut at `max_length`) go through `predict_windows`, the others `predict_ids`.
+    """
+    codes = df_val["code"].astype(str).tolist()  # text brut
+    mode = getattr(model, "long_inputs", "truncate")
+    long_rows = np.zeros(0, dtype=int)
+    start = time.perf_counter()
+    if hasattr(model, "predict_ids"):
+        # tokenized once, then length-sorted buckets of ~max_tokens padded tokens per forward pass
+        ids = tokens if tokens is not None else model.tokenize(codes)
+        probas = np.zeros(len(codes), dtype="float32")
+        rows = np.arange(len(codes))
+        if mode == "window":
+            lengths = ids.lengths() if hasattr(ids, "lengths") else np.array([len(x) for x in ids])
+            long_rows = np.flatnonzero(lengths >= model.max_length)
+            rows = np.flatnonzero(lengths < model.max_length)
+            if len(long_rows):
+                probas[long_rows] = model.predict_windows([codes[i] for i in long_rows])
+        short = ids.subset(rows) if hasattr(ids, "subset") else [ids[i] for i in rows]
+        probas[rows] = model.predict_ids(short, max_tokens=max_tokens)
+    else:
+        probas = [pick_probability_from_transformer_result(model.predict(code)) for code in codes]
+    elapsed = time.perf_counter() - start
+    print(f"transformer: scored {len(codes)} rows in {elapsed:.1f}s ({len(codes) / max(elapsed, 1e-9):.1f} rows/s), "
+          f"long inputs: {mode} ({len(long_rows)} rows windowed)")
 
     m = metrics_from_proba(y_val, probas)
     print(f"transformer: {m}")
@@ -70,12 +89,13 @@ def evaluate_transformer(model: TransformerModel, df_val: pd.DataFrame, y_val: n
 
 
 def main():
-    val = pd.read_parquet("data/validation.parquet")
+    val = pd.read_parquet(VAL_PATH)
     y_val = val["label"].astype(int).values
 
     pre = Preprocessor()
     fx = BasicFeatureExtractor()
-    X_val = make_X(val, pre, fx)
+    # X numeric pentru modelele clasice: exact ca PredictionFacade, din feature store
+    X_val = FeatureStore().load(VAL_PATH, pre, fx).X
 
     results = {}
 
@@ -98,14 +118,13 @@ def main():
         print("Could not evaluate lstm:", e)
 
     try:
-        transformer = TransformerModel().load("data/transformer_model.pkl")
-
-        # N = 500
-        # val_small = val.head(N)
-        # y_small = y_val[:N]
-        # results["transformer"] = evaluate_transformer(transformer, val_small, y_small)
-
-        results["transformer"] = evaluate_transformer(transformer, val, y_val)
+        transformer_path = "data/transformer_export" if os.path.isdir("data/transformer_export") else "data/transformer_model.pkl"
+        transformer = TransformerModel(model_name=None).load(transformer_path)
+        # the same long-input handling as main.py serves with
+        if os.getenv("TRANSFORMER_LONG_INPUTS", "window").lower() == "window":
+            transformer.configure_long_inputs("window", max_windows=int(os.getenv("TRANSFORMER_MAX_WINDOWS", "16")))
+        tokens = TokenStore().load(VAL_PATH, transformer.tokenizer, transformer.max_length)
+        results["transformer"] = evaluate_transformer(transformer, val, y_val, tokens=tokens)
     except Exception as e:
         print("Could not evaluate transformer:", e)
 
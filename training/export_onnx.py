@@ -0,0 +1,58 @@
+"""Convert the trained transformer to ONNX and check it against the torch model.
+
+    python -m training.export_onnx [--model data/transformer_export] [--out data/transformer_onnx]
+                                   [--data data/validation.parquet] [--samples 256] [--atol 1e-4]
+
+Prints the parity report (max/mean |P_torch - P_onnx|, label agreement) and the batched
+latency of both backends; exits with status 1 when parity fails.
+"""
+import argparse
+import json
+import sys
+import time
+
+import pandas as pd
+
+from core.preprocessor import Preprocessor
+from models.onnx_transformer import OnnxTransformerModel, export_onnx, parity_check
+from models.transformer import TransformerModel
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the transformer to ONNX and check parity.")
+    parser.add_argument("--model", default="data/transformer_export", help="inference export or pickle")
+    parser.add_argument("--out", default="data/transformer_onnx")
+    parser.add_argument("--data", default="data/validation.parquet")
+    parser.add_argument("--samples", type=int, default=256)
+    parser.add_argument("--atol", type=float, default=1e-4)
+    args = parser.parse_args(argv)
+
+    print(f"[ONNX EXPORT] Loading {args.model}...")
+    torch_model = TransformerModel(model_name=None).load(args.model)
+    export_onnx(torch_model, args.out)
+    onnx_model = OnnxTransformerModel().load(args.out)
+    print(f"[ONNX EXPORT] Exported to {args.out}")
+
+    df = pd.read_parquet(args.data, columns=["code"]).dropna().head(args.samples)
+    texts = Preprocessor().clean_batch(df["code"].astype(str)).to_pylist()
+    report = parity_check(torch_model, onnx_model, texts, atol=args.atol)
+    report["torch_seconds"] = timed(torch_model.predict_batch, texts)
+    report["onnx_seconds"] = timed(onnx_model.predict_batch, texts)
+    print(json.dumps(report, indent=2))
+
+    if not report["ok"]:
+        print(f"[ONNX EXPORT] ✗ Parity check failed (atol={args.atol})")
+        return 1
+    print(f"[ONNX EXPORT] ✓ Parity within {args.atol}; "
+          f"speed-up x{report['torch_seconds'] / max(report['onnx_seconds'], 1e-9):.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
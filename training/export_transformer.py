@@ -0,0 +1,35 @@
+"""Convert a trained transformer pickle into the inference-only export the API loads.
+
+    python -m training.export_transformer [--model data/transformer_model.pkl]
+                                          [--out data/transformer_export]
+"""
+import argparse
+import os
+import time
+
+from models.transformer import TransformerModel
+
+
+def dir_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the transformer for inference (safetensors).")
+    parser.add_argument("--model", default="data/transformer_model.pkl")
+    parser.add_argument("--out", default="data/transformer_export")
+    args = parser.parse_args(argv)
+
+    print(f"[TRANSFORMER EXPORT] Loading {args.model}...")
+    model = TransformerModel(model_name=None).load(args.model)
+    model.export(args.out)
+    print(f"[TRANSFORMER EXPORT] {os.path.getsize(args.model) / 2**20:.1f} MiB pickle -> "
+          f"{dir_size(args.out) / 2**20:.1f} MiB export")
+
+    start = time.perf_counter()
+    TransformerModel(model_name=None).load(args.out)
+    print(f"[TRANSFORMER EXPORT] ✓ Export saved to {args.out} (loads in {time.perf_counter() - start:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@ import pandas as pd
 
 from core.preprocessor import Preprocessor
 from features.extractors.basic import BasicFeatureExtractor
-from core.prediction_facade import PredictionFacade
+from data.feature_store import FeatureStore
 
 from models.lstm import LSTMModel
 from models.svm import SVMModel
@@ -15,15 +15,6 @@ W_LSTM = 0.8
 W_SVM = 0.2
 THRESHOLD = 0.95
 
-def make_X(df, pre, fx):
-    feature_order = PredictionFacade(None, None, None).feature_order
-    rows = []
-    for code in df["code"]:
-        cleaned = pre.clean(str(code))
-        feats = fx.extract_features(cleaned)
-        rows.append([float(feats.get(k, 0)) for k in feature_order])
-    return np.asarray(rows, dtype="float32")
-
 def main():
     df = pd.read_parquet(TEST_PATH)
 
@@ -34,7 +25,7 @@ def main():
 
     pre = Preprocessor()
     fx = BasicFeatureExtractor()
-    X = make_X(df, pre, fx)
+    X = FeatureStore().load(TEST_PATH, pre, fx).X
 
     lstm = LSTMModel().load("data/lstm_model.pkl")
     svm  = SVMModel().load("data/svm_model.pkl")
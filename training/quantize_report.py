@@ -0,0 +1,101 @@
+"""Quantize the transformer (and optionally CodeBERT) to int8 and report what it costs.
+
+    python -m training.quantize_report [--model data/transformer_export] [--out data/transformer_int8]
+                                       [--codebert microsoft/codebert-base --codebert-out data/codebert_int8]
+                                       [--data data/validation.parquet] [--samples 0]
+                                       [--report data/quantization_report.json]
+
+For each model the int8 artifact is written, reloaded from disk and compared with the fp32
+model on the validation rows: accuracy/F1/AUC delta, batched and single-request latency,
+and the size of the weights.
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from models.codebert import CodeBERTStrategy
+from models.quantization import serialized_bytes
+from models.transformer import TransformerModel
+from training.evaluate_models import VAL_PATH, metrics_from_proba
+
+SINGLE_REQUESTS = 50
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - start
+
+
+def single_latency_ms(predict_batch, texts) -> float:
+    """Median latency of one request (batch of one), as the API sees it without batching."""
+    times = [timed(predict_batch, [text])[1] for text in texts[:SINGLE_REQUESTS]]
+    return float(np.median(times) * 1000) if times else float("nan")
+
+
+def compare(name, fp32, int8, texts, y) -> dict:
+    p32, t32 = timed(fp32.predict_batch, texts)
+    p8, t8 = timed(int8.predict_batch, texts)
+    m32, m8 = metrics_from_proba(y, p32), metrics_from_proba(y, p8)
+    b32, b8 = serialized_bytes(fp32.model), serialized_bytes(int8.model)
+    report = {
+        "fp32": {**m32, "batch_seconds": t32, "single_ms": single_latency_ms(fp32.predict_batch, texts), "weights_mb": b32 / 2**20},
+        "int8": {**m8, "batch_seconds": t8, "single_ms": single_latency_ms(int8.predict_batch, texts), "weights_mb": b8 / 2**20},
+        "accuracy_delta": m8["accuracy"] - m32["accuracy"],
+        "f1_delta": m8["f1"] - m32["f1"],
+        "max_abs_proba_diff": float(np.max(np.abs(np.asarray(p32) - np.asarray(p8)))) if len(texts) else 0.0,
+        "speedup": t32 / t8 if t8 else float("inf"),
+        "memory_ratio": b8 / b32,
+    }
+    print(f"[QUANTIZATION] {name}: acc {m32['accuracy']:.4f} -> {m8['accuracy']:.4f} "
+          f"| x{report['speedup']:.2f} faster | weights {b32 / 2**20:.0f} -> {b8 / 2**20:.0f} MiB")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="int8 dynamic quantization report.")
+    parser.add_argument("--model", default="data/transformer_export", help="transformer export or pickle")
+    parser.add_argument("--out", default="data/transformer_int8")
+    parser.add_argument("--codebert", default=None, help="CodeBERT model to quantize as well")
+    parser.add_argument("--codebert-out", default="data/codebert_int8")
+    parser.add_argument("--data", default=VAL_PATH)
+    parser.add_argument("--samples", type=int, default=0, help="validation rows to use (0: all)")
+    parser.add_argument("--report", default="data/quantization_report.json")
+    args = parser.parse_args(argv)
+
+    val = pd.read_parquet(args.data, columns=["code", "label"]).dropna()
+    if args.samples:
+        val = val.head(args.samples)
+    texts = val["code"].astype(str).tolist()  # text brut, like /predict/transformer
+    y = val["label"].astype(int).values
+    report = {"data": args.data, "samples": len(texts), "models": {}}
+
+    print(f"[QUANTIZATION] Quantizing {args.model} -> {args.out}...")
+    TransformerModel(model_name=None).load(args.model).quantize().export(args.out)
+    report["models"]["transformer"] = compare(
+        "transformer",
+        TransformerModel(model_name=None, device="cpu").load(args.model),
+        TransformerModel(model_name=None).load(args.out),  # from disk: what the servers load
+        texts, y,
+    )
+
+    if args.codebert:
+        print(f"[QUANTIZATION] Quantizing {args.codebert} -> {args.codebert_out}...")
+        CodeBERTStrategy(args.codebert, device="cpu").export_quantized(args.codebert_out)
+        report["models"]["codebert"] = compare(
+            "codebert", CodeBERTStrategy(args.codebert, device="cpu"), CodeBERTStrategy(args.codebert_out), texts, y
+        )
+
+    os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"[QUANTIZATION] ✓ Report saved to {args.report}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Numpy / CSR matrices in `multiprocessing.shared_memory` for worker processes.
+
+The parent copies each array once into a shared block and hands workers a small picklable
+spec; `attach` maps the blocks back as arrays without copying.
+"""
+from __future__ import annotations
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterator, List
+
+import numpy as np
+import scipy.sparse as sp
+
+
+def _open(name: str) -> shared_memory.SharedMemory:
+    try:
+        # the parent owns (and unlinks) the block; workers must not register it again
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        return shared_memory.SharedMemory(name=name)
+
+
+class SharedArrays:
+    """Owner of the shared blocks: `put` copies arrays in, `close` unlinks every block."""
+
+    def __init__(self) -> None:
+        self._blocks: List[shared_memory.SharedMemory] = []
+
+    def _dense(self, arr) -> Dict[str, Any]:
+        arr = np.ascontiguousarray(arr)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, arr.nbytes))
+        self._blocks.append(shm)
+        np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+        return {"kind": "dense", "name": shm.name, "shape": arr.shape, "dtype": arr.dtype.str}
+
+    def put(self, arr) -> Dict[str, Any] | None:
+        if arr is None:
+            return None
+        if sp.issparse(arr):
+            arr = arr.tocsr()
+            return {"kind": "csr", "shape": arr.shape, "data": self._dense(arr.data),
+                    "indices": self._dense(arr.indices), "indptr": self._dense(arr.indptr)}
+        return self._dense(np.asarray(arr))
+
+    def close(self) -> None:
+        for shm in self._blocks:
+            shm.close()
+            shm.unlink()
+        self._blocks.clear()
+
+    def __enter__(self) -> "SharedArrays":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+@contextmanager
+def attach(*specs) -> Iterator[list]:
+    """Arrays for `specs` (None stays None), valid inside the block only."""
+    blocks: List[shared_memory.SharedMemory] = []
+
+    def view(spec):
+        if spec is None:
+            return None
+        if spec["kind"] == "csr":
+            parts = (view(spec["data"]), view(spec["indices"]), view(spec["indptr"]))
+            return sp.csr_matrix(parts, shape=spec["shape"], copy=False)
+        shm = _open(spec["name"])
+        blocks.append(shm)
+        return np.ndarray(spec["shape"], dtype=np.dtype(spec["dtype"]), buffer=shm.buf)
+
+    arrays = [view(s) for s in specs]
+    try:
+        yield arrays
+    finally:
+        arrays.clear()
+        for shm in blocks:
+            try:
+                shm.close()
+            except BufferError:
+                pass  # a view is still referenced; the mapping goes away with the process
@@ -1,8 +1,9 @@
-import pandas as pd
 import numpy as np
 from models.adaboost import AdaBoostStrategy
 from core.preprocessor import Preprocessor
 from features.extractors.basic import BasicFeatureExtractor
+from data.feature_store import FeatureStore
+from events.observer import ConsoleProgressObserver
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
 
@@ -10,53 +11,17 @@ if __name__ == "__main__":
     print("[ADABOOST TRAINING] Loading dataset...")
     
   #  df = pd.read_parquet("data/task_a_trial.parquet")
-    df = pd.read_parquet("data/train.parquet")
-    df = df.dropna(subset=["code", "label"])
-    
-    print(f"[ADABOOST TRAINING] Dataset size: {len(df)} samples")
-    
     # Initialize preprocessor and feature extractor (same as in prediction)
     preprocessor = Preprocessor()
     feature_extractor = BasicFeatureExtractor()
-    
-    # Feature order must match PredictionFacade
-    feature_order = [
-        "n_lines",
-        "avg_line_len",
-        "n_chars",
-        "n_tabs",
-        "n_spaces",
-        "n_keywords"
-    ]
-    
-    print("[ADABOOST TRAINING] Extracting features...")
-    X_list = []
-    y_list = []
-    
-    for idx, row in df.iterrows():
-        try:
-            code = str(row["code"])
-            label = int(row["label"])
-            
-            # Process code same way as in prediction
-            processed = preprocessor.clean(code)
-            features = feature_extractor.extract_features(processed)
-            
-            # Create feature vector in correct order
-            feature_vector = [float(features.get(f, 0)) for f in feature_order]
-            
-            X_list.append(feature_vector)
-            y_list.append(label)
-            
-            if (idx + 1) % 100 == 0:
-                print(f"[ADABOOST TRAINING] Processed {idx + 1}/{len(df)} samples...")
-                
-        except Exception as e:
-            print(f"[ADABOOST TRAINING] Error processing row {idx}: {e}")
-            continue
-    
-    X = np.array(X_list, dtype=np.float32)
-    y = np.array(y_list, dtype=np.int32)
+
+    # extracted once per (parquet, extractor version), then memory-mapped; labelled rows only
+    # extraction runs on every core (features.parallel), progress goes to the console observer
+    store = FeatureStore(observers=[ConsoleProgressObserver()])
+    features = store.load("data/train.parquet", preprocessor, feature_extractor)
+    X, y = features.labelled()
+
+    print(f"[ADABOOST TRAINING] Dataset size: {len(X)} samples")
     
     print(f"[ADABOOST TRAINING] Final dataset: X shape={X.shape}, y shape={y.shape}")
     
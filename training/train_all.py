@@ -0,0 +1,179 @@
+"""Train every model from one feature pass.
+
+    python -m training.train_all [--data data/train.parquet] [--models adaboost svm lstm]
+                                 [--transformer] [--jobs 0] [--out data]
+                                 [--report data/training_report.json]
+
+Features come from the feature store (extracted at most once per parquet / extractor
+version), the train/test split is made once, and every strategy is fitted and evaluated
+through `Trainer` on the same matrices (concurrently, one process per model, unless
+`--jobs 1`). Artifacts keep the paths the API loads from, and
+a combined timing/metrics report is written next to them.
+"""
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+import pyarrow.parquet as pq
+from sklearn.model_selection import train_test_split
+
+from core.preprocessor import Preprocessor
+from data.dataset import Dataset
+from data.feature_store import FeatureStore
+from events.observer import ConsoleProgressObserver
+from features.extractors.basic import BasicFeatureExtractor
+from models.adaboost import AdaBoostStrategy
+from models.lstm import LSTMModel
+from models.service import ModelService
+from models.svm import SVMModel
+from training.trainer import Trainer
+
+# name -> (factory, artifact file)
+STRATEGIES = {
+    "adaboost": (AdaBoostStrategy, "adaboost.pkl"),
+    "svm": (SVMModel, "svm_model.pkl"),
+    "lstm": (LSTMModel, "lstm_model.pkl"),
+}
+
+
+class PerTextModel(ModelService):
+    """Array `predict` for a text model whose `predict` scores one text and returns a dict (TransformerModel)."""
+
+    def __init__(self, model) -> None:
+        self.model = model
+
+    def train(self, X, y):
+        return self.model.train(X, y)
+
+    def predict(self, X):
+        if hasattr(self.model, "predict_batch"):
+            return self.model.predict_batch(list(X))
+        return np.array([self.model.predict(text)["probability_machine"] for text in X], dtype="float32")
+
+    def save(self, path: str):
+        return self.model.save(path)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Train all detector models from one feature pass.")
+    parser.add_argument("--data", default="data/train.parquet")
+    parser.add_argument("--models", nargs="+", default=list(STRATEGIES), choices=list(STRATEGIES))
+    parser.add_argument("--transformer", action="store_true", help="also fine-tune the transformer on the cleaned text")
+    parser.add_argument("--out", default="data", help="artifact directory")
+    parser.add_argument("--report", default=None, help="report path (default: <out>/training_report.json)")
+    parser.add_argument("--features-root", default="data/features", help="feature store directory")
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--jobs", type=int, default=0,
+                        help="models fitted concurrently (0: one process per model, 1: sequential)")
+    return parser.parse_args(argv)
+
+
+def load_texts(path: str, valid: np.ndarray, preprocessor: Preprocessor) -> np.ndarray:
+    """Cleaned text of the rows the feature store kept, for the transformer."""
+    codes = pq.read_table(path, columns=["code"]).column(0).filter(np.asarray(valid))
+    return np.array(preprocessor.clean_batch(codes).to_pylist(), dtype=object)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.makedirs(args.out, exist_ok=True)
+    report = {"data": args.data, "started_at": datetime.now().isoformat(), "models": {}}
+    observer = ConsoleProgressObserver()
+
+    print("[TRAIN ALL] Loading features...")
+    start = time.perf_counter()
+    preprocessor = Preprocessor()
+    features = FeatureStore(args.features_root, observers=[observer]).load(args.data, preprocessor, BasicFeatureExtractor())
+    X, y = features.labelled()
+    report["features_seconds"] = time.perf_counter() - start
+    report["samples"], report["n_features"] = X.shape
+    print(f"[TRAIN ALL] Dataset: X shape={X.shape}, y shape={y.shape}")
+
+    idx_train, idx_test = train_test_split(
+        np.arange(len(y)), test_size=args.test_size, random_state=args.seed, stratify=y
+    )
+    train = Dataset(np.asarray(X[idx_train]), np.asarray(y[idx_train]))
+    test = Dataset(np.asarray(X[idx_test]), np.asarray(y[idx_test]))
+    print(f"[TRAIN ALL] Train size: {len(idx_train)}, Test size: {len(idx_test)}")
+
+    if args.jobs != 1 and len(args.models) > 1:
+        report["models"].update(fit_concurrently(args, train, test, observer))
+    else:
+        for name in args.models:
+            factory, artifact = STRATEGIES[name]
+            report["models"][name] = fit_one(name, factory(), train, test, os.path.join(args.out, artifact), observer)
+
+    if args.transformer:
+        from models.transformer import TransformerModel
+        texts = load_texts(args.data, features.valid, preprocessor)
+        text_train = Dataset(list(texts[idx_train]), list(train.y))
+        text_test = Dataset(list(texts[idx_test]), test.y)
+        report["models"]["transformer"] = fit_one(
+            "transformer", PerTextModel(_observed(TransformerModel(), observer)), text_train, text_test,
+            os.path.join(args.out, "transformer_model.pkl"), observer,
+        )
+
+    report["finished_at"] = datetime.now().isoformat()
+    report_path = args.report or os.path.join(args.out, "training_report.json")
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print("\n[TRAIN ALL RESULTS]")
+    for name, res in report["models"].items():
+        print(f"  {name:<12} f1={res.get('f1', float('nan')):.4f}  acc={res.get('accuracy', float('nan')):.4f}"
+              f"  fit={res.get('fit_seconds', float('nan')):.1f}s")
+    print(f"[TRAIN ALL] ✓ Report saved to {report_path}")
+    return report
+
+
+def fit_concurrently(args, train: Dataset, test: Dataset, observer) -> dict:
+    """All classic strategies at once, each in its own process on the shared feature matrix."""
+    print(f"[TRAIN ALL] Training {', '.join(args.models)} concurrently...")
+    trainer = Trainer()
+    trainer.attach(observer)
+    models, results = (trainer.prepareData(train, test)
+                              .setModels({name: STRATEGIES[name][0]() for name in args.models})
+                              .initializeModel()
+                              .fitModel(workers=args.jobs or None)
+                              .evaluateModel()
+                              .build())
+    for name, res in results.items():
+        if res["train_status"] != "ok":
+            print(f"[TRAIN ALL] {name} failed:\n{res['error']}")
+            continue
+        artifact = os.path.join(args.out, STRATEGIES[name][1])
+        start = time.perf_counter()
+        models[name].save(artifact)
+        res["save_seconds"] = time.perf_counter() - start
+        res["artifact"] = artifact
+    return results
+
+
+def _observed(subject, observer):
+    subject.attach(observer)
+    return subject
+
+
+def fit_one(name, strategy, train: Dataset, test: Dataset, artifact: str, observer) -> dict:
+    print(f"[TRAIN ALL] Training {name}...")
+    trainer = Trainer()
+    trainer.attach(observer)
+    model, results = (trainer.prepareData(train, test)
+                             .setModel(strategy)
+                             .initializeModel()
+                             .fitModel()
+                             .evaluateModel()
+                             .build())
+    start = time.perf_counter()
+    model.save(artifact)
+    results["save_seconds"] = time.perf_counter() - start
+    results["artifact"] = artifact
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Train classical heads on cached CodeBERT embeddings.
+
+    python -m training.train_embedding_heads [--encoder microsoft/codebert-base]
+                                             [--data data/train.parquet] [--val data/validation.parquet]
+                                             [--heads lstm svm] [--out data]
+
+The encoder runs once per parquet (results land in the embedding store); every head after
+that trains on the float16 matrix in seconds. Heads are saved as
+`<out>/<head>_codebert_head.pkl`, loadable with `EmbeddingHeadModel(encoder, head).load(path)`.
+"""
+import argparse
+import os
+import time
+
+from data.embedding_store import EmbeddingStore
+from events.observer import ConsoleProgressObserver
+from models.codebert import CodeBERTStrategy
+from models.embedding_head import EmbeddingHeadModel
+from models.lstm import LSTMModel
+from models.svm import SVMModel
+from training.trainer import evaluation_metrics
+
+HEADS = {"lstm": LSTMModel, "svm": SVMModel}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train heads on cached CodeBERT embeddings.")
+    parser.add_argument("--encoder", default="microsoft/codebert-base", help="CodeBERT model or int8 artifact")
+    parser.add_argument("--data", default="data/train.parquet")
+    parser.add_argument("--val", default="data/validation.parquet")
+    parser.add_argument("--heads", nargs="+", default=list(HEADS), choices=list(HEADS))
+    parser.add_argument("--out", default="data")
+    parser.add_argument("--embeddings-root", default="data/embeddings")
+    args = parser.parse_args(argv)
+
+    encoder = CodeBERTStrategy(args.encoder)
+    store = EmbeddingStore(args.embeddings_root, observers=[ConsoleProgressObserver()])
+    print(f"[EMBEDDING HEADS] Embeddings: {encoder.embedding_version}")
+    X, y = store.load(args.data, encoder).labelled()
+    X_val, y_val = store.load(args.val, encoder).labelled()
+    print(f"[EMBEDDING HEADS] Train: X shape={X.shape}, Validation: X shape={X_val.shape}")
+
+    results = {}
+    for name in args.heads:
+        start = time.perf_counter()
+        head = HEADS[name]().train(X, y)
+        fit_seconds = time.perf_counter() - start
+        results[name] = {**evaluation_metrics(y_val, head.predict(X_val)), "fit_seconds": fit_seconds}
+        path = EmbeddingHeadModel(encoder, head).save(os.path.join(args.out, f"{name}_codebert_head.pkl"))
+        print(f"[EMBEDDING HEADS] {name}: f1={results[name]['f1']:.4f} acc={results[name]['accuracy']:.4f} "
+              f"fit={fit_seconds:.1f}s -> {path}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
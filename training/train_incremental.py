@@ -0,0 +1,69 @@
+"""Out-of-core training: stream feature chunks from parquet into `partial_fit`.
+
+    python -m training.train_incremental --model lstm [--data data/train.parquet]
+        [--eval data/validation.parquet] [--resume] [--epochs 1] [--batch-rows 8192]
+
+The model never sees more than one chunk at a time, so the dataset does not have to fit
+in memory. `--resume` starts from the saved model and folds the new data into it (e.g.
+freshly labelled production samples).
+"""
+import argparse
+import os
+
+from core.preprocessor import Preprocessor
+from data.dataset import Dataset
+from features.extractors.basic import BasicFeatureExtractor
+from models.lstm import LSTMModel
+from models.svm import SVMModel
+
+# name -> (factory, artifact file)
+STRATEGIES = {
+    "lstm": (LSTMModel, "lstm_model.pkl"),
+    "svm": (SVMModel, "svm_model.pkl"),
+}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Incremental (partial_fit) training over streamed chunks.")
+    parser.add_argument("--model", choices=list(STRATEGIES), default="lstm")
+    parser.add_argument("--data", default="data/train.parquet")
+    parser.add_argument("--eval", default=None, help="held-out parquet for early stopping")
+    parser.add_argument("--out", default="data")
+    parser.add_argument("--resume", action="store_true", help="continue from the saved model")
+    parser.add_argument("--epochs", type=int, default=1)
+    parser.add_argument("--batch-rows", type=int, default=8192)
+    parser.add_argument("--eval-every", type=int, default=10, help="chunks between held-out evaluations")
+    parser.add_argument("--patience", type=int, default=3)
+    parser.add_argument("--checkpoint-every", type=int, default=50, help="chunks between checkpoints")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    factory, artifact = STRATEGIES[args.model]
+    path = os.path.join(args.out, artifact)
+    checkpoint = os.path.join(args.out, f"{args.model}_incremental.ckpt.pkl")
+    os.makedirs(args.out, exist_ok=True)
+
+    model = factory()
+    if args.resume:
+        model.load(checkpoint if os.path.exists(checkpoint) else path)
+
+    pre, fx = Preprocessor(), BasicFeatureExtractor()
+    chunks = lambda: Dataset.stream_features(args.data, pre, fx, args.batch_rows)
+    eval_chunks = (lambda: Dataset.stream_features(args.eval, pre, fx, args.batch_rows)) if args.eval else None
+
+    print(f"[INCREMENTAL TRAINING] Streaming {args.data} into {args.model} ({args.batch_rows} rows per chunk)...")
+    model.train_incremental(chunks, eval_chunks, epochs=args.epochs, eval_every=args.eval_every,
+                            patience=args.patience, checkpoint_path=checkpoint,
+                            checkpoint_every=args.checkpoint_every)
+    for entry in model.history:
+        print(f"[INCREMENTAL TRAINING] chunk {entry['chunks']}: val_loss={entry['val_loss']:.4f}")
+
+    model.save(path)
+    print(f"[INCREMENTAL TRAINING] ✓ Model saved to {path}")
+    return model
+
+
+if __name__ == "__main__":
+    main()
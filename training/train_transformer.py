@@ -1,78 +1,85 @@
-import pandas as pd
+import argparse
+
 import numpy as np
-from models.transformer import TransformerModel
+from events.observer import ConsoleProgressObserver
+from models.transformer import MAX_LENGTH, TransformerModel
 from core.preprocessor import Preprocessor
-from features.extractors.basic import BasicFeatureExtractor
+from data.token_store import TokenStore
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
 
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Fine-tune the transformer detector.")
+    parser.add_argument("--data", default="data/train.parquet")
+    parser.add_argument("--epochs", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--grad-accum", type=int, default=1, help="batches per optimizer step")
+    parser.add_argument("--max-length", type=int, default=MAX_LENGTH, help="tokens kept per sample")
+    parser.add_argument("--lr", type=float, default=1e-5)
+    parser.add_argument("--warmup-ratio", type=float, default=0.0)
+    parser.add_argument("--bf16", action=argparse.BooleanOptionalAction, default=None,
+                        help="bfloat16 autocast (default: when the GPU / CPU supports it natively)")
+    parser.add_argument("--log-every", type=int, default=20, help="optimizer steps between progress reports")
+    parser.add_argument("--checkpoint-dir", default="data/checkpoints/transformer")
+    parser.add_argument("--checkpoint-every", type=int, default=500, help="optimizer steps between checkpoints")
+    parser.add_argument("--keep-checkpoints", type=int, default=3)
+    parser.add_argument("--resume", action="store_true", help="continue from the latest checkpoint")
+    parser.add_argument("--overwrite-checkpoints", action="store_true",
+                        help="delete the checkpoints of an earlier run in --checkpoint-dir and start over")
+    parser.add_argument("--token-root", default="data/tokens", help="tokenized corpus cache directory")
+    parser.add_argument("--eval-max-tokens", type=int, default=16384, help="padded tokens per evaluation batch")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
+    args = parse_args()
     print("[TRANSFORMER TRAINING] Loading dataset...")
    # df = pd.read_parquet("data/task_a_trial.parquet")
 
-    df = pd.read_parquet("data/train.parquet")
-    df = df.dropna(subset=["code", "label"])
-    
-    print(f"[TRANSFORMER TRAINING] Dataset size: {len(df)} samples")
-    
-    # Initialize preprocessor and feature extractor (same as in prediction)
+    # Initialize preprocessor (same as in prediction); the transformer reads the cleaned text
     preprocessor = Preprocessor()
-    feature_extractor = BasicFeatureExtractor()
-    
-    # Feature order must match PredictionFacade
-    feature_order = [
-        "n_lines",
-        "avg_line_len",
-        "n_chars",
-        "n_tabs",
-        "n_spaces",
-        "n_keywords"
-    ]
-    
-    print("[TRANSFORMER TRAINING] Preparing text inputs for transformer...")
-    X_list = []
-    y_list = []
-
-    for idx, row in df.iterrows():
-        try:
-            code = str(row["code"])
-            label = int(row["label"])
-
-            # Process code same way as in prediction and keep text for tokenizer
-            processed = preprocessor.clean(code)
-
-            X_list.append(processed)
-            y_list.append(label)
+    model = TransformerModel(max_length=args.max_length, lr=args.lr)
+    model.attach(ConsoleProgressObserver())
 
-            if (idx + 1) % 100 == 0:
-                print(f"[TRANSFORMER TRAINING] Processed {idx + 1}/{len(df)} samples...")
+    print("[TRANSFORMER TRAINING] Preparing token ids for transformer...")
+    # cleaned + tokenized once per (parquet, tokenizer, max_length); later runs map it from disk
+    corpus = TokenStore(args.token_root).load(args.data, model.tokenizer, args.max_length, preprocessor)
+    rows = np.flatnonzero(corpus.valid)
+    y = corpus.labels[rows]
 
-        except Exception as e:
-            print(f"[TRANSFORMER TRAINING] Error processing row {idx}: {e}")
-            continue
+    print(f"[TRANSFORMER TRAINING] Dataset size: {len(rows)} samples, {corpus.meta['tokens']} tokens")
 
-    X = np.array(X_list, dtype=object)
-    y = np.array(y_list, dtype=np.int32)
-    
-    print(f"[TRANSFORMER TRAINING] Final dataset: X shape={X.shape}, y shape={y.shape}")
-    
     # Split train/test
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
+    rows_train, rows_test, y_train, y_test = train_test_split(
+        rows, y, test_size=0.2, random_state=42, stratify=y
     )
     
-    print(f"[TRANSFORMER TRAINING] Train size: {len(X_train)}, Test size: {len(X_test)}")
+    print(f"[TRANSFORMER TRAINING] Train size: {len(rows_train)}, Test size: {len(rows_test)}")
 
     # Train model
     print("[TRANSFORMER TRAINING] Training model...")
-    model = TransformerModel()
-    model.train(list(X_train), list(y_train))
+    model.fit(
+        None, y_train,
+        input_ids=corpus.subset(rows_train),
+        epochs=args.epochs,
+        batch_size=args.batch_size,
+        grad_accum_steps=args.grad_accum,
+        bf16=args.bf16,
+        warmup_ratio=args.warmup_ratio,
+        log_every=args.log_every,
+        checkpoint_dir=args.checkpoint_dir,
+        checkpoint_every=args.checkpoint_every,
+        keep_checkpoints=args.keep_checkpoints,
+        resume=args.resume,
+        overwrite_checkpoints=args.overwrite_checkpoints,
+    )
     
     print("[TRANSFORMER TRAINING] Training complete!")
     
     # Evaluate
     print("[TRANSFORMER TRAINING] Evaluating model...")
-    y_pred_proba = model.predict(list(X_test))
+    y_pred_proba = model.predict_ids(corpus.subset(rows_test), max_tokens=args.eval_max_tokens)
     y_pred = (y_pred_proba > 0.5).astype(int)
     
     accuracy = accuracy_score(y_test, y_pred)
@@ -98,5 +105,6 @@ if __name__ == "__main__":
     # Save model
     print("\n[TRANSFORMER TRAINING] Saving model...")
     model.save("data/transformer_model.pkl")
+    model.export("data/transformer_export")
     
-    print("[TRANSFORMER TRAINING] ✓ Training complete! Model saved to data/transformer_model.pkl")
+    print("[TRANSFORMER TRAINING] ✓ Training complete! Model saved to data/transformer_model.pkl (inference export: data/transformer_export)")
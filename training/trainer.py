@@ -1,14 +1,29 @@
 from typing import Dict, Any
+import multiprocessing as mp
+import os
+import pickle
+import queue
+import time
+import traceback
+
+import numpy as np
+from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score
+
 from data.dataset import Dataset
 from models.service import ModelService
 from events.observer import ProgressSubject, ProgressObserver
 from aop.aspects import log_call, timeit, debug
+from training.shared_arrays import SharedArrays, attach
 
 class Trainer(ProgressSubject):
     def __init__(self):
         self.model_strategy: ModelService | None = None
         self.dataset: Dataset | None = None
+        self.eval_dataset: Dataset | None = None
         self.trained_model: ModelService | None = None
+        # several strategies: fitted concurrently, results keyed by name
+        self.model_strategies: Dict[str, ModelService] = {}
+        self.trained_models: Dict[str, ModelService] = {}
         self.results: dict = {}
         self._observers: list[ProgressObserver] = []
 
@@ -26,8 +41,9 @@ class Trainer(ProgressSubject):
     # Builder steps
     @timeit 
     @log_call      
-    def prepareData(self, dataset: Dataset):
+    def prepareData(self, dataset: Dataset, eval_dataset: Dataset | None = None):
         self.dataset = dataset
+        self.eval_dataset = eval_dataset
         self.notify({"step": "load_data", "progress": 10})
         return self
 
@@ -38,9 +54,20 @@ class Trainer(ProgressSubject):
         self.notify({"step": "set_model", "progress": 20})
         return self
 
+    @timeit 
+    @log_call      
+    def setModels(self, model_strategies: Dict[str, ModelService]):
+        self.model_strategies = dict(model_strategies)
+        self.notify({"step": "set_model", "progress": 20, "models": list(self.model_strategies)})
+        return self
+
     @timeit 
     @log_call     
     def initializeModel(self):
+        if self.model_strategies:
+            self.trained_models = dict(self.model_strategies)
+            self.notify({"step": "init_model", "progress": 40})
+            return self
         if not self.model_strategy:
             raise ValueError("Model strategy not set")
         self.trained_model = self.model_strategy
@@ -49,23 +76,142 @@ class Trainer(ProgressSubject):
 
     @timeit 
     @log_call      
-    def fitModel(self):
+    def fitModel(self, workers: int | None = None):
+        if self.trained_models:
+            return self._fit_concurrently(workers)
         if not self.trained_model or not self.dataset:
             raise ValueError("Missing model or dataset")
+        start = time.perf_counter()
         self.trained_model.train(self.dataset.X, self.dataset.y)
+        self.results["fit_seconds"] = time.perf_counter() - start
         self.results["train_status"] = "ok"
         self.notify({"step": "fit", "progress": 80})
         return self
 
     @timeit 
     @log_call      
-    def evaluateModel(self):
-        # aici mai târziu puneți Accuracy, F1 etc.
-        self.results["eval_status"] = "not_implemented"
+    def evaluateModel(self, threshold: float = 0.5):
+        if self.trained_models:
+            # evaluated in the fitting workers, next to each model
+            self.notify({"step": "eval", "progress": 100})
+            return self
+        if self.eval_dataset is None:
+            self.results["eval_status"] = "no_eval_data"
+            self.notify({"step": "eval", "progress": 100})
+            return self
+        start = time.perf_counter()
+        proba = np.asarray(self.trained_model.predict(self.eval_dataset.X), dtype="float32").reshape(-1)
+        self.results["eval_seconds"] = time.perf_counter() - start
+        self.results.update(evaluation_metrics(self.eval_dataset.y, proba, threshold))
+        self.results["eval_status"] = "ok"
         self.notify({"step": "eval", "progress": 100})
         return self
 
     @timeit 
     @log_call
     def build(self):
+        if self.trained_models:
+            return self.trained_models, self.results
         return self.trained_model, self.results
+
+    def _fit_concurrently(self, workers: int | None = None, threshold: float = 0.5):
+        """Fit (and evaluate) every strategy in its own process, at most `workers` at a time.
+
+        X / y live in shared memory, so each worker maps the same pages instead of receiving
+        a pickled copy. Workers stream progress through a queue that is relayed to the
+        observers, and send back the fitted strategy.
+        """
+        if not self.dataset:
+            raise ValueError("Missing model or dataset")
+        workers = workers or min(len(self.trained_models), os.cpu_count() or 1)
+        ctx = mp.get_context()
+        events = ctx.Queue()
+        waiting = list(self.trained_models.items())
+        running: Dict[str, Any] = {}
+        gone: set = set()   # exited without reporting: given one more poll to drain the queue
+        done = 0
+
+        with SharedArrays() as shared:
+            specs = [shared.put(self.dataset.X), shared.put(self.dataset.y)]
+            ev = self.eval_dataset
+            specs += [shared.put(ev.X), shared.put(ev.y)] if ev is not None else [None, None]
+
+            while waiting or running:
+                while waiting and len(running) < workers:
+                    name, strategy = waiting.pop(0)
+                    proc = ctx.Process(target=_fit_worker, args=(name, strategy, specs, threshold, events))
+                    proc.start()
+                    running[name] = proc
+                try:
+                    kind, name, body = events.get(timeout=1.0)
+                except queue.Empty:
+                    for name, proc in list(running.items()):
+                        if proc.is_alive():
+                            continue
+                        if name not in gone:
+                            gone.add(name)
+                            continue
+                        body = f"worker exited with code {proc.exitcode}"
+                        kind = "error"
+                        self._finish(name, running, kind, body)
+                        done += 1
+                        self.notify({"step": f"fit:{name}", "progress": round(100 * done / len(self.trained_models)), "error": body})
+                    continue
+
+                if kind == "progress":
+                    self.notify(body)
+                    continue
+                if name not in running:  # already reported as lost
+                    continue
+                self._finish(name, running, kind, body)
+                done += 1
+                self.notify({"step": f"fit:{name}", "progress": round(100 * done / len(self.trained_models)),
+                             "status": self.results[name]["train_status"]})
+
+        self.notify({"step": "fit", "progress": 80})
+        return self
+
+    def _finish(self, name: str, running: Dict[str, Any], kind: str, body) -> None:
+        proc = running.pop(name)
+        proc.join()
+        if kind == "done":
+            model_bytes, results = body
+            self.trained_models[name] = pickle.loads(model_bytes)
+            self.results[name] = results
+        else:
+            self.results[name] = {"train_status": "error", "error": body}
+
+
+def _fit_worker(name: str, strategy: ModelService, specs, threshold: float, events) -> None:
+    try:
+        with attach(*specs) as (X, y, X_eval, y_eval):
+            events.put(("progress", name, {"step": f"fit:{name}", "progress": 0, "pid": os.getpid()}))
+            start = time.perf_counter()
+            strategy.train(X, y)
+            results = {"fit_seconds": time.perf_counter() - start, "train_status": "ok"}
+            if X_eval is not None:
+                start = time.perf_counter()
+                proba = np.asarray(strategy.predict(X_eval), dtype="float32").reshape(-1)
+                results["eval_seconds"] = time.perf_counter() - start
+                results.update(evaluation_metrics(y_eval, proba, threshold))
+                results["eval_status"] = "ok"
+            # pickled here, while the shared blocks are still mapped
+            model_bytes = pickle.dumps(strategy)
+        events.put(("done", name, (model_bytes, results)))
+    except BaseException:
+        events.put(("error", name, traceback.format_exc()))
+
+
+def evaluation_metrics(y_true, proba, threshold: float = 0.5) -> Dict[str, Any]:
+    y_pred = (proba > threshold).astype(int)
+    metrics = {
+        "accuracy": float(accuracy_score(y_true, y_pred)),
+        "precision": float(precision_score(y_true, y_pred, zero_division=0)),
+        "recall": float(recall_score(y_true, y_pred, zero_division=0)),
+        "f1": float(f1_score(y_true, y_pred, zero_division=0)),
+    }
+    try:
+        metrics["auc"] = float(roc_auc_score(y_true, proba))
+    except ValueError:
+        metrics["auc"] = None
+    return metrics
@@ -4,7 +4,7 @@ from sklearn.metrics import f1_score
 
 from core.preprocessor import Preprocessor
 from features.extractors.basic import BasicFeatureExtractor
-from core.prediction_facade import PredictionFacade
+from data.feature_store import FeatureStore
 from models.lstm import LSTMModel   # sau modelul ales
 
 MODEL_PATH = "data/lstm_model.pkl"
@@ -19,17 +19,9 @@ def main():
 
     model = LSTMModel().load(MODEL_PATH)
 
-    feature_order = PredictionFacade(None, None, None).feature_order
-
-    X = []
     y_true = df["label"].astype(int).values
 
-    for code in df["code"]:
-        cleaned = pre.clean(str(code))
-        feats = fx.extract_features(cleaned)
-        X.append([float(feats.get(k, 0)) for k in feature_order])
-
-    X = np.array(X, dtype="float32")
+    X = FeatureStore().load(DATA_PATH, pre, fx).X
 
     print("[CALIBRATION] Predicting probabilities...")
     proba = model.predict(X)
@@ -0,0 +1,109 @@
+"""Tune the `/predict/cascade` uncertainty bands on the validation set.
+
+    python -m training.tune_cascade [--val data/validation.parquet] [--stages svm lstm]
+                                    [--target-rate 0.2] [--out data/cascade.json]
+
+Every cheap stage scores the validation features (from the feature store, the same
+features the API facades compute); the bands are chosen so that about `--target-rate`
+of the rows reach the transformer, leaving the cheap stages the rows they get right most
+often. With a loaded transformer the report compares the cascade with the transformer
+alone. `main.py` reads the bands from `--out` at start-up.
+"""
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+from core.prediction_facade import LABEL_THRESHOLD
+from core.preprocessor import Preprocessor
+from data.feature_store import FeatureStore
+from features.extractors.basic import BasicFeatureExtractor
+from models.adaboost import AdaBoostStrategy
+from models.cascade import THRESHOLD, simulate_cascade, tune_cascade
+from models.lstm import LSTMModel
+from models.svm import SVMModel
+from training.trainer import evaluation_metrics
+
+STAGES = {
+    "adaboost": (AdaBoostStrategy, "data/adaboost.pkl"),
+    "svm": (SVMModel, "data/svm_model.pkl"),
+    "lstm": (LSTMModel, "data/lstm_model.pkl"),
+}
+
+
+def transformer_proba(val_path: str, rows: np.ndarray):
+    """Transformer probabilities for `rows` of the validation file, or None if it cannot be loaded."""
+    try:
+        from data.token_store import TokenStore
+        from models.transformer import TransformerModel
+        path = "data/transformer_export" if os.path.isdir("data/transformer_export") else "data/transformer_model.pkl"
+        transformer = TransformerModel(model_name=None).load(path)
+        tokens = TokenStore().load(val_path, transformer.tokenizer, transformer.max_length).subset(rows)
+        return transformer.predict_ids(tokens, max_tokens=16384)
+    except Exception as e:
+        print("[CASCADE] Transformer not available, reporting the cheap stages only:", e)
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tune the cascade's uncertainty bands.")
+    parser.add_argument("--val", default="data/validation.parquet")
+    parser.add_argument("--stages", nargs="+", default=["svm", "lstm"], choices=list(STAGES),
+                        help="cheap models, in the order the cascade runs them")
+    parser.add_argument("--target-rate", type=float, default=0.2,
+                        help="fraction of inputs allowed to reach the transformer")
+    parser.add_argument("--out", default="data/cascade.json")
+    args = parser.parse_args(argv)
+
+    stored = FeatureStore().load(args.val, Preprocessor(), BasicFeatureExtractor())
+    rows = np.flatnonzero(stored.valid)
+    X, y = stored.X[rows], np.asarray(stored.y[rows])
+    print(f"[CASCADE] Validation: {len(rows)} rows, target escalation rate {args.target_rate:.0%}")
+
+    stage_proba, stage_ms = {}, {}
+    for name in args.stages:
+        cls, path = STAGES[name]
+        model = cls().load(path)
+        start = time.perf_counter()
+        stage_proba[name] = np.asarray(model.predict(X), dtype="float64").reshape(-1)
+        stage_ms[name] = 1000 * (time.perf_counter() - start) / max(len(rows), 1)
+
+    # each stage labels with its facade's threshold, as `/predict/<stage>` does
+    stages = tune_cascade(stage_proba, y, args.target_rate, thresholds={name: LABEL_THRESHOLD for name in stage_proba})
+    for stage in stages:
+        print(f"[CASCADE] {stage['name']}: band=({stage['low']:.3f}, {stage['high']:.3f}) "
+              f"decided {stage['decided']}/{stage['reached']} acc={stage['accuracy']}")
+
+    bands = {s["name"]: (s["low"], s["high"]) for s in stages}
+    teacher = transformer_proba(args.val, rows)
+    fallback = teacher if teacher is not None else np.full(len(rows), np.nan)
+    final, stage_of = simulate_cascade(stage_proba, fallback, bands)
+    escalated = stage_of == len(stages)
+    validation = {
+        "rows": len(rows),
+        "escalation_rate": float(escalated.mean()) if len(rows) else 0.0,
+        "decided_by": {name: int(np.sum(stage_of == j)) for j, name in enumerate(bands)},
+        "stage_ms_per_row": stage_ms,
+    }
+    validation["decided_by"]["transformer"] = int(escalated.sum())
+    if teacher is not None:
+        validation["cascade"] = evaluation_metrics(y, final)
+        validation["transformer"] = evaluation_metrics(y, np.asarray(teacher))
+        print(f"[CASCADE] Cascade acc={validation['cascade']['accuracy']:.4f} "
+              f"f1={validation['cascade']['f1']:.4f} vs transformer acc="
+              f"{validation['transformer']['accuracy']:.4f} f1={validation['transformer']['f1']:.4f}")
+    print(f"[CASCADE] Escalation rate on validation: {validation['escalation_rate']:.1%}")
+
+    config = {"target_escalation_rate": args.target_rate, "threshold": THRESHOLD, "stages": stages,
+              "validation": validation}
+    Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.out).write_text(json.dumps(config, indent=2))
+    print(f"[CASCADE] Bands saved to {args.out}")
+    return config
+
+
+if __name__ == "__main__":
+    main()